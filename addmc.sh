@@ -306,6 +306,12 @@ DEBUG_MODE=${DEBUG_MODE}
 RUN_MODE=${RUN_MODE}
 NO_DOCKER=${NO_DOCKER}
 
+# 로컬 메트릭 엔드포인트 (Prometheus /metrics, mtick 용 /debug/last_send, 0=비활성화)
+METRICS_PORT=${METRICS_PORT:-9181}
+
+# 미청구 보상을 확인할 검증인 stash 계정 (SS58 또는 0x hex, 쉼표로 구분)
+VALIDATOR_STASHES=${VALIDATOR_STASHES}
+
 # mclient 버전
 MCLIENT_VERSION=${MCLIENT_VERSION}
 EOF
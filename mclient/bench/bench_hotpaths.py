@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# bench_hotpaths.py
+"""
+mclient 핫패스 벤치마크
+
+기록된 docker stats 프레임(fixtures/docker_stats_frame.jsonl)을 컨테이너 수에 맞게
+복제해 다음 경로를 측정한다.
+    - DockerStatsClient._extract_json_objects  (4096 바이트 청크 단위 스트림 파싱)
+    - DockerStatsClient._process_stats_json
+    - DockerStatsClient._parse_size_with_unit
+    - TransmissionStats.add_sixty_point_data x60 + calculate_sixty_point_summary
+    - send_stats 메시지 직렬화
+    - MetricsState 의 /metrics 텍스트 렌더링
+    - SystemInfo.collect (캐시 무시)
+
+결과는 JSON 으로 저장되며 --compare 로 이전 결과와 비교할 수 있다.
+
+사용 예:
+    python3 bench/bench_hotpaths.py --output /tmp/bench_before.json
+    python3 bench/bench_hotpaths.py --compare /tmp/bench_before.json --threshold 10
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Any, Callable, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+# mclient 디렉토리를 Python 경로에 추가
+sys.path.append(os.path.dirname(BENCH_DIR))
+
+from docker_stats_client import DockerStatsClient
+from websocket_client import build_stats_message
+from main import SystemInfo, TransmissionStats
+from metrics_exporter import MetricsState
+
+logger = logging.getLogger("bench_hotpaths")
+
+DEFAULT_SIZES = (1, 10, 50, 200)
+FIXTURE_PATH = os.path.join(BENCH_DIR, "fixtures", "docker_stats_frame.jsonl")
+# DockerStatsClient._monitor_stats_stream 의 read() 크기
+STREAM_CHUNK_SIZE = 4096
+# 측정 한 번의 목표 시간 (초)
+TARGET_SAMPLE_TIME = 0.05
+
+
+def load_frame(size: int) -> List[Dict[str, Any]]:
+    """기록된 프레임을 size 개 컨테이너로 복제 (이름/ID 는 고유하게)"""
+    with open(FIXTURE_PATH) as f:
+        recorded = [json.loads(line) for line in f if line.strip()]
+    frame = []
+    for i in range(size):
+        line = dict(recorded[i % len(recorded)])
+        suffix = i // len(recorded)
+        if suffix:
+            line["Name"] = f"{line['Name']}-{suffix}"
+            line["ID"] = line["Container"] = f"{line['ID'][:8]}{suffix:04x}"
+        frame.append(line)
+    return frame
+
+
+def make_stream(frame: List[Dict[str, Any]]) -> bytes:
+    """docker stats 출력과 같은 형태 (화면 지우기 + JSON 줄)"""
+    return ("\x1b[2J\x1b[H" + "\n".join(json.dumps(line, separators=(",", ":")) for line in frame) + "\n").encode()
+
+
+def make_client() -> DockerStatsClient:
+    """docker version 확인 등 생성자 부작용 없이 파싱 메서드만 사용"""
+    return DockerStatsClient.__new__(DockerStatsClient)
+
+
+def enrich(processed: Dict[str, Any], index: int) -> Dict[str, Any]:
+    """_monitor_stats_stream 이 덧붙이는 필드 (노드 타입, 블록 정보 등)"""
+    processed["node_name"] = processed["name"]
+    processed["image_name"] = "creditcoin3:3.52.0"
+    processed["node_type"] = "creditcoin3"
+    processed["data_size"] = 150 * 1024 ** 3
+    processed["sync_state"] = "synced"
+    processed["blockchain"] = {
+        "current_block": 5_000_000 + index,
+        "finalized_block": 4_999_998 + index,
+        "target_block": 5_000_000 + index,
+        "starting_block": 0,
+        "peers": 24,
+    }
+    return processed
+
+
+class Bench:
+    def __init__(self, repeat: int):
+        self.repeat = repeat
+        self.results: List[Dict[str, Any]] = []
+
+    def measure(self, name: str, size: int, func: Callable[[], Any], setup: Optional[Callable[[], Any]] = None):
+        """반복 횟수를 자동으로 맞춘 뒤 repeat 번 측정 (1회당 마이크로초)"""
+        if setup:
+            setup()
+        number = 1
+        while True:
+            started = time.perf_counter()
+            for _ in range(number):
+                func()
+            elapsed = time.perf_counter() - started
+            if elapsed >= TARGET_SAMPLE_TIME or number >= 1 << 20:
+                break
+            number *= 2
+        samples = []
+        for _ in range(self.repeat):
+            if setup:
+                setup()
+            started = time.perf_counter()
+            for _ in range(number):
+                func()
+            samples.append((time.perf_counter() - started) / number * 1e6)
+        result = {
+            "name": name,
+            "containers": size,
+            "number": number,
+            "min_us": min(samples),
+            "median_us": statistics.median(samples),
+            "stdev_us": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        }
+        self.results.append(result)
+        print(f"{name:<28} {size:>4}개  median {result['median_us']:>12.1f} us  "
+              f"min {result['min_us']:>12.1f} us  (x{number})")
+        return result
+
+
+def bench_size(bench: Bench, size: int, system_info: SystemInfo):
+    client = make_client()
+    frame = load_frame(size)
+    stream = make_stream(frame)
+
+    def extract_stream():
+        # _monitor_stats_stream 과 같은 방식으로 청크를 버퍼에 누적하며 추출
+        buffer = ""
+        count = 0
+        for offset in range(0, len(stream), STREAM_CHUNK_SIZE):
+            buffer += stream[offset:offset + STREAM_CHUNK_SIZE].decode("utf-8")
+            extracted = client._extract_json_objects(buffer)
+            buffer = extracted.get("remainder", "")
+            count += len(extracted["objects"])
+        return count
+
+    bench.measure("extract_json_objects", size, extract_stream)
+
+    def process_frame():
+        return [client._process_stats_json(line) for line in frame]
+
+    bench.measure("process_stats_json", size, process_frame)
+
+    size_strings = []
+    for line in frame:
+        for key in ("MemUsage", "NetIO", "BlockIO"):
+            size_strings.extend(part.strip() for part in line[key].split("/"))
+
+    def parse_sizes():
+        return [client._parse_size_with_unit(value) for value in size_strings]
+
+    bench.measure("parse_size_with_unit", size, parse_sizes)
+
+    containers = [enrich(processed, i) for i, processed in enumerate(process_frame())]
+    sys_metrics = system_info.to_dict()
+    node_names = [c["name"] for c in containers]
+    stats_data = {"system": sys_metrics, "containers": containers, "configured_nodes": node_names}
+
+    def sixty_point_cycle():
+        stats = TransmissionStats()
+        for _ in range(60):
+            stats.add_sixty_point_data(sys_metrics, containers, 4096, 0.01, True, node_names)
+        return stats.calculate_sixty_point_summary(1)
+
+    bench.measure("sixty_point_summary", size, sixty_point_cycle)
+
+    def serialize():
+        return json.dumps(build_stats_message("bench", 1, 1, stats_data))
+
+    bench.measure("serialize_stats", size, serialize)
+
+    metrics_state = MetricsState()
+
+    def render_metrics():
+        # 틱마다 한 번 생성되는 /metrics 텍스트
+        metrics_state.update_tick(sys_metrics, containers)
+        return metrics_state.render()
+
+    bench.measure("render_metrics", size, render_metrics)
+
+    def collect():
+        system_info._last_collect_time = 0
+        return system_info.collect()
+
+    bench.measure("system_info_collect", size, collect)
+
+
+def git_revision() -> str:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=BENCH_DIR, timeout=5)
+        return result.stdout.strip() if result.returncode == 0 else "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, threshold: float) -> int:
+    """기준 결과와 비교, threshold(%) 이상 느려진 항목 수 반환"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {(r["name"], r["containers"]): r for r in baseline["results"]}
+    regressions = 0
+    print(f"\n=== 비교: {baseline['meta'].get('revision')} → 현재 (기준 {threshold:.0f}%) ===")
+    for result in results:
+        before = previous.get((result["name"], result["containers"]))
+        if not before or not before["median_us"]:
+            continue
+        change = (result["median_us"] - before["median_us"]) / before["median_us"] * 100
+        mark = ""
+        if change >= threshold:
+            mark = "  ← 느려짐"
+            regressions += 1
+        elif change <= -threshold:
+            mark = "  ← 빨라짐"
+        print(f"{result['name']:<28} {result['containers']:>4}개  {before['median_us']:>12.1f} → "
+              f"{result['median_us']:>12.1f} us ({change:+.1f}%){mark}")
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="mclient 핫패스 벤치마크")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES), help="컨테이너 수 목록 (쉼표 구분)")
+    parser.add_argument("--repeat", type=int, default=7, help="측정 반복 횟수")
+    parser.add_argument("--only", help="이름에 이 문자열이 포함된 항목만 실행")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=10.0, help="회귀로 판단할 중앙값 증가율 (%%)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    # 측정 대상 코드의 로그는 출력하지 않음
+    logging.disable(logging.CRITICAL)
+
+    bench = Bench(args.repeat)
+    if args.only:
+        original = bench.measure
+
+        def filtered(name, *rest, **kwargs):
+            if args.only in name:
+                return original(name, *rest, **kwargs)
+        bench.measure = filtered
+
+    system_info = SystemInfo()
+    system_info.collect()
+    for size in (int(s) for s in args.sizes.split(",")):
+        bench_size(bench, size, system_info)
+
+    output = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": int(time.time()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": bench.results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=2)
+        print(f"\n결과 저장: {args.output}")
+    if args.compare:
+        regressions = compare(bench.results, args.compare, args.threshold)
+        if regressions:
+            print(f"\n회귀 {regressions}건")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
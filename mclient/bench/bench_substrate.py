@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# bench_substrate.py
+"""
+substrate_utils 스토리지 키 / SCALE 디코딩 벤치마크
+
+다음 경로를 계정 수별로 측정한다. (해시 구현의 정확성은 test_substrate_utils.py 에서 확인)
+    - storage_map_keys  Staking.Bonded (twox_64_concat)
+    - storage_map_keys  Staking.Ledger / Session.NextKeys (blake2_128_concat)
+    - storage_map_keys  Staking.ErasStakersOverview (era 고정 이중 맵)
+    - Session.NextKeys 맵 전체 (state_queryStorageAt 응답 형태) 디코딩
+      SCALE 디코더 (bytes 변환 1회 + 오프셋 읽기) 와 이전 방식 (hex 문자열 슬라이스) 비교
+
+사용 예:
+    python3 bench/bench_substrate.py
+    python3 bench/bench_substrate.py --sizes 1000,10000 --repeat 5
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+# mclient 디렉토리를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import substrate_utils
+from substrate_utils import (
+    storage_map_keys, hex_to_bytes, decode_map_key_account, decode_session_keys,
+    SESSION_KEY_TYPES,
+)
+
+DEFAULT_SIZES = (100, 1000, 10000)
+
+
+def measure(name: str, size: int, func: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """repeat 번 실행해 1회당 밀리초와 키 1개당 마이크로초 출력"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    median = statistics.median(samples)
+    print(f"{name:<36} {size:>6}개  median {median * 1000:>9.2f} ms  "
+          f"({median / size * 1e6:.2f} us/키)")
+    return {"name": name, "size": size, "median_ms": median * 1000}
+
+
+def bench_size(size: int, repeat: int) -> List[Dict[str, Any]]:
+    rng = random.Random(size)
+    accounts = [rng.getrandbits(256).to_bytes(32, "big") for _ in range(size)]
+    era = (1000).to_bytes(4, "little")
+    return [
+        measure("Staking.Bonded (twox_64_concat)", size,
+                lambda: storage_map_keys("Staking", "Bonded", accounts, hasher="twox_64_concat"), repeat),
+        measure("Session.NextKeys (blake2_128_concat)", size,
+                lambda: storage_map_keys("Session", "NextKeys", accounts), repeat),
+        measure("ErasStakersOverview (era, stash)", size,
+                lambda: storage_map_keys("Staking", "ErasStakersOverview", accounts, hasher="twox_64_concat",
+                                         prefix_keys=(era,), prefix_hashers=("twox_64_concat",)), repeat),
+    ]
+
+
+def next_keys_map(size: int) -> List[List[str]]:
+    """검증인 size 명의 Session.NextKeys (키, 값) hex 목록"""
+    rng = random.Random(size)
+    accounts = [rng.getrandbits(256).to_bytes(32, "big") for _ in range(size)]
+    keys = storage_map_keys("Session", "NextKeys", accounts)
+    value_size = 32 * len(SESSION_KEY_TYPES)
+    return [[key, "0x" + rng.getrandbits(value_size * 8).to_bytes(value_size, "big").hex()] for key in keys]
+
+
+def decode_next_keys_scale(pairs: List[List[str]]) -> Dict[bytes, bytes]:
+    """공개키 -> AccountId (session_index 와 같은 방식)"""
+    index = {}
+    for key, value in pairs:
+        account = decode_map_key_account(hex_to_bytes(key))
+        session_keys, _ = decode_session_keys(hex_to_bytes(value))
+        for public_key in session_keys.values():
+            index[public_key] = account
+    return index
+
+
+def decode_next_keys_hex(pairs: List[List[str]]) -> Dict[str, str]:
+    """이전 방식: hex 문자열을 고정 오프셋으로 잘라 사용"""
+    index = {}
+    for key, value in pairs:
+        account = "0x" + key[98:]
+        stored = value.replace("0x", "").lower()
+        for offset in range(0, len(stored), 64):
+            index[stored[offset:offset + 64]] = account
+    return index
+
+
+def bench_next_keys(size: int, repeat: int) -> List[Dict[str, Any]]:
+    pairs = next_keys_map(size)
+    assert len(decode_next_keys_scale(pairs)) == len(decode_next_keys_hex(pairs))
+    return [
+        measure("NextKeys 디코딩 (SCALE)", size, lambda: decode_next_keys_scale(pairs), repeat),
+        measure("NextKeys 디코딩 (hex 슬라이스)", size, lambda: decode_next_keys_hex(pairs), repeat),
+    ]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="substrate_utils 스토리지 키 벤치마크")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES), help="계정 수 목록 (쉼표 구분)")
+    parser.add_argument("--repeat", type=int, default=5, help="측정 반복 횟수")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    print(f"xxhash 확장: {'사용' if substrate_utils.xxhash else '없음, 순수 파이썬'}\n")
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        bench_size(size, args.repeat)
+        bench_next_keys(size, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+# fake_docker.py
+"""
+벤치마크용 가짜 docker CLI
+
+DockerStatsClient, PayoutChecker, CommandHandler 가 호출하는 docker 명령
+(version, stats, inspect, image inspect, ps, images, start/stop/restart, logs,
+exec ... curl, exec ... du, exec ... bash /dev/tcp 중계, events) 을 시나리오에 따라 결정적으로 흉내 낸다.
+`exec <컨테이너> curl ... http://localhost:<port>/` 와 웹소켓 구독용 TCP 중계는 fake_node.py 로 전달한다.
+
+사용 예:
+    python3 bench/fake_docker.py install /tmp/fakebin     # /tmp/fakebin/docker 생성
+    export PATH=/tmp/fakebin:$PATH
+    export FAKE_DOCKER_SCENARIO=bench/scenario.json       # 생략하면 기본 시나리오
+    python3 bench/fake_node.py &                          # 시나리오의 RPC 포트로 노드 실행
+    python3 main.py --local
+"""
+import hashlib
+import json
+import os
+import random
+import re
+import socket
+import stat
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List, Any, Optional
+
+SCENARIO_ENV = "FAKE_DOCKER_SCENARIO"
+STATE_ENV = "FAKE_DOCKER_STATE"
+DEFAULT_STATE_PATH = "/tmp/fake_docker_state.json"
+
+# 시나리오 기본값 (FAKE_DOCKER_SCENARIO 파일의 값으로 덮어씀)
+DEFAULT_SCENARIO = {
+    "seed": 1,
+    # docker CLI 한 번 실행에 드는 지연 (실제 docker 는 수십 ms)
+    "command_latency_ms": 20,
+    # docker stats 출력 주기 (초)
+    "stats_interval": 1.0,
+    # exec ... curl 요청을 보낼 fake_node 주소
+    "node_host": "127.0.0.1",
+    "data_size": 150 * 1024 ** 3,
+    # 컨테이너 기본 시작 시각 (I/O 누적값 기준)
+    "started_at": 1_760_000_000.0,
+    "containers": [
+        {"name": "3node0", "image": "creditcoin3:3.52.0", "rpc_port": 33980},
+        {"name": "3node1", "image": "creditcoin3:3.52.0", "rpc_port": 33981},
+        {"name": "node0", "image": "creditcoin2:2.230.2", "rpc_port": 33880},
+    ],
+}
+
+
+def load_scenario(path: Optional[str] = None) -> Dict[str, Any]:
+    """시나리오 로드 (컨테이너 목록과 지연/주기 설정)"""
+    scenario = dict(DEFAULT_SCENARIO)
+    path = path or os.environ.get(SCENARIO_ENV)
+    if path:
+        with open(path) as f:
+            scenario.update(json.load(f))
+    containers = []
+    for index, container in enumerate(scenario["containers"]):
+        container = dict(container)
+        container.setdefault("image", "creditcoin3:latest")
+        container.setdefault("running", True)
+        container.setdefault("env", {})
+        container["index"] = index
+        container["id"] = hashlib.sha256(f"{scenario['seed']}-{container['name']}".encode()).hexdigest()
+        containers.append(container)
+    scenario["containers"] = containers
+    return scenario
+
+
+def format_size(size: float) -> str:
+    """docker CLI 와 같은 10진 단위 크기 표기 (예: 1.23GB)"""
+    for unit in ("B", "kB", "MB", "GB"):
+        if size < 1000:
+            return f"{size:.2f}{unit}"
+        size /= 1000
+    return f"{size:.2f}TB"
+
+
+class FakeDocker:
+    """docker 명령 하나를 처리"""
+
+    def __init__(self, scenario: Dict[str, Any]):
+        self.scenario = scenario
+        self.containers = {c["name"]: c for c in scenario["containers"]}
+        self.state_path = os.environ.get(STATE_ENV, DEFAULT_STATE_PATH)
+        self.state = self._load_state()
+
+    # ----- 상태 (start/stop 결과는 파일에 유지) -----
+
+    def _load_state(self) -> Dict[str, Any]:
+        try:
+            with open(self.state_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"running": {}, "restarts": {}, "started_at": {}}
+
+    def _save_state(self):
+        tmp_path = f"{self.state_path}.{os.getpid()}"
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def _running(self, container: Dict[str, Any]) -> bool:
+        return self.state["running"].get(container["name"], container["running"])
+
+    def _started_at(self, container: Dict[str, Any]) -> float:
+        return self.state["started_at"].get(container["name"], self.scenario["started_at"])
+
+    def _get(self, name: str) -> Dict[str, Any]:
+        container = self.containers.get(name)
+        if container is None:
+            self._fail(f"Error: No such container: {name}")
+        return container
+
+    @staticmethod
+    def _fail(message: str, code: int = 1):
+        sys.stderr.write(message + "\n")
+        sys.exit(code)
+
+    # ----- 출력 데이터 -----
+
+    def _env(self, container: Dict[str, Any]) -> Dict[str, str]:
+        image_name, _, tag = container["image"].partition(":")
+        env = {
+            "TELEMETRY_NAME": f"fake-{container['name']}",
+            "GIT_TAG": tag,
+            "IMAGE": container["image"],
+            "RPC_PORT": str(container.get("rpc_port", "")),
+        }
+        env.update(container["env"])
+        return env
+
+    def _inspect(self, container: Dict[str, Any]) -> Dict[str, Any]:
+        running = self._running(container)
+        started = time.strftime("%Y-%m-%dT%H:%M:%S.000000000Z", time.gmtime(self._started_at(container)))
+        port = container.get("rpc_port")
+        ports = {f"{port}/tcp": [{"HostIp": "0.0.0.0", "HostPort": str(port)}]} if port else {}
+        return {
+            "Id": container["id"],
+            "Created": "2024-01-01T00:00:00.000000000Z",
+            "Name": f"/{container['name']}",
+            "Image": "sha256:" + hashlib.sha256(container["image"].encode()).hexdigest(),
+            "RestartCount": self.state["restarts"].get(container["name"], 0),
+            "State": {
+                "Status": "running" if running else "exited",
+                "Running": running,
+                "StartedAt": started,
+            },
+            "Config": {
+                "Image": container["image"],
+                "Env": [f"{key}={value}" for key, value in self._env(container).items()],
+            },
+            "HostConfig": {"NetworkMode": "host"},
+            "NetworkSettings": {"Ports": ports},
+            "Mounts": [{
+                "Type": "bind",
+                "Source": f"/var/lib/fake-docker/{container['name']}/data",
+                "Destination": "/root/data",
+                "Mode": "rw",
+            }],
+        }
+
+    def _stats_line(self, container: Dict[str, Any], tick: int) -> Dict[str, Any]:
+        """tick(시각) 과 시드로 결정되는 docker stats 한 줄"""
+        rng = random.Random(f"{self.scenario['seed']}-{container['name']}-{tick}")
+        limit_gib = 16.0
+        mem_gib = limit_gib * rng.uniform(0.2, 0.6)
+        # 누적 I/O 는 컨테이너 시작 이후 경과 시간에 비례
+        uptime = max(0.0, tick * self.scenario["stats_interval"] - self._started_at(container))
+        rate = 20_000 * (container["index"] + 1)
+        return {
+            "BlockIO": f"{format_size(uptime * rate * 3)} / {format_size(uptime * rate * 5)}",
+            "CPUPerc": f"{rng.uniform(1, 120):.2f}%",
+            "Container": container["id"][:12],
+            "ID": container["id"][:12],
+            "MemPerc": f"{mem_gib / limit_gib * 100:.2f}%",
+            "MemUsage": f"{mem_gib:.4g}GiB / {limit_gib:.4g}GiB",
+            "Name": container["name"],
+            "NetIO": f"{format_size(uptime * rate)} / {format_size(uptime * rate * 0.8)}",
+            "PIDs": str(rng.randint(20, 60)),
+        }
+
+    def _ps_row(self, container: Dict[str, Any]) -> Dict[str, Any]:
+        running = self._running(container)
+        return {
+            "ID": container["id"][:12],
+            "Image": container["image"],
+            "Names": container["name"],
+            "State": "running" if running else "exited",
+            "Status": "Up 3 days" if running else "Exited (0) 1 minute ago",
+        }
+
+    @staticmethod
+    def _format_row(template: str, row: Dict[str, Any]) -> str:
+        """docker --format 템플릿의 자주 쓰는 형태만 지원"""
+        if template.replace(" ", "") == "{{json.}}":
+            return json.dumps(row)
+        if template.startswith("table "):
+            template = template[len("table "):]
+        result = template.replace("\\t", "\t")
+        for key, value in row.items():
+            result = result.replace("{{." + key + "}}", str(value))
+        return result
+
+    # ----- 명령 -----
+
+    def cmd_version(self, args: List[str]):
+        print("Client: Docker Engine - Community (fake)\n Version: 24.0.7\n\nServer: Docker Engine - Community (fake)\n Version: 24.0.7")
+
+    def cmd_stats(self, args: List[str]):
+        no_stream = "--no-stream" in args
+        interval = self.scenario["stats_interval"]
+        while True:
+            tick = int(time.time() / interval)
+            # 실제 docker stats 처럼 화면 지우기 시퀀스 뒤에 전체 목록 출력
+            lines = [json.dumps(self._stats_line(c, tick)) for c in self.scenario["containers"] if self._running(c)]
+            sys.stdout.write("\x1b[2J\x1b[H" + "\n".join(lines) + "\n")
+            sys.stdout.flush()
+            if no_stream:
+                return
+            time.sleep(interval - time.time() % interval)
+            self.state = self._load_state()
+
+    def cmd_inspect(self, args: List[str]):
+        template = None
+        names = []
+        i = 0
+        while i < len(args):
+            if args[i] in ("-f", "--format"):
+                template = args[i + 1]
+                i += 2
+                continue
+            names.append(args[i])
+            i += 1
+        infos = [self._inspect(self._get(name)) for name in names]
+        if template is None:
+            print(json.dumps(infos, indent=4))
+            return
+        for info in infos:
+            if ".State.Running" in template:
+                print("true" if info["State"]["Running"] else "false")
+            elif ".Mounts" in template:
+                print(next((m["Source"] for m in info["Mounts"] if m["Destination"] == "/root/data"), ""))
+            elif ".State.Status" in template:
+                print(info["State"]["Status"])
+            else:
+                print(json.dumps(info))
+
+    def cmd_image(self, args: List[str]):
+        if not args or args[0] != "inspect":
+            self._fail(f"fake docker: 지원하지 않는 image 명령: {args}")
+        result = []
+        for image in args[1:]:
+            result.append({
+                "Id": "sha256:" + hashlib.sha256(image.encode()).hexdigest(),
+                "Size": 1_200_000_000,
+                "Created": "2024-01-01T00:00:00Z",
+                "Architecture": "arm64",
+                "Os": "linux",
+            })
+        print(json.dumps(result))
+
+    def cmd_ps(self, args: List[str]):
+        template = "{{.ID}}\t{{.Image}}\t{{.Status}}\t{{.Names}}"
+        name_filters = []
+        status_filter = None
+        show_all = False
+        i = 0
+        while i < len(args):
+            if args[i] == "--format":
+                template = args[i + 1]
+                i += 2
+            elif args[i] == "--filter":
+                key, _, value = args[i + 1].partition("=")
+                if key == "name":
+                    name_filters.append(value)
+                elif key == "status":
+                    status_filter = value
+                i += 2
+            elif args[i] in ("-a", "--all"):
+                show_all = True
+                i += 1
+            else:
+                i += 1
+        rows = []
+        for container in self.scenario["containers"]:
+            row = self._ps_row(container)
+            if status_filter is not None:
+                if row["State"] != status_filter:
+                    continue
+            elif not show_all and row["State"] != "running":
+                continue
+            if name_filters and not any(f in container["name"] for f in name_filters):
+                continue
+            rows.append(row)
+        if template.startswith("table "):
+            print(template[len("table "):].replace("{{.", "").replace("}}", "").replace("\\t", "\t").upper())
+        for row in rows:
+            print(self._format_row(template, row))
+
+    def cmd_images(self, args: List[str]):
+        template = args[args.index("--format") + 1] if "--format" in args else "{{.Repository}}\t{{.Tag}}"
+        seen = set()
+        for container in self.scenario["containers"]:
+            if container["image"] in seen:
+                continue
+            seen.add(container["image"])
+            repository, _, tag = container["image"].partition(":")
+            print(self._format_row(template, {
+                "Repository": repository,
+                "Tag": tag or "latest",
+                "CreatedAt": "2024-01-01 00:00:00 +0000 UTC",
+                "Size": "1.2GB",
+            }))
+
+    def _set_running(self, names: List[str], running: bool, restart: bool = False):
+        for name in names:
+            container = self._get(name)
+            self.state["running"][name] = running
+            if running:
+                self.state["started_at"][name] = time.time()
+            if restart:
+                self.state["restarts"][name] = self.state["restarts"].get(name, 0) + 1
+            print(container["name"])
+        self._save_state()
+
+    def cmd_start(self, args: List[str]):
+        self._set_running(args, True)
+
+    def cmd_stop(self, args: List[str]):
+        self._set_running([a for a in args if not a.startswith("-")], False)
+
+    def cmd_restart(self, args: List[str]):
+        self._set_running([a for a in args if not a.startswith("-")], True, restart=True)
+
+    def cmd_logs(self, args: List[str]):
+        container = self._get(args[0])
+        lines = int(args[args.index("--tail") + 1]) if "--tail" in args else 100
+        now = time.time()
+        for i in range(lines):
+            ts = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now - (lines - i) * 6))
+            print(f"{ts} 💤 Idle ({20 + i % 5} peers), best: #{1_000_000 + i}, finalized #{999_998 + i} ({container['name']})")
+
+    def cmd_exec(self, args: List[str]):
+        options_end = 0
+        while options_end < len(args) and args[options_end].startswith("-"):
+            options_end += 1
+        container = self._get(args[options_end])
+        command = args[options_end + 1:]
+        if not self._running(container):
+            self._fail(f"Error response from daemon: Container {container['id'][:12]} is not running")
+        if command and command[0] == "curl":
+            self._exec_curl(command[1:])
+        elif command[:2] == ["bash", "-c"] and "/dev/tcp/" in command[2]:
+            self._exec_relay(command[2])
+        elif command[:2] == ["du", "-sb"]:
+            print(f"{self.scenario['data_size'] + container['index'] * 1024 ** 3}\t{command[2]}")
+        else:
+            print("")
+
+    def _exec_curl(self, args: List[str]):
+        """컨테이너 내부 curl 을 fake_node 로 전달"""
+        body = None
+        url = None
+        headers = {}
+        i = 0
+        while i < len(args):
+            if args[i] in ("-d", "--data", "--data-binary"):
+                # "@-" 는 stdin 본문 (docker exec -i ... curl --data-binary @-)
+                body = sys.stdin.buffer.read() if args[i + 1] == "@-" else args[i + 1].encode()
+                i += 2
+            elif args[i] in ("-H", "--header"):
+                key, _, value = args[i + 1].partition(":")
+                headers[key.strip()] = value.strip()
+                i += 2
+            elif args[i].startswith("http"):
+                url = args[i]
+                i += 1
+            else:
+                i += 1
+        if url is None:
+            self._fail("curl: no URL specified!", 2)
+        url = url.replace("localhost", self.scenario["node_host"]).replace("127.0.0.1", self.scenario["node_host"])
+        try:
+            request = urllib.request.Request(url, data=body, headers=headers)
+            with urllib.request.urlopen(request, timeout=30) as response:
+                sys.stdout.write(response.read().decode())
+        except urllib.error.HTTPError as e:
+            sys.stdout.write(e.read().decode())
+        except (urllib.error.URLError, OSError):
+            # curl -s 는 연결 실패 시 아무것도 출력하지 않고 7 로 종료
+            sys.exit(7)
+
+    def _exec_relay(self, script: str):
+        """컨테이너 내부 bash /dev/tcp 중계를 fake_node 포트와의 stdin/stdout 중계로 흉내 냄"""
+        port = int(re.search(r"/dev/tcp/[^/]+/(\d+)", script).group(1))
+        try:
+            conn = socket.create_connection((self.scenario["node_host"], port), timeout=5)
+        except OSError:
+            sys.exit(1)
+        conn.settimeout(None)
+
+        def pump_in():
+            while data := os.read(0, 65536):
+                conn.sendall(data)
+            conn.shutdown(socket.SHUT_WR)
+
+        threading.Thread(target=pump_in, daemon=True).start()
+        while data := conn.recv(65536):
+            os.write(1, data)
+
+    def cmd_events(self, args: List[str]):
+        """컨테이너별 health_status 이벤트를 주기적으로 출력"""
+        json_format = "--format" in args and "json" in args[args.index("--format") + 1]
+        interval = self.scenario["stats_interval"] * 10
+        while True:
+            for container in self.scenario["containers"]:
+                event = {
+                    "status": "health_status: healthy",
+                    "id": container["id"],
+                    "from": container["image"],
+                    "Type": "container",
+                    "Action": "health_status: healthy",
+                    "Actor": {"ID": container["id"], "Attributes": {"name": container["name"]}},
+                    "time": int(time.time()),
+                    "timeNano": time.time_ns(),
+                }
+                if json_format:
+                    print(json.dumps(event))
+                else:
+                    print(f"{time.strftime('%Y-%m-%dT%H:%M:%S')} container {event['Action']} {container['id']} (name={container['name']})")
+            sys.stdout.flush()
+            time.sleep(interval)
+
+    def cmd_run(self, args: List[str]):
+        print("")
+
+    def run(self, argv: List[str]):
+        if not argv:
+            self._fail("Usage: docker [OPTIONS] COMMAND")
+        handler = getattr(self, f"cmd_{argv[0]}", None)
+        if handler is None:
+            self._fail(f"fake docker: 지원하지 않는 명령: {argv[0]}")
+        # 실제 docker CLI 의 프로세스 기동/데몬 왕복 비용
+        latency = self.scenario["command_latency_ms"]
+        if latency and argv[0] not in ("stats", "events"):
+            time.sleep(latency / 1000)
+        handler(argv[1:])
+
+
+def install(directory: str):
+    """directory/docker 래퍼 생성 (PATH 앞에 추가해서 사용)"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "docker")
+    with open(path, "w") as f:
+        f.write(f'#!/bin/sh\nexec "{sys.executable}" "{os.path.abspath(__file__)}" "$@"\n')
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    print(path)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "install":
+        install(sys.argv[2] if len(sys.argv) > 2 else "/tmp/fakebin")
+        sys.exit(0)
+    try:
+        FakeDocker(load_scenario()).run(sys.argv[1:])
+    except (BrokenPipeError, KeyboardInterrupt):
+        pass
@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+# fake_node.py
+"""
+벤치마크용 가짜 Creditcoin(Substrate) 노드
+
+JSON-RPC (HTTP POST 및 WebSocket) 로 system_health, system_syncState,
+chain_getHeader, chain_getBlockHash, chain_getFinalizedHead, chain_getBlock,
+state_getStorage, state_queryStorageAt, state_getKeysPaged, state_getPairs, author_*, babe_epochAuthorship
+등을 제공하고 WebSocket 에서는 state_subscribeStorage,
+chain_subscribeNewHeads 구독도 지원한다.
+블록은 설정한 주기로 증가하고 모든 값은 시드로 결정되므로 같은 설정이면 같은 결과를 돌려준다.
+
+사용 예:
+    python3 bench/fake_node.py                                  # fake_docker 기본 시나리오의 포트
+    python3 bench/fake_node.py --ports 33980,33981 --block-time 1 --latency-ms 5 --jitter-ms 20
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import struct
+import sys
+import time
+from typing import Dict, List, Any, Optional, Tuple
+
+from aiohttp import web, WSMsgType
+
+# mclient 디렉토리를 Python 경로에 추가 (스토리지 키 해시 재사용)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from substrate_utils import blake2_128_concat, twox_64_concat, storage_key, SESSION_KEY_TYPES, BABE_ENGINE_ID
+from payout_checker import (
+    STAKING_BONDED_PREFIX, STAKING_LEDGER_PREFIX,
+    STAKING_ERAS_STAKERS_OVERVIEW_PREFIX, STAKING_CLAIMED_REWARDS_PREFIX,
+)
+from session_index import SESSION_NEXT_KEYS_PREFIX, SESSION_CURRENT_INDEX_KEY
+from fake_docker import load_scenario
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("fake_node")
+
+SESSION_VALIDATORS_KEY = storage_key("Session", "Validators")
+STAKING_ACTIVE_ERA_KEY = storage_key("Staking", "ActiveEra")
+STAKING_CURRENT_ERA_KEY = storage_key("Staking", "CurrentEra")
+BABE_EPOCH_INDEX_KEY = storage_key("Babe", "EpochIndex")
+BABE_AUTHORITIES_KEY = storage_key("Babe", "Authorities")
+# era 당 세션 수
+SESSIONS_PER_ERA = 6
+
+
+def encode_compact(value: int) -> bytes:
+    """SCALE compact 정수 인코딩"""
+    if value < 1 << 6:
+        return bytes([value << 2])
+    if value < 1 << 14:
+        return struct.pack("<H", (value << 2) | 1)
+    if value < 1 << 30:
+        return struct.pack("<I", (value << 2) | 2)
+    raw = value.to_bytes((value.bit_length() + 7) // 8, "little")
+    return bytes([((len(raw) - 4) << 2) | 3]) + raw
+
+
+class FakeChain:
+    """모든 가짜 노드가 공유하는 체인 (시간에 따라 블록 증가)"""
+
+    def __init__(self, seed: int, start_block: int, block_time: float, finality_lag: int,
+                 era_blocks: int, validator_count: int):
+        self.seed = seed
+        self.start_block = start_block
+        self.block_time = block_time
+        self.finality_lag = finality_lag
+        self.era_blocks = era_blocks
+        self.started = time.time()
+        self.genesis_slot = int(self.started / block_time) - start_block  # 블록 하나에 슬롯 하나
+        rng = random.Random(seed)
+        self.validators = [rng.getrandbits(256).to_bytes(32, "big") for _ in range(validator_count)]
+        self.session_keys = [rng.getrandbits(256 * len(SESSION_KEY_TYPES)).to_bytes(32 * len(SESSION_KEY_TYPES), "big")
+                             for _ in range(validator_count)]
+        # 정렬된 (키, 값) 목록: state_getKeysPaged/state_getPairs 용
+        self.storage: Dict[str, str] = {}
+        validators_value = encode_compact(len(self.validators)) + b"".join(self.validators)
+        self.storage[SESSION_VALIDATORS_KEY] = "0x" + validators_value.hex()
+        for account, keys in zip(self.validators, self.session_keys):
+            key = SESSION_NEXT_KEYS_PREFIX + blake2_128_concat(account).hex()
+            self.storage[key] = "0x" + keys.hex()
+            # 검증인은 stash 가 곧 controller (Bonded, Ledger: 청구 기록 없음)
+            self.storage[STAKING_BONDED_PREFIX + twox_64_concat(account).hex()] = "0x" + account.hex()
+            bond = encode_compact(10 ** 24)
+            ledger = account + bond + bond + encode_compact(0) + encode_compact(0)
+            self.storage[STAKING_LEDGER_PREFIX + blake2_128_concat(account).hex()] = "0x" + ledger.hex()
+        # 블록 작성자 index 순서의 BABE 공개키 (가중치 1)
+        authorities = b"".join(keys[32:64] + struct.pack("<Q", 1) for keys in self.session_keys)
+        self.storage[BABE_AUTHORITIES_KEY] = "0x" + (encode_compact(len(self.session_keys)) + authorities).hex()
+        self.validator_set = set(self.validators)
+        self.sorted_keys = sorted(self.storage)
+
+    def best_number(self) -> int:
+        return self.start_block + int((time.time() - self.started) / self.block_time)
+
+    def finalized_number(self) -> int:
+        return max(0, self.best_number() - self.finality_lag)
+
+    def active_era(self) -> Tuple[int, int]:
+        """(era 번호, era 시작 시각 ms)"""
+        best = self.best_number()
+        era = best // self.era_blocks
+        era_start_block = era * self.era_blocks
+        start_ms = int((self.started + (era_start_block - self.start_block) * self.block_time) * 1000)
+        return era, start_ms
+
+    def session_index(self) -> int:
+        return self.best_number() // max(1, self.era_blocks // SESSIONS_PER_ERA)
+
+    def block_hash(self, number: int) -> str:
+        """번호를 끝 4바이트에 담은 결정적 해시 (해시 → 번호 역변환 가능)"""
+        digest = hashlib.blake2b(f"{self.seed}-{number}".encode(), digest_size=28).digest()
+        return "0x" + (digest + struct.pack(">I", number)).hex()
+
+    @staticmethod
+    def number_from_hash(block_hash: str) -> int:
+        return int(block_hash[-8:], 16)
+
+    def author_index(self, number: int) -> int:
+        return int.from_bytes(hashlib.blake2b(f"{self.seed}-author-{number}".encode(), digest_size=4).digest(),
+                              "little") % len(self.validators)
+
+    def slot(self, number: int) -> int:
+        return self.genesis_slot + number
+
+    def epoch_blocks(self) -> range:
+        """현재 epoch(=세션) 의 블록 번호 범위"""
+        length = max(1, self.era_blocks // SESSIONS_PER_ERA)
+        start = self.session_index() * length
+        return range(start, start + length)
+
+    def header(self, number: int) -> Dict[str, Any]:
+        # BABE SecondaryPlain 사전 다이제스트: 변형(0x02) + authority_index(u32) + slot(u64)
+        pre_digest = b"\x02" + struct.pack("<IQ", self.author_index(number), self.slot(number))
+        log = b"\x06" + BABE_ENGINE_ID + encode_compact(len(pre_digest)) + pre_digest
+        return {
+            "parentHash": self.block_hash(number - 1),
+            "number": hex(number),
+            "stateRoot": "0x" + hashlib.blake2b(f"{self.seed}-state-{number}".encode(), digest_size=32).hexdigest(),
+            "extrinsicsRoot": "0x" + hashlib.blake2b(f"{self.seed}-ext-{number}".encode(), digest_size=32).hexdigest(),
+            "digest": {"logs": ["0x" + log.hex()]},
+        }
+
+    def storage_value(self, key: str) -> Optional[str]:
+        if key == STAKING_ACTIVE_ERA_KEY:
+            era, start_ms = self.active_era()
+            return "0x" + (struct.pack("<I", era) + b"\x01" + struct.pack("<Q", start_ms)).hex()
+        if key == STAKING_CURRENT_ERA_KEY:
+            return "0x" + struct.pack("<I", self.active_era()[0]).hex()
+        if key == SESSION_CURRENT_INDEX_KEY:
+            return "0x" + struct.pack("<I", self.session_index()).hex()
+        if key == BABE_EPOCH_INDEX_KEY:
+            # 세션과 BABE epoch 길이가 같음
+            return "0x" + struct.pack("<Q", self.session_index()).hex()
+        if key.startswith((STAKING_ERAS_STAKERS_OVERVIEW_PREFIX, STAKING_CLAIMED_REWARDS_PREFIX)):
+            return self._era_staking_value(key)
+        return self.storage.get(key)
+
+    def _era_staking_value(self, key: str) -> Optional[str]:
+        """ErasStakersOverview / ClaimedRewards (era, stash): 시드로 선출/청구 여부 결정"""
+        # 접두사(64) + twox_64(era)(16) + era(8) + twox_64(stash)(16) + stash(64)
+        body = key[66:]
+        era = struct.unpack("<I", bytes.fromhex(body[16:24]))[0]
+        account = bytes.fromhex(body[40:104])
+        if account not in self.validator_set or era >= self.active_era()[0]:
+            return None
+        roll = hashlib.blake2b(f"{self.seed}-era-{era}-".encode() + account, digest_size=1).digest()[0]
+        if roll % 4 == 0:
+            return None  # 해당 era 에 선출되지 않음
+        if key.startswith(STAKING_ERAS_STAKERS_OVERVIEW_PREFIX):
+            stake = encode_compact(10 ** 24)
+            return "0x" + (stake + stake + struct.pack("<II", 0, 1)).hex()
+        if roll % 3 == 0:
+            return None  # 미청구
+        return "0x" + (encode_compact(1) + struct.pack("<I", 0)).hex()
+
+    def keys_paged(self, prefix: str, count: int, start_key: Optional[str]) -> List[str]:
+        result = []
+        for key in self.sorted_keys:
+            if start_key and key <= start_key:
+                continue
+            if key.startswith(prefix):
+                result.append(key)
+                if len(result) >= count:
+                    break
+        return result
+
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class FakeNode:
+    """포트 하나에 해당하는 노드 (동기화 상태, 피어 수, 검증인 여부)"""
+
+    def __init__(self, name: str, port: int, chain: FakeChain, config: Dict[str, Any]):
+        self.name = name
+        self.port = port
+        self.chain = chain
+        self.peers = config.get("peers", 20)
+        self.syncing = config.get("syncing", False)
+        # 검증인 노드면 해당 인덱스의 세션 키를 보유
+        self.validator_index = config.get("validator_index")
+        self.latency = config.get("latency_ms", 0) / 1000
+        self.jitter = config.get("jitter_ms", 0) / 1000
+        self.rng = random.Random(f"{chain.seed}-{name}")
+        self.requests = 0
+
+    def _session_keys(self) -> Optional[bytes]:
+        if self.validator_index is None:
+            return None
+        return self.chain.session_keys[self.validator_index]
+
+    def _has_key(self, public_key: str, key_type: str) -> bool:
+        keys = self._session_keys()
+        if keys is None or key_type not in SESSION_KEY_TYPES:
+            return False
+        index = SESSION_KEY_TYPES.index(key_type)
+        return public_key.lower().replace("0x", "") == keys[index * 32:(index + 1) * 32].hex()
+
+    def _epoch_authorship(self) -> Dict[str, Any]:
+        if self.validator_index is None:
+            return {}
+        babe_key = self._session_keys()[32:64]
+        slots = [self.chain.slot(number) for number in self.chain.epoch_blocks()
+                 if self.chain.author_index(number) == self.validator_index]
+        return {"0x" + babe_key.hex(): {"primary": [], "secondary": slots, "secondary_vrf": []}}
+
+    def call(self, method: str, params: List[Any]) -> Any:
+        chain = self.chain
+        self.requests += 1
+        if method == "system_health":
+            return {"peers": self.peers, "isSyncing": self.syncing, "shouldHavePeers": True}
+        if method == "system_syncState":
+            best = chain.best_number()
+            return {"startingBlock": chain.start_block, "currentBlock": best - (100 if self.syncing else 0),
+                    "highestBlock": best}
+        if method == "system_name":
+            return "Creditcoin Node (fake)"
+        if method == "system_version":
+            return "3.52.0-fake"
+        if method == "system_chain":
+            return "Creditcoin Fake"
+        if method == "chain_getHeader":
+            number = chain.number_from_hash(params[0]) if params and params[0] else chain.best_number()
+            return chain.header(number)
+        if method == "chain_getBlock":
+            number = chain.number_from_hash(params[0]) if params and params[0] else chain.best_number()
+            return {"block": {"header": chain.header(number), "extrinsics": []}, "justifications": None}
+        if method == "chain_getBlockHash":
+            number = params[0] if params and params[0] is not None else chain.best_number()
+            if isinstance(number, str):
+                number = int(number, 16)
+            return chain.block_hash(number) if number <= chain.best_number() else None
+        if method == "chain_getFinalizedHead":
+            return chain.block_hash(chain.finalized_number())
+        if method == "state_getStorage":
+            return chain.storage_value(params[0])
+        if method == "state_queryStorageAt":
+            at = params[1] if len(params) > 1 and params[1] else chain.block_hash(chain.best_number())
+            return [{"block": at, "changes": [[key, chain.storage_value(key)] for key in params[0]]}]
+        if method == "state_getKeysPaged":
+            prefix, count = params[0], params[1]
+            start_key = params[2] if len(params) > 2 else None
+            return chain.keys_paged(prefix, count, start_key)
+        if method == "state_getKeys":
+            return chain.keys_paged(params[0], len(chain.sorted_keys), None)
+        if method == "state_getPairs":
+            return [[key, chain.storage[key]] for key in chain.keys_paged(params[0], len(chain.sorted_keys), None)]
+        if method == "author_rotateKeys":
+            return "0x" + self.rng.getrandbits(256 * len(SESSION_KEY_TYPES)).to_bytes(32 * len(SESSION_KEY_TYPES), "big").hex()
+        if method == "author_hasSessionKeys":
+            keys = self._session_keys()
+            wanted = (params[0] if params else "") or ""
+            return keys is not None and (not wanted or wanted.lower().replace("0x", "") == keys.hex())
+        if method == "author_hasKey":
+            return self._has_key(params[0], params[1])
+        if method == "babe_epochAuthorship":
+            return self._epoch_authorship()
+        if method == "rpc_methods":
+            return {"methods": SUPPORTED_METHODS}
+        raise RpcError(-32601, "Method not found")
+
+    async def handle(self, payload: Any) -> Any:
+        """JSON-RPC 요청 (단일 또는 배치) 처리"""
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + self.rng.uniform(0, self.jitter))
+        if isinstance(payload, list):
+            return [self._respond(item) for item in payload]
+        return self._respond(payload)
+
+    def _respond(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        request_id = request.get("id")
+        try:
+            return {"jsonrpc": "2.0", "result": self.call(request.get("method"), request.get("params") or []),
+                    "id": request_id}
+        except RpcError as e:
+            return {"jsonrpc": "2.0", "error": {"code": e.code, "message": e.message}, "id": request_id}
+        except (IndexError, TypeError, ValueError) as e:
+            return {"jsonrpc": "2.0", "error": {"code": -32602, "message": f"Invalid params: {e}"}, "id": request_id}
+
+
+SUPPORTED_METHODS = [
+    "system_health", "system_syncState", "system_name", "system_version", "system_chain",
+    "chain_getHeader", "chain_getBlock", "chain_getBlockHash", "chain_getFinalizedHead",
+    "state_getStorage", "state_queryStorageAt", "state_getKeysPaged", "state_getKeys", "state_getPairs",
+    "author_rotateKeys", "author_hasSessionKeys", "author_hasKey",
+    "babe_epochAuthorship", "rpc_methods", "state_subscribeStorage", "chain_subscribeNewHeads",
+]
+
+
+def make_app(node: FakeNode) -> web.Application:
+    async def handle_http(request: web.Request) -> web.StreamResponse:
+        try:
+            payload = await request.json()
+        except ValueError:
+            return web.json_response({"jsonrpc": "2.0", "error": {"code": -32700, "message": "Parse error"}, "id": None})
+        return web.json_response(await node.handle(payload))
+
+    async def push_storage(ws: web.WebSocketResponse, subscription: str, keys: List[str]):
+        """state_subscribeStorage: 첫 알림은 전체 값, 이후 블록마다 바뀐 값만 전송"""
+        last: Dict[str, Optional[str]] = {}
+        while not ws.closed:
+            chain = node.chain
+            changes = []
+            for key in keys:
+                value = chain.storage_value(key)
+                if key not in last or last[key] != value:
+                    changes.append([key, value])
+                    last[key] = value
+            if changes:
+                await ws.send_json({"jsonrpc": "2.0", "method": "state_storage", "params": {
+                    "subscription": subscription,
+                    "result": {"block": chain.block_hash(chain.best_number()), "changes": changes},
+                }})
+            await asyncio.sleep(chain.block_time)
+
+    async def push_heads(ws: web.WebSocketResponse, subscription: str):
+        """chain_subscribeNewHeads: 새 블록마다 헤더 전송"""
+        last = None
+        while not ws.closed:
+            chain = node.chain
+            best = chain.best_number()
+            if best != last:
+                await ws.send_json({"jsonrpc": "2.0", "method": "chain_newHead", "params": {
+                    "subscription": subscription, "result": chain.header(best),
+                }})
+                last = best
+            await asyncio.sleep(chain.block_time)
+
+    async def handle_ws(request: web.Request) -> web.StreamResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        subscriptions = []
+        try:
+            async for message in ws:
+                if message.type != WSMsgType.TEXT:
+                    continue
+                try:
+                    payload = json.loads(message.data)
+                except ValueError:
+                    await ws.send_json({"jsonrpc": "2.0", "error": {"code": -32700, "message": "Parse error"}, "id": None})
+                    continue
+                method = payload.get("method") if isinstance(payload, dict) else None
+                if method in ("state_subscribeStorage", "chain_subscribeNewHeads"):
+                    subscription = f"{node.name}-{len(subscriptions)}"
+                    await ws.send_json({"jsonrpc": "2.0", "result": subscription, "id": payload.get("id")})
+                    if method == "state_subscribeStorage":
+                        keys = (payload.get("params") or [[]])[0]
+                        push = push_storage(ws, subscription, keys)
+                    else:
+                        push = push_heads(ws, subscription)
+                    subscriptions.append(asyncio.create_task(push))
+                    continue
+                await ws.send_json(await node.handle(payload))
+        finally:
+            for task in subscriptions:
+                task.cancel()
+        return ws
+
+    async def handle_get(request: web.Request) -> web.StreamResponse:
+        if request.headers.get("Upgrade", "").lower() == "websocket":
+            return await handle_ws(request)
+        return web.Response(status=405, text="Used HTTP Method is not allowed. POST or OPTIONS is required\n")
+
+    app = web.Application()
+    app.router.add_post("/", handle_http)
+    app.router.add_get("/", handle_get)
+    return app
+
+
+async def serve(nodes: List[FakeNode], host: str):
+    runners = []
+    for node in nodes:
+        runner = web.AppRunner(make_app(node), access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, host, node.port).start()
+        runners.append(runner)
+        logger.info(f"가짜 노드 시작: {node.name} ({host}:{node.port}, 피어 {node.peers}, "
+                    f"검증인 {node.validator_index if node.validator_index is not None else '아님'})")
+    try:
+        while True:
+            await asyncio.sleep(60)
+            chain = nodes[0].chain
+            logger.info(f"블록 #{chain.best_number()} (확정 #{chain.finalized_number()}), "
+                        f"요청 수: " + ", ".join(f"{n.name}={n.requests}" for n in nodes))
+    finally:
+        for runner in runners:
+            await runner.cleanup()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="벤치마크용 가짜 Substrate 노드")
+    parser.add_argument("--scenario", help="fake_docker 시나리오 파일 (기본: FAKE_DOCKER_SCENARIO 또는 기본 시나리오)")
+    parser.add_argument("--ports", help="쉼표로 구분한 RPC 포트 (지정 시 시나리오 대신 사용)")
+    parser.add_argument("--host", default="127.0.0.1", help="바인드 주소")
+    parser.add_argument("--seed", type=int, help="난수 시드 (기본: 시나리오 값)")
+    parser.add_argument("--start-block", type=int, default=1_000_000, help="시작 블록 번호")
+    parser.add_argument("--block-time", type=float, default=6.0, help="블록 생성 주기 (초)")
+    parser.add_argument("--finality-lag", type=int, default=2, help="확정 블록 지연 (블록 수)")
+    parser.add_argument("--era-blocks", type=int, default=14400, help="era 길이 (블록 수)")
+    parser.add_argument("--validators", type=int, default=300, help="검증인 수 (Session.NextKeys 항목 수)")
+    parser.add_argument("--peers", type=int, default=20, help="피어 수")
+    parser.add_argument("--latency-ms", type=float, default=0, help="RPC 응답 기본 지연 (ms)")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="RPC 응답 추가 지연 최대값 (ms)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    scenario = load_scenario(args.scenario)
+    seed = args.seed if args.seed is not None else scenario["seed"]
+    chain = FakeChain(seed, args.start_block, args.block_time, args.finality_lag, args.era_blocks, args.validators)
+
+    defaults = {"peers": args.peers, "latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms}
+    if args.ports:
+        targets = [(f"node-{port}", int(port), {}) for port in args.ports.split(",")]
+    else:
+        # 시나리오의 컨테이너별 "node" 항목으로 피어 수/동기화/검증인 여부를 덮어씀
+        targets = [(c["name"], c["rpc_port"], c.get("node", {})) for c in scenario["containers"] if c.get("rpc_port")]
+    nodes = []
+    for index, (name, port, overrides) in enumerate(targets):
+        config = dict(defaults)
+        config.setdefault("validator_index", index if index < len(chain.validators) else None)
+        config.update(overrides)
+        nodes.append(FakeNode(name, port, chain, config))
+
+    try:
+        asyncio.run(serve(nodes, args.host))
+    except KeyboardInterrupt:
+        logger.info("가짜 노드 종료")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,618 @@
+#!/usr/bin/env python3
+# loadgen.py
+"""
+mserver 부하 테스트 도구
+
+실제 WebSocketClient 와 같은 메시지 형식(register, stats, summary, heartbeat,
+command_response)으로 수천 개의 가상 mclient 를 한두 개의 프로세스에서 실행하고
+서버 응답(ACK) 지연 백분위, 초당 프레임 수, mserver CPU/RSS 를 보고한다.
+
+사용 예:
+    python3 bench/loadgen.py --url ws://127.0.0.1:8080 --clients 2000 --duration 120
+    python3 bench/loadgen.py --clients 5000 --processes 4 --interval 1 --churn 30 --server-pid 1234
+"""
+import argparse
+import asyncio
+import collections
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import random
+import sys
+import time
+from typing import Dict, List, Any, Optional
+
+# mclient 디렉토리를 Python 경로에 추가 (실제 메시지 빌더 재사용)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import websockets
+
+from websocket_client import (
+    build_register_message,
+    build_heartbeat_message,
+    build_stats_message,
+    build_summary_message,
+)
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+logger = logging.getLogger("loadgen")
+
+# 지연 측정에 사용하는 ACK 종류
+ACK_KINDS = ("register", "stats", "heartbeat", "summary", "command")
+# 보고 주기마다 프로세스별로 넘기는 최대 지연 샘플 수 (종류별)
+MAX_SAMPLES_PER_REPORT = 20000
+# 실제 mclient 와 같은 60회 주기 요약
+SUMMARY_EVERY = 60
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """정렬된 목록의 백분위 값"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def make_system_metrics(host_name: str, rng: random.Random) -> Dict[str, Any]:
+    """SystemInfo.collect() 와 같은 구조의 시스템 메트릭"""
+    memory_total = 64 * 1024 ** 3
+    disk_total = 2 * 1024 ** 4
+    return {
+        "host_name": host_name,
+        "cpu_model": "Apple M2 Pro (arm64)",
+        "cpu_usage": 0.0,
+        "cpu_cores": 12,
+        "cpu_perf_cores": 8,
+        "cpu_eff_cores": 4,
+        "cpu_user": 0.0,
+        "cpu_system": 0.0,
+        "cpu_idle": 100.0,
+        "host_memory_total": memory_total,
+        "docker_available": True,
+        "docker_memory_total": memory_total // 2,
+        "docker_memory_used": 0,
+        "docker_memory_percent": 0.0,
+        "swap_total": 4 * 1024 ** 3,
+        "swap_used": rng.randint(0, 1024 ** 3),
+        "uptime": rng.randint(3600, 90 * 86400),
+        "disk_total": disk_total,
+        "disk_used": disk_total // 3,
+        "disk_available": disk_total - disk_total // 3,
+        "disk_percent": 33.3,
+    }
+
+
+def make_container(name: str, index: int, rng: random.Random, pad_bytes: int = 0) -> Dict[str, Any]:
+    """DockerStatsClient 가 만드는 것과 같은 구조의 노드 컨테이너 통계"""
+    block = rng.randint(1_000_000, 9_000_000)
+    container = {
+        "id": f"{rng.getrandbits(48):012x}",
+        "name": name,
+        "status": "running",
+        "cpu": {"percent": 0.0, "cores": 12},
+        "memory": {"usage": 0, "limit": 16 * 1024 ** 3, "percent": 0.0},
+        "network": {"rx": rng.randint(0, 10 ** 9), "tx": rng.randint(0, 10 ** 9)},
+        "disk": {"read": rng.randint(0, 10 ** 9), "write": rng.randint(0, 10 ** 9)},
+        "nickname": "",
+        "timestamp": int(time.time() * 1000),
+        "node_type": "creditcoin3",
+        "sync_state": "synced",
+        "blockchain": {
+            "current_block": block,
+            "finalized_block": block - 2,
+            "target_block": block,
+            "starting_block": 0,
+            "peers": rng.randint(8, 40),
+        },
+        "rpc_port": 33980 + index,
+    }
+    if pad_bytes > 0:
+        # 실제 컨테이너 정보가 큰 경우를 흉내 (라벨/환경 정보 등)
+        container["labels"] = {"padding": "x" * pad_bytes}
+    return container
+
+
+class SimulatedClient:
+    """가상 mclient 하나 (등록 → 주기적 stats/heartbeat/summary 전송)"""
+
+    def __init__(self, worker: "LoadWorker", server_id: str, rng: random.Random):
+        self.worker = worker
+        self.server_id = server_id
+        self.rng = rng
+        self.ws = None
+        self.sequence_number = 0
+        self.frames_sent = 0
+        host_name = f"loadgen-{server_id}"
+        config = worker.config
+        self.system = make_system_metrics(host_name, rng)
+        pad = config.payload_pad // max(1, config.containers)
+        self.containers = [make_container(f"3node{i}", i, rng, pad) for i in range(config.containers)]
+        self.node_names = [c["name"] for c in self.containers]
+        # ACK 대기: stats 는 시퀀스로, 나머지는 전송 순서(FIFO)로 매칭
+        self.pending_stats: Dict[int, float] = {}
+        self.pending_fifo: Dict[str, collections.deque] = {
+            "heartbeat": collections.deque(),
+            "summary": collections.deque(),
+        }
+        self.pending_commands: Dict[str, float] = {}
+
+    def _next_stats(self) -> Dict[str, Any]:
+        """직전 값을 조금씩 바꾼 stats 데이터"""
+        rng = self.rng
+        system = self.system
+        system["cpu_usage"] = round(rng.uniform(5, 60), 2)
+        system["cpu_user"] = round(system["cpu_usage"] * 0.7, 2)
+        system["cpu_system"] = round(system["cpu_usage"] * 0.3, 2)
+        system["cpu_idle"] = round(100 - system["cpu_usage"], 2)
+        system["docker_memory_used"] = int(system["docker_memory_total"] * rng.uniform(0.3, 0.8))
+        system["docker_memory_percent"] = round(system["docker_memory_used"] / system["docker_memory_total"] * 100, 2)
+        now_ms = int(time.time() * 1000)
+        for container in self.containers:
+            container["cpu"]["percent"] = round(rng.uniform(1, 120), 2)
+            container["memory"]["usage"] = int(container["memory"]["limit"] * rng.uniform(0.2, 0.6))
+            container["memory"]["percent"] = round(container["memory"]["usage"] / container["memory"]["limit"] * 100, 2)
+            container["network"]["rx"] += rng.randint(0, 500_000)
+            container["network"]["tx"] += rng.randint(0, 500_000)
+            container["timestamp"] = now_ms
+            chain = container["blockchain"]
+            if rng.random() < 0.16:   # 블록 시간 약 6초
+                chain["current_block"] += 1
+                chain["target_block"] = chain["current_block"]
+                chain["finalized_block"] = chain["current_block"] - 2
+        return {
+            "system": system,
+            "containers": self.containers,
+            "configured_nodes": self.node_names,
+        }
+
+    async def _send(self, message: Dict[str, Any]):
+        await self.ws.send(json.dumps(message))
+        self.worker.frames_sent += 1
+        self.frames_sent += 1
+
+    async def _receive(self):
+        """서버 메시지 수신 및 ACK 지연 기록"""
+        async for message in self.ws:
+            now = time.perf_counter()
+            self.worker.frames_received += 1
+            try:
+                data = json.loads(message)
+            except json.JSONDecodeError:
+                self.worker.errors += 1
+                continue
+            msg_type = data.get("type")
+            if msg_type == "stats_ack":
+                sent = self.pending_stats.pop(data.get("sequence"), None)
+                if sent is not None:
+                    self.worker.record("stats", now - sent)
+            elif msg_type == "heartbeat_ack":
+                if self.pending_fifo["heartbeat"]:
+                    self.worker.record("heartbeat", now - self.pending_fifo["heartbeat"].popleft())
+            elif msg_type == "summary_ack":
+                if self.pending_fifo["summary"]:
+                    self.worker.record("summary", now - self.pending_fifo["summary"].popleft())
+            elif msg_type == "command_ack":
+                sent = self.pending_commands.pop(data.get("command_id"), None)
+                if sent is not None:
+                    self.worker.record("command", now - sent)
+            elif msg_type == "command":
+                # 서버가 보낸 명령에는 실제 클라이언트처럼 즉시 응답
+                command = data.get("data", {})
+                await self._send_command_response(command.get("id", "unknown"), command.get("command"))
+            elif msg_type == "ping":
+                await self._send({"type": "pong"})
+            elif msg_type == "error":
+                self.worker.errors += 1
+
+    async def _send_command_response(self, command_id: str, command: Optional[str]):
+        self.pending_commands[command_id] = time.perf_counter()
+        await self._send({
+            "type": "command_response",
+            "data": {
+                "command_id": command_id,
+                "status": "completed",
+                "result": {"command": command, "output": "ok"},
+                "error": None,
+                "timestamp": int(time.time()),
+            },
+        })
+
+    async def _session(self):
+        """연결 하나의 수명 (등록부터 연결 종료까지)"""
+        config = self.worker.config
+        started = time.perf_counter()
+        self.ws = await websockets.connect(
+            config.url,
+            extra_headers={"User-Agent": "mclient-loadgen"},
+            ping_interval=None,
+            close_timeout=2,
+            max_size=10_485_760,
+            compression=None,
+        )
+        await self.ws.send(json.dumps(build_register_message(self.server_id)))
+        response = json.loads(await asyncio.wait_for(self.ws.recv(), timeout=10))
+        if response.get("type") != "register_ack" or response.get("status") != "success":
+            raise RuntimeError(f"등록 실패: {response}")
+        self.worker.record("register", time.perf_counter() - started)
+        self.worker.connected += 1
+        self.pending_stats.clear()
+        for pending in self.pending_fifo.values():
+            pending.clear()
+        self.pending_commands.clear()
+
+        receiver = asyncio.create_task(self._receive())
+        try:
+            # 같은 시각에 몰리지 않도록 첫 전송을 분산
+            await asyncio.sleep(self.rng.uniform(0, config.interval))
+            last_heartbeat = time.monotonic()
+            next_send = time.monotonic()
+            while not receiver.done():
+                self.sequence_number += 1
+                message = build_stats_message(self.server_id, self.sequence_number, int(config.interval), self._next_stats())
+                self.pending_stats[self.sequence_number] = time.perf_counter()
+                await self._send(message)
+
+                if self.sequence_number % SUMMARY_EVERY == 0:
+                    self.sequence_number += 1
+                    self.pending_fifo["summary"].append(time.perf_counter())
+                    await self._send(build_summary_message(self.server_id, self.sequence_number, int(config.interval), self._next_stats()))
+
+                if config.command_mix and self.rng.random() < config.command_mix:
+                    await self._send_command_response(f"loadgen-{self.server_id}-{self.sequence_number}", "status")
+
+                if time.monotonic() - last_heartbeat >= config.heartbeat:
+                    last_heartbeat = time.monotonic()
+                    self.pending_fifo["heartbeat"].append(time.perf_counter())
+                    await self._send(build_heartbeat_message(self.server_id))
+
+                # 느린 서버 때문에 전송 주기가 밀리지 않도록 절대 시각 기준으로 대기
+                next_send += config.interval
+                delay = next_send - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    self.worker.late_frames += 1
+                    next_send = time.monotonic()
+        finally:
+            self.worker.connected -= 1
+            receiver.cancel()
+            if not self.ws.closed:
+                await self.ws.close()
+
+    async def run(self, stop: asyncio.Event):
+        """연결이 끊기면 재연결 (churn 또는 서버 종료)"""
+        config = self.worker.config
+        while not stop.is_set():
+            try:
+                await self._session()
+            except asyncio.CancelledError:
+                raise
+            except websockets.exceptions.ConnectionClosed:
+                pass
+            except Exception as e:
+                self.worker.errors += 1
+                logger.debug(f"{self.server_id} 세션 오류: {e}")
+            if stop.is_set():
+                break
+            self.worker.reconnects += 1
+            await asyncio.sleep(config.reconnect_delay * self.rng.uniform(0.5, 1.5))
+
+    def drop(self):
+        """churn: 연결을 강제로 끊음 (run() 이 재연결)"""
+        if self.ws is not None and not self.ws.closed:
+            asyncio.create_task(self.ws.close())
+            return True
+        return False
+
+
+class LoadWorker:
+    """프로세스 하나에서 가상 클라이언트 묶음을 실행"""
+
+    def __init__(self, config, worker_index: int, client_ids: List[str], report_queue):
+        self.config = config
+        self.worker_index = worker_index
+        self.client_ids = client_ids
+        self.report_queue = report_queue
+        self.rng = random.Random(config.seed + worker_index)
+        self.clients: List[SimulatedClient] = []
+        self.samples: Dict[str, List[float]] = {kind: [] for kind in ACK_KINDS}
+        self.connected = 0
+        self.frames_sent = 0
+        self.frames_received = 0
+        self.late_frames = 0
+        self.reconnects = 0
+        self.errors = 0
+
+    def record(self, kind: str, seconds: float):
+        samples = self.samples[kind]
+        if len(samples) < MAX_SAMPLES_PER_REPORT:
+            samples.append(seconds)
+        elif self.rng.random() < 0.1:
+            # 한도를 넘으면 일부만 교체 (대략적인 저수지 샘플링)
+            samples[self.rng.randrange(MAX_SAMPLES_PER_REPORT)] = seconds
+
+    def _flush_report(self):
+        report = {
+            "worker": self.worker_index,
+            "connected": self.connected,
+            "frames_sent": self.frames_sent,
+            "frames_received": self.frames_received,
+            "late_frames": self.late_frames,
+            "reconnects": self.reconnects,
+            "errors": self.errors,
+            "samples": self.samples,
+        }
+        self.samples = {kind: [] for kind in ACK_KINDS}
+        self.report_queue.put(report)
+
+    async def _churn_loop(self, stop: asyncio.Event):
+        """분당 config.churn 개의 연결을 임의로 끊음"""
+        rate = self.config.churn / 60.0
+        while not stop.is_set():
+            await asyncio.sleep(self.rng.expovariate(rate))
+            self.rng.choice(self.clients).drop()
+
+    async def run(self):
+        config = self.config
+        stop = asyncio.Event()
+        tasks = []
+        # 연결 폭주를 피하기 위해 ramp 시간 동안 나누어 시작
+        ramp_step = config.ramp / max(1, len(self.client_ids))
+        for server_id in self.client_ids:
+            client = SimulatedClient(self, server_id, random.Random(self.rng.getrandbits(32)))
+            self.clients.append(client)
+            tasks.append(asyncio.create_task(client.run(stop)))
+            if ramp_step:
+                await asyncio.sleep(ramp_step)
+        if config.churn > 0 and self.clients:
+            tasks.append(asyncio.create_task(self._churn_loop(stop)))
+
+        deadline = time.monotonic() + config.duration
+        while time.monotonic() < deadline:
+            await asyncio.sleep(min(config.report_interval, max(0.0, deadline - time.monotonic())))
+            self._flush_report()
+
+        stop.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._flush_report()
+
+
+def run_worker_process(config, worker_index: int, client_ids: List[str], report_queue):
+    """워커 프로세스 진입점"""
+    logging.basicConfig(level=logging.DEBUG if config.verbose else logging.WARNING,
+                        format=f"%(asctime)s - loadgen[{worker_index}] - %(levelname)s - %(message)s")
+    try:
+        asyncio.run(LoadWorker(config, worker_index, client_ids, report_queue).run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        report_queue.put({"worker": worker_index, "done": True})
+
+
+class ServerProbe:
+    """mserver 프로세스(및 워커 자식 프로세스)의 CPU/RSS 측정"""
+
+    def __init__(self, pid: Optional[int]):
+        self.processes = {}
+        self.root = None
+        if not PSUTIL_AVAILABLE or not pid:
+            return
+        try:
+            self.root = psutil.Process(pid)
+        except psutil.Error as e:
+            logger.warning(f"서버 프로세스를 찾을 수 없습니다 (PID {pid}): {e}")
+
+    @staticmethod
+    def find_pid(port: int) -> Optional[int]:
+        """포트를 LISTEN 중인 프로세스 PID (권한이 없으면 None)"""
+        if not PSUTIL_AVAILABLE:
+            return None
+        try:
+            for conn in psutil.net_connections(kind="tcp"):
+                if conn.status == psutil.CONN_LISTEN and conn.laddr and conn.laddr.port == port and conn.pid:
+                    parent = psutil.Process(conn.pid).parent()
+                    # 멀티 프로세스 모드면 코디네이터(부모)를 기준으로 측정
+                    if parent and "python" in (parent.name() or "") and parent.pid != 1:
+                        return parent.pid
+                    return conn.pid
+        except (psutil.Error, PermissionError):
+            pass
+        return None
+
+    def sample(self) -> Optional[Dict[str, float]]:
+        if self.root is None:
+            return None
+        try:
+            members = [self.root] + self.root.children(recursive=True)
+        except psutil.Error:
+            return None
+        cpu = 0.0
+        rss = 0
+        alive = {}
+        for proc in members:
+            # cpu_percent 는 같은 Process 객체로 이전 호출 이후 사용률을 계산
+            tracked = self.processes.get(proc.pid, proc)
+            try:
+                cpu += tracked.cpu_percent(None)
+                rss += tracked.memory_info().rss
+                alive[proc.pid] = tracked
+            except psutil.Error:
+                continue
+        self.processes = alive
+        return {"cpu_percent": cpu, "rss_mb": rss / 1024 / 1024, "processes": len(alive)}
+
+
+def format_latency(values: List[float]) -> str:
+    if not values:
+        return "-"
+    values.sort()
+    return (f"p50 {percentile(values, 50) * 1000:.1f} / p90 {percentile(values, 90) * 1000:.1f} / "
+            f"p99 {percentile(values, 99) * 1000:.1f} / max {values[-1] * 1000:.1f} ms (n={len(values)})")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="mserver 부하 테스트 (가상 mclient)")
+    parser.add_argument("--url", default="ws://127.0.0.1:8080/ws/monitoring/", help="mserver WebSocket URL")
+    parser.add_argument("--clients", type=int, default=1000, help="가상 클라이언트 수")
+    parser.add_argument("--processes", type=int, default=1, help="부하 생성 프로세스 수")
+    parser.add_argument("--interval", type=float, default=1.0, help="stats 전송 주기 (초)")
+    parser.add_argument("--containers", type=int, default=4, help="클라이언트당 노드 컨테이너 수")
+    parser.add_argument("--payload-pad", type=int, default=0, help="stats 프레임에 추가할 바이트 수")
+    parser.add_argument("--heartbeat", type=float, default=45, help="하트비트 주기 (초)")
+    parser.add_argument("--command-mix", type=float, default=0.0,
+                        help="stats 프레임당 command_response 를 섞어 보낼 확률 (0~1)")
+    parser.add_argument("--churn", type=float, default=0.0, help="프로세스당 분당 강제 재연결 수")
+    parser.add_argument("--reconnect-delay", type=float, default=1.0, help="재연결 대기 (초)")
+    parser.add_argument("--ramp", type=float, default=10.0, help="모든 클라이언트를 연결하는 데 걸리는 시간 (초)")
+    parser.add_argument("--duration", type=float, default=60.0, help="테스트 시간 (초, ramp 포함)")
+    parser.add_argument("--report-interval", type=float, default=5.0, help="중간 보고 주기 (초)")
+    parser.add_argument("--server-pid", type=int, help="CPU/RSS 를 측정할 mserver PID (미지정 시 포트로 탐색)")
+    parser.add_argument("--id-prefix", default="lg", help="클라이언트 serverId 접두사")
+    parser.add_argument("--seed", type=int, default=1, help="난수 시드")
+    parser.add_argument("--json", help="최종 결과를 저장할 JSON 파일")
+    parser.add_argument("--verbose", action="store_true", help="상세 로그")
+    return parser.parse_args()
+
+
+def main():
+    config = parse_args()
+    logging.basicConfig(level=logging.DEBUG if config.verbose else logging.INFO,
+                        format="%(asctime)s - loadgen - %(levelname)s - %(message)s")
+    # websocket_client 모듈 로그는 부하 테스트 출력에서 제외
+    logging.getLogger("websocket_client").setLevel(logging.WARNING)
+
+    server_pid = config.server_pid
+    if server_pid is None:
+        try:
+            port = int(config.url.split("://", 1)[1].split("/", 1)[0].rsplit(":", 1)[1])
+            server_pid = ServerProbe.find_pid(port)
+        except (IndexError, ValueError):
+            server_pid = None
+    probe = ServerProbe(server_pid)
+    if probe.root is None:
+        logger.info("서버 CPU/RSS 측정 안 함 (--server-pid 지정 또는 psutil 필요)")
+    else:
+        logger.info(f"서버 프로세스 측정: PID {probe.root.pid}")
+
+    client_ids = [f"{config.id_prefix}-{i:05d}" for i in range(config.clients)]
+    process_count = max(1, min(config.processes, config.clients))
+    report_queue = multiprocessing.Queue()
+    processes = []
+    for index in range(process_count):
+        proc = multiprocessing.Process(target=run_worker_process,
+                                       args=(config, index, client_ids[index::process_count], report_queue),
+                                       daemon=True)
+        proc.start()
+        processes.append(proc)
+    logger.info(f"가상 클라이언트 {config.clients}개 시작 ({process_count}개 프로세스, 주기 {config.interval}초)")
+
+    latest: Dict[int, Dict[str, Any]] = {}
+    window: Dict[str, List[float]] = {kind: [] for kind in ACK_KINDS}
+    totals: Dict[str, List[float]] = {kind: [] for kind in ACK_KINDS}
+    server_samples = []
+    done = set()
+    started = time.time()
+    last_report = started
+    last_sent = 0
+    last_received = 0
+
+    try:
+        while len(done) < process_count:
+            try:
+                report = report_queue.get(timeout=config.report_interval)
+            except queue.Empty:
+                report = None
+            if report is not None:
+                if report.get("done"):
+                    done.add(report["worker"])
+                else:
+                    latest[report["worker"]] = report
+                    for kind, values in report["samples"].items():
+                        window[kind].extend(values)
+                        totals[kind].extend(values)
+
+            now = time.time()
+            if now - last_report < config.report_interval and len(done) < process_count:
+                continue
+            elapsed = now - last_report
+            last_report = now
+            sent = sum(r["frames_sent"] for r in latest.values())
+            received = sum(r["frames_received"] for r in latest.values())
+            connected = sum(r["connected"] for r in latest.values())
+            server = probe.sample()
+            if server:
+                server_samples.append(server)
+            line = (f"[{now - started:6.1f}s] 연결 {connected}/{config.clients}, "
+                    f"송신 {(sent - last_sent) / elapsed:,.0f}/s, 수신 {(received - last_received) / elapsed:,.0f}/s, "
+                    f"stats ACK {format_latency(window['stats'])}")
+            if server:
+                line += f", 서버 CPU {server['cpu_percent']:.0f}% RSS {server['rss_mb']:.0f}MB"
+            logger.info(line)
+            last_sent = sent
+            last_received = received
+            window = {kind: [] for kind in ACK_KINDS}
+    except KeyboardInterrupt:
+        logger.info("중단 요청, 부하 생성 프로세스 종료")
+        for proc in processes:
+            proc.terminate()
+
+    for proc in processes:
+        proc.join(timeout=10)
+
+    total_time = time.time() - started
+    sent = sum(r["frames_sent"] for r in latest.values())
+    received = sum(r["frames_received"] for r in latest.values())
+    result = {
+        "clients": config.clients,
+        "processes": process_count,
+        "interval": config.interval,
+        "containers": config.containers,
+        "duration": total_time,
+        "frames_sent": sent,
+        "frames_received": received,
+        "frames_per_second": sent / total_time if total_time else 0,
+        "late_frames": sum(r["late_frames"] for r in latest.values()),
+        "reconnects": sum(r["reconnects"] for r in latest.values()),
+        "errors": sum(r["errors"] for r in latest.values()),
+        "latency_ms": {},
+    }
+    print("\n=== 부하 테스트 결과 ===")
+    print(f"클라이언트 {config.clients}개, {total_time:.1f}초, 송신 {sent:,}건 ({result['frames_per_second']:,.0f}/s), 수신 {received:,}건")
+    print(f"지연 전송 {result['late_frames']:,}건, 재연결 {result['reconnects']:,}회, 오류 {result['errors']:,}건")
+    for kind in ACK_KINDS:
+        values = sorted(totals[kind])
+        if values:
+            result["latency_ms"][kind] = {
+                "count": len(values),
+                "p50": percentile(values, 50) * 1000,
+                "p90": percentile(values, 90) * 1000,
+                "p99": percentile(values, 99) * 1000,
+                "max": values[-1] * 1000,
+            }
+            print(f"{kind:>9} ACK: {format_latency(values)}")
+    if server_samples:
+        result["server"] = {
+            "cpu_percent_avg": sum(s["cpu_percent"] for s in server_samples) / len(server_samples),
+            "cpu_percent_max": max(s["cpu_percent"] for s in server_samples),
+            "rss_mb_max": max(s["rss_mb"] for s in server_samples),
+        }
+        print(f"서버 CPU 평균 {result['server']['cpu_percent_avg']:.0f}% (최대 {result['server']['cpu_percent_max']:.0f}%), "
+              f"RSS 최대 {result['server']['rss_mb_max']:.0f}MB")
+
+    if config.json:
+        with open(config.json, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"결과 저장: {config.json}")
+
+
+if __name__ == "__main__":
+    main()
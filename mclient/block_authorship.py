@@ -0,0 +1,231 @@
+# block_authorship.py
+import asyncio
+import logging
+from collections import deque
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+from chain_registry import chain_registry
+from substrate_utils import (
+    storage_key, hex_to_bytes, ss58_decode, header_babe_pre_digest, decode_babe_authorities,
+)
+
+logger = logging.getLogger(__name__)
+
+BABE_AUTHORITIES_KEY = storage_key("Babe", "Authorities")
+# 체인마다 보관할 지난 epoch 요약 수
+EPOCH_HISTORY = 3
+# 빠진 블록(조회 모드, 재구독 사이)을 한 번에 채우는 최대 블록 수
+MAX_BACKFILL_BLOCKS = 100
+# 동시에 실행할 조회 수 (조회마다 docker exec 프로세스 하나)
+MAX_CONCURRENT_QUERIES = 4
+
+
+async def _gather_limited(coros, limit: int = MAX_CONCURRENT_QUERIES, return_exceptions: bool = False) -> List[Any]:
+    """asyncio.gather 와 같지만 동시에 limit 개까지만 실행"""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(coro):
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(*[run(coro) for coro in coros], return_exceptions=return_exceptions)
+
+
+class _EpochProduction:
+    """체인 하나의 현재 epoch 블록 생성 집계"""
+
+    __slots__ = ("epoch", "authorities", "assigned", "produced", "seen_slots", "first_slot", "last_slot", "gaps")
+
+    def __init__(self, epoch: int):
+        self.epoch = epoch
+        self.authorities: Dict[int, str] = {}      # authority index -> 노드 이름
+        self.assigned: Dict[str, Set[int]] = {}    # 노드 이름 -> 할당된 슬롯 (babe_epochAuthorship)
+        self.produced: Dict[str, Set[int]] = {}    # 노드 이름 -> 생성한 블록의 슬롯
+        self.seen_slots: Set[int] = set()
+        self.first_slot: Optional[int] = None
+        self.last_slot: Optional[int] = None
+        self.gaps: List[Tuple[int, int]] = []     # 헤더를 받지 못한 슬롯 구간 (양 끝 제외)
+
+    def add_slot(self, slot: int, node_name: Optional[str]):
+        self.seen_slots.add(slot)
+        if self.first_slot is None or slot < self.first_slot:
+            self.first_slot = slot
+        if self.last_slot is None or slot > self.last_slot:
+            self.last_slot = slot
+        if node_name is not None:
+            self.produced.setdefault(node_name, set()).add(slot)
+
+    def observed(self, slot: int) -> bool:
+        """지금까지 본 슬롯 범위 안이고 헤더를 받지 못한 구간에 속하지 않는 슬롯인지"""
+        if self.first_slot is None or not self.first_slot <= slot <= self.last_slot:
+            return False
+        return not any(start < slot < end for start, end in self.gaps)
+
+    def nodes(self) -> Dict[str, Dict[str, Any]]:
+        """노드별 할당/예상/생성/누락 수 (예상 = 헤더를 받은 슬롯 범위 안의 할당 슬롯)"""
+        result = {}
+        for node_name, assigned in self.assigned.items():
+            produced = self.produced.get(node_name, set())
+            expected = {slot for slot in assigned if self.observed(slot)}
+            result[node_name] = {
+                "assigned": len(assigned),
+                "expected": len(expected),
+                "produced": len(produced),
+                "missed": len(expected - produced),
+            }
+        return result
+
+
+class BlockAuthorshipTracker:
+    """헤더의 BABE 사전 다이제스트로 우리 노드의 블록 생성 수를 epoch 단위로 집계
+
+    - epoch 가 바뀌면 Babe.Authorities 와 노드별 babe_epochAuthorship 결과(공개키, 슬롯)로
+      authority index -> 노드 맵과 할당 슬롯을 만듦
+    - 새 헤더(chain_subscribeNewHeads 또는 조회한 헤더)마다 다이제스트의 authority index 와 슬롯만
+      읽어 누적하므로 블록당 추가 RPC 호출이 없음
+    - 재구독/조회 사이에 빠진 블록은 MAX_BACKFILL_BLOCKS 까지 채우고, 그래도 남은 구간의 슬롯은
+      예상 슬롯에서 제외
+    - 끝난 epoch 는 요약으로 남기고 summary() 로 현재 epoch 와 함께 보고
+    """
+
+    def __init__(self, registry=None, command_handler=None, history: int = EPOCH_HISTORY):
+        self.registry = registry or chain_registry
+        self.command_handler = command_handler
+        self.current: Dict[str, _EpochProduction] = {}   # genesis -> 현재 epoch 집계
+        self.history: Dict[str, deque] = {}              # genesis -> 끝난 epoch 요약
+        self.history_size = history
+        self.last_number: Dict[str, int] = {}            # genesis -> 마지막으로 처리한 블록 번호
+        self.last_number_slot: Dict[str, int] = {}       # genesis -> 그 블록의 슬롯
+        self.stats = {"headers": 0, "backfilled": 0, "epochs": 0}
+
+    def _handler(self):
+        if self.command_handler is None:
+            from command_handler import CommandHandler
+            self.command_handler = CommandHandler()
+        return self.command_handler
+
+    async def on_epoch(self, genesis: str, epoch: int):
+        """새 epoch: 이전 epoch 를 요약으로 넘기고 authority 맵과 할당 슬롯을 다시 만듦"""
+        chain = self.registry.chain(genesis)
+        previous = self.current.get(genesis)
+        if previous is not None and previous.epoch == epoch:
+            return
+        if previous is not None:
+            self._finish_epoch(genesis, chain.name, previous)
+
+        production = _EpochProduction(epoch)
+        self.current[genesis] = production
+        self.stats["epochs"] += 1
+        try:
+            value = await self.registry.query(genesis, "state_getStorage", [BABE_AUTHORITIES_KEY], ttl=0)
+            authorities = decode_babe_authorities(hex_to_bytes(value))[0] if value else []
+            index_of = {authority: index for index, authority in enumerate(authorities)}
+
+            node_names = list(chain.nodes)
+            results = await _gather_limited([
+                self._handler().find_validator(node_name, {"deep_search": False}) for node_name in node_names
+            ], return_exceptions=True)
+            for node_name, result in zip(node_names, results):
+                if isinstance(result, Exception):
+                    logger.debug(f"{node_name}: epoch {epoch} 할당 슬롯 확인 실패: {result}")
+                    continue
+                if not result.get("is_validator"):
+                    continue
+                production.assigned[node_name] = set(result.get("slots", []))
+                for babe_key in result.get("babe_keys", []):
+                    index = index_of.get(ss58_decode(babe_key))
+                    if index is not None:
+                        production.authorities[index] = node_name
+            logger.info(f"{chain.name}: epoch {epoch} 블록 생성 추적 시작 "
+                        f"(authority {len(authorities)}개, 우리 검증인 {len(production.assigned)}개)")
+        except Exception as e:
+            logger.error(f"{chain.name}: epoch {epoch} authority 확인 실패: {e}")
+
+    def _finish_epoch(self, genesis: str, chain_name: str, production: _EpochProduction):
+        nodes = production.nodes()
+        self.history.setdefault(genesis, deque(maxlen=self.history_size)).append({
+            "epoch": production.epoch,
+            "blocks": len(production.seen_slots),
+            "nodes": nodes,
+        })
+        for node_name, counts in nodes.items():
+            log = logger.warning if counts["missed"] else logger.info
+            log(f"{chain_name}: {node_name} epoch {production.epoch} 블록 생성 "
+                f"{counts['produced']}/{counts['expected']} (누락 {counts['missed']})")
+
+    def on_header(self, genesis: str, header: Dict[str, Any]):
+        """새 헤더 하나 처리 (다이제스트 디코딩만 하고 RPC 호출 없음)"""
+        production = self.current.get(genesis)
+        if production is None or not header:
+            return
+        try:
+            number = int(header.get("number", "0x0"), 16)
+            pre_digest = header_babe_pre_digest(header)
+        except (TypeError, ValueError) as e:
+            logger.debug(f"헤더 디코딩 실패: {e}")
+            return
+        if pre_digest is None:
+            return
+        self.stats["headers"] += 1
+        slot = pre_digest["slot"]
+        last = self.last_number.get(genesis)
+        if last is None or number > last:
+            if last is not None and number > last + 1 and genesis in self.last_number_slot:
+                # 채우지 못한 블록 사이의 슬롯은 예상 슬롯에서 제외 (누락으로 세지 않음)
+                production.gaps.append((self.last_number_slot[genesis], slot))
+            self.last_number[genesis] = number
+            self.last_number_slot[genesis] = slot
+        production.add_slot(slot, production.authorities.get(pre_digest["authority_index"]))
+
+    async def on_new_head(self, genesis: str, header: Dict[str, Any]):
+        """구독/조회로 받은 최신 헤더 처리 (재연결 등으로 빠진 블록이 있으면 먼저 채움)"""
+        if genesis not in self.current or not header:
+            return
+        try:
+            number = int(header.get("number", "0x0"), 16)
+        except (TypeError, ValueError):
+            number = None
+        last = self.last_number.get(genesis)
+        if number is not None and last is not None and last < number - 1:
+            try:
+                await self._backfill(genesis, last, number)
+            except Exception as e:
+                logger.debug(f"{self.registry.chain(genesis).name}: 빠진 블록 헤더 조회 실패: {e}")
+        self.on_header(genesis, header)
+
+    async def _backfill(self, genesis: str, last: int, best_number: int):
+        """last 와 best_number 사이의 헤더를 최근 MAX_BACKFILL_BLOCKS 개까지 조회해 처리 (동시 조회는 MAX_CONCURRENT_QUERIES 개)"""
+        numbers = list(range(max(last + 1, best_number - MAX_BACKFILL_BLOCKS), best_number))
+        hashes = await _gather_limited([
+            self.registry.query(genesis, "chain_getBlockHash", [number], ttl=0) for number in numbers
+        ])
+        headers = await _gather_limited([
+            self.registry.query(genesis, "chain_getHeader", [block_hash], ttl=0) for block_hash in hashes if block_hash
+        ])
+        self.stats["backfilled"] += len(headers)
+        for header in headers:
+            self.on_header(genesis, header)
+
+    async def poll(self, genesis: str):
+        """구독을 사용할 수 없을 때: 최신 헤더를 조회하고 빠진 블록은 MAX_BACKFILL_BLOCKS 까지 채움"""
+        if genesis not in self.current:
+            return
+        best = await self.registry.query(genesis, "chain_getHeader", ttl=0)
+        await self.on_new_head(genesis, best)
+
+    def summary(self) -> Dict[str, Any]:
+        """체인별 현재 epoch 집계와 지난 epoch 요약"""
+        chains = {}
+        for genesis, production in self.current.items():
+            chains[genesis] = {
+                "name": self.registry.chain(genesis).name,
+                "epoch": production.epoch,
+                "blocks": len(production.seen_slots),
+                "nodes": production.nodes(),
+                "history": list(self.history.get(genesis, [])),
+            }
+        return chains
+
+
+# 프로세스 전역 인스턴스
+block_tracker = BlockAuthorshipTracker()
@@ -0,0 +1,333 @@
+# chain_registry.py
+import asyncio
+import contextlib
+import json
+import logging
+import socket
+import time
+from typing import Dict, List, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 체인 전역 조회 결과 기본 캐시 시간 (초)
+GLOBAL_QUERY_TTL = 30.0
+# 체인마다 캐시할 최대 조회 결과 수 (넘으면 만료된 결과, 그다음 오래된 결과부터 제거)
+MAX_CACHED_QUERIES = 256
+# 조회 노드가 없을 때 응답한 노드의 동기화 상태(system_health)를 다시 확인하는 최소 간격 (초)
+HEALTH_CHECK_INTERVAL = 60.0
+# 컨테이너 안에서 127.0.0.1:<port> 로 TCP 연결을 열고 stdin/stdout 과 중계하는 스크립트
+# (노드 RPC 는 --rpc-external 없이 컨테이너 localhost 에서만 받으므로 호스트에서 직접 연결 불가)
+NODE_RELAY_SCRIPT = 'exec 3<>/dev/tcp/127.0.0.1/{port} || exit 1; cat <&3 & cat >&3; kill $! 2>/dev/null'
+
+
+def node_rpc_port(container_name: str) -> Optional[int]:
+    """컨테이너 이름으로 RPC 포트 결정 (3nodeN: 33980+N, nodeN: 33880+N, addnode.sh 와 동일)"""
+    if container_name.startswith('3node'):
+        return 33980 + int(container_name.replace('3node', ''))
+    if container_name.startswith('node'):
+        return 33880 + int(container_name.replace('node', ''))
+    return None
+
+
+@contextlib.asynccontextmanager
+async def node_socket(container_name: str, port: int):
+    """docker exec 로 컨테이너 안의 127.0.0.1:port 에 연결한 소켓 (웹소켓 구독용)
+
+    컨테이너 안의 bash 가 TCP 연결을 열고 docker exec 의 stdin/stdout 과 중계한다.
+    반환한 소켓 쌍의 반대쪽과 docker exec 파이프 사이는 두 태스크가 복사하며,
+    컨텍스트를 벗어나면 태스크와 docker exec 프로세스를 정리한다.
+    """
+    process = await asyncio.create_subprocess_exec(
+        'docker', 'exec', '-i', container_name, 'bash', '-c', NODE_RELAY_SCRIPT.format(port=port),
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL
+    )
+    local, remote = socket.socketpair()
+    reader, writer = await asyncio.open_connection(sock=remote)
+
+    async def pump_out():
+        # 노드 -> 소켓 (연결이 끊기면 소켓도 닫아 웹소켓 쪽에서 종료를 알 수 있게 함)
+        try:
+            while data := await process.stdout.read(65536):
+                writer.write(data)
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def pump_in():
+        # 소켓 -> 노드
+        while data := await reader.read(65536):
+            process.stdin.write(data)
+            await process.stdin.drain()
+        process.stdin.close()
+
+    pumps = [asyncio.create_task(pump_out()), asyncio.create_task(pump_in())]
+    try:
+        yield local
+    finally:
+        for task in pumps:
+            task.cancel()
+        await asyncio.gather(*pumps, return_exceptions=True)
+        writer.close()
+        local.close()
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+
+
+async def node_rpc(container_name: str, port: int, method: str, params: List[Any]) -> Any:
+    """docker exec curl 로 JSON-RPC 호출 (요청 본문은 stdin 으로 전달해 인자 길이 제한 회피)"""
+    payload = json.dumps({
+        "jsonrpc": "2.0",
+        "method": method,
+        "params": params,
+        "id": 1
+    }).encode()
+    cmd = [
+        'docker', 'exec', '-i', container_name,
+        'curl', '-s', '-H', 'Content-Type: application/json',
+        '--data-binary', '@-',
+        f'http://localhost:{port}/'
+    ]
+
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        stdout, stderr = await process.communicate(payload)
+    except asyncio.CancelledError:
+        # 경쟁에서 진 조회가 취소되면 docker exec 프로세스도 정리
+        if process.returncode is None:
+            process.kill()
+        raise
+
+    if process.returncode != 0:
+        raise RuntimeError(f"{method} 실패: {stderr.decode().strip()}")
+    response = json.loads(stdout.decode())
+    if 'error' in response:
+        raise RuntimeError(f"{method} 오류: {response['error'].get('message')}")
+    return response.get('result')
+
+
+def _consume_exception(task: asyncio.Task):
+    """기다리는 쪽이 모두 취소된 조회의 예외로 "Task exception was never retrieved" 경고가 나지 않도록 소비"""
+    if not task.cancelled():
+        task.exception()
+
+
+class ChainNodes:
+    """같은 genesis 를 가진 노드 묶음과 체인 전역 조회 캐시"""
+
+    def __init__(self, genesis: str, name: str):
+        self.genesis = genesis
+        self.name = name
+        self.nodes: List[str] = []
+        self.preferred: Optional[str] = None  # 동기화되고 피어가 있는 것으로 확인된 조회 노드
+        self.cache: Dict[str, Tuple[float, Any]] = {}  # 조회 키 -> (만료 시각, 결과)
+        self.inflight: Dict[str, asyncio.Task] = {}  # 같은 조회가 동시에 들어오면 공유
+        self.health_checked: Dict[str, float] = {}  # 컨테이너 -> 마지막 동기화 상태 확인 시각
+
+    def store(self, key: str, expires: float, result: Any):
+        """조회 결과 캐시 (MAX_CACHED_QUERIES 를 넘지 않도록 만료된 결과, 오래된 결과 순으로 제거)"""
+        if key not in self.cache and len(self.cache) >= MAX_CACHED_QUERIES:
+            now = time.monotonic()
+            for expired in [k for k, (until, _) in self.cache.items() if until <= now]:
+                del self.cache[expired]
+            while len(self.cache) >= MAX_CACHED_QUERIES:
+                del self.cache[next(iter(self.cache))]
+        self.cache.pop(key, None)
+        self.cache[key] = (expires, result)
+
+    def candidates(self) -> List[str]:
+        """조회를 보낼 노드 순서 (정상 응답했던 노드 우선)"""
+        if self.preferred in self.nodes:
+            return [self.preferred] + [node for node in self.nodes if node != self.preferred]
+        return list(self.nodes)
+
+
+class ChainRegistry:
+    """genesis 해시 기준 체인 레지스트리
+
+    - 컨테이너마다 genesis 해시를 한 번 조회해 같은 체인의 노드끼리 묶음
+    - era, 검증인 목록, finalized 상태 같은 체인 전역 조회는 체인당 정상 노드 하나로만 보내고
+      결과를 TTL 동안 그 체인의 모든 노드가 공유 (실패하면 다음 노드로 넘어감)
+    - 피어 수, 동기화 상태, 세션 키 같은 노드별 조회는 node_rpc 로 각 노드에 직접 보냄
+    """
+
+    def __init__(self, default_ttl: float = GLOBAL_QUERY_TTL):
+        self.default_ttl = default_ttl
+        self.chains: Dict[str, ChainNodes] = {}
+        self.node_genesis: Dict[str, str] = {}  # 컨테이너 -> genesis 해시
+        self.stats = {
+            "queries": 0,
+            "cache_hits": 0,
+            "rpc_calls": 0,
+            "failovers": 0,
+        }
+
+    async def resolve(self, container_name: str) -> Optional[str]:
+        """컨테이너가 속한 체인의 genesis 해시 (처음 한 번만 조회)"""
+        genesis = self.node_genesis.get(container_name)
+        if genesis:
+            return genesis
+        port = node_rpc_port(container_name)
+        if port is None:
+            return None
+        try:
+            genesis, name = await asyncio.gather(
+                node_rpc(container_name, port, "chain_getBlockHash", [0]),
+                node_rpc(container_name, port, "system_chain", [])
+            )
+        except Exception as e:
+            logger.debug(f"{container_name}: genesis 조회 실패: {e}")
+            return None
+        if not genesis:
+            return None
+
+        chain = self.chains.get(genesis)
+        if chain is None:
+            chain = ChainNodes(genesis, name or genesis[:10])
+            self.chains[genesis] = chain
+            logger.info(f"체인 등록: {chain.name} (genesis {genesis[:18]}...)")
+        if container_name not in chain.nodes:
+            chain.nodes.append(container_name)
+            chain.nodes.sort()
+        self.node_genesis[container_name] = genesis
+        return genesis
+
+    async def group(self, containers: List[str]) -> Tuple[Dict[str, List[str]], List[str]]:
+        """컨테이너를 체인별로 묶음 -> ({genesis: [컨테이너]}, genesis 를 알 수 없는 컨테이너)"""
+        resolved = await asyncio.gather(*[self.resolve(container) for container in containers])
+        groups: Dict[str, List[str]] = {}
+        unresolved = []
+        for container, genesis in zip(containers, resolved):
+            if genesis:
+                groups.setdefault(genesis, []).append(container)
+            else:
+                unresolved.append(container)
+        return groups, unresolved
+
+    def chain(self, genesis: str) -> Optional[ChainNodes]:
+        return self.chains.get(genesis)
+
+    def chain_of(self, container_name: str) -> Optional[ChainNodes]:
+        genesis = self.node_genesis.get(container_name)
+        return self.chains.get(genesis) if genesis else None
+
+    def mark_healthy(self, container_name: str):
+        """노드가 동기화된 상태로 응답함 -> 이후 체인 전역 조회를 이 노드로 보냄"""
+        chain = self.chain_of(container_name)
+        if chain and chain.preferred != container_name:
+            chain.preferred = container_name
+            logger.info(f"{chain.name}: 체인 조회 노드 {container_name}")
+
+    def forget(self, container_name: str):
+        """컨테이너가 사라졌거나 다른 체인으로 바뀐 경우 다시 조회하도록 제거"""
+        genesis = self.node_genesis.pop(container_name, None)
+        chain = self.chains.get(genesis) if genesis else None
+        if chain:
+            if container_name in chain.nodes:
+                chain.nodes.remove(container_name)
+            if chain.preferred == container_name:
+                chain.preferred = None
+
+    async def query(self, genesis: str, method: str, params: Optional[List[Any]] = None,
+                    ttl: Optional[float] = None) -> Any:
+        """체인 전역 조회 (TTL 동안 캐시, ttl=0 이면 캐시하지 않고 노드 선택/장애 전환만 사용)"""
+        chain = self.chains.get(genesis)
+        if chain is None:
+            raise RuntimeError(f"등록되지 않은 체인: {genesis}")
+        params = params or []
+        ttl = self.default_ttl if ttl is None else ttl
+        key = method + json.dumps(params, separators=(',', ':'))
+        self.stats["queries"] += 1
+
+        now = time.monotonic()
+        cached = chain.cache.get(key) if ttl > 0 else None
+        if cached and cached[0] > now:
+            self.stats["cache_hits"] += 1
+            return cached[1]
+
+        inflight = chain.inflight.get(key)
+        if inflight is not None:
+            self.stats["cache_hits"] += 1
+        else:
+            # 조회는 호출한 태스크와 분리해 실행 (먼저 요청한 쪽이 취소되어도 기다리는 다른 쪽은 결과를 받음)
+            inflight = asyncio.create_task(self._fetch(chain, key, method, params, ttl))
+            inflight.add_done_callback(_consume_exception)
+            chain.inflight[key] = inflight
+        return await asyncio.shield(inflight)
+
+    async def _fetch(self, chain: ChainNodes, key: str, method: str, params: List[Any], ttl: float) -> Any:
+        try:
+            result = await self._query_nodes(chain, method, params)
+            if ttl > 0:
+                chain.store(key, time.monotonic() + ttl, result)
+            return result
+        finally:
+            chain.inflight.pop(key, None)
+
+    async def _query_nodes(self, chain: ChainNodes, method: str, params: List[Any]) -> Any:
+        last_error = None
+        for container_name in chain.candidates():
+            try:
+                self.stats["rpc_calls"] += 1
+                result = await node_rpc(container_name, node_rpc_port(container_name), method, params)
+                if chain.preferred is None:
+                    await self._promote_if_synced(chain, container_name)
+                return result
+            except Exception as e:
+                last_error = e
+                self.stats["failovers"] += 1
+                logger.debug(f"{chain.name}: {container_name} 에서 {method} 실패, 다음 노드 시도: {e}")
+                if chain.preferred == container_name:
+                    chain.preferred = None
+        raise RuntimeError(f"{chain.name}: {method} 에 응답한 노드 없음 ({last_error})")
+
+    async def _promote_if_synced(self, chain: ChainNodes, container_name: str):
+        """응답한 노드가 동기화되고 피어가 있을 때만 조회 노드로 지정 (동기화 중인 노드로 고정되지 않도록)"""
+        now = time.monotonic()
+        if now - chain.health_checked.get(container_name, float("-inf")) < HEALTH_CHECK_INTERVAL:
+            return
+        chain.health_checked[container_name] = now
+        try:
+            health = await node_rpc(container_name, node_rpc_port(container_name), "system_health", []) or {}
+            synced = health.get('isSyncing', True) is False and health.get('peers', 0) > 0
+        except Exception as e:
+            logger.debug(f"{chain.name}: {container_name} 동기화 상태 확인 실패: {e}")
+            return
+        if synced:
+            self.mark_healthy(container_name)
+
+    def invalidate(self, genesis: str, method: Optional[str] = None):
+        """캐시 무효화 (method 를 주면 해당 메서드 결과만)"""
+        chain = self.chains.get(genesis)
+        if chain is None:
+            return
+        if method is None:
+            chain.cache.clear()
+        else:
+            for key in [key for key in chain.cache if key.startswith(method + "[")]:
+                del chain.cache[key]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "chains": {
+                genesis: {
+                    "name": chain.name,
+                    "nodes": chain.nodes,
+                    "preferred": chain.preferred,
+                    "cached_queries": len(chain.cache),
+                }
+                for genesis, chain in self.chains.items()
+            },
+            "stats": dict(self.stats),
+        }
+
+
+# 프로세스 전역 인스턴스 (PayoutChecker, EraMonitor 공용)
+chain_registry = ChainRegistry()
@@ -6,10 +6,72 @@ import logging
 import uuid
 from typing import Dict, Any, Optional
 from datetime import datetime
-from substrate_utils import extract_validator_from_storage_key
+from substrate_utils import extract_validator_from_storage_key, storage_key, hex_to_bytes, decode_u64
+from chain_registry import chain_registry
+from session_index import session_key_index
 
 logger = logging.getLogger(__name__)
 
+BABE_EPOCH_INDEX_KEY = storage_key("Babe", "EpochIndex")
+# 현재 epoch 번호 재확인 주기 (초, EraMonitor 가 epoch 변경을 구독하면 즉시 무효화)
+EPOCH_INDEX_TTL = 60.0
+AUTHORSHIP_STATE = "command_handler.authorship"
+
+
+class AuthorshipCache:
+    """find_validator 결과 보관 (간단한 확인은 (노드, BABE epoch), 깊은 검색은 (노드, 세션 키) 단위)
+
+    - babe_epochAuthorship 결과는 epoch 안에서 바뀌지 않으므로 epoch 가 바뀔 때만 다시 조회
+    - 세션 키 깊은 검색(세션 키 -> 검증인 계정)은 epoch 와 무관하므로 세션 키가 바뀐 경우에만 다시 수행
+    - EraCache 를 연결하면 재시작 후에도 결과를 재사용
+    """
+
+    def __init__(self):
+        self.simple: Dict[str, Dict[str, Any]] = {}  # 노드 -> {"epoch", "result"}
+        self.deep: Dict[str, Dict[str, Any]] = {}    # 노드 -> {"session_keys", "result"}
+        self.era_cache = None
+        self.stats = {"hits": 0, "misses": 0}
+
+    def attach(self, era_cache):
+        self.era_cache = era_cache
+        state = era_cache.get_state(AUTHORSHIP_STATE, {}) or {}
+        self.simple.update(state.get("simple", {}))
+        self.deep.update(state.get("deep", {}))
+
+    def get_simple(self, node: str, epoch: int) -> Optional[Dict[str, Any]]:
+        entry = self.simple.get(node)
+        return self._hit(entry["result"]) if entry and entry["epoch"] == epoch else self._miss()
+
+    def put_simple(self, node: str, epoch: int, result: Dict[str, Any]):
+        self.simple[node] = {"epoch": epoch, "result": result}
+        self._save()
+
+    def get_deep(self, node: str, session_keys: str) -> Optional[Dict[str, Any]]:
+        entry = self.deep.get(node)
+        if entry and entry["session_keys"] == session_keys:
+            return self._hit(entry["result"])
+        return self._miss()
+
+    def put_deep(self, node: str, session_keys: str, result: Dict[str, Any]):
+        self.deep[node] = {"session_keys": session_keys, "result": result}
+        self._save()
+
+    def _hit(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        self.stats["hits"] += 1
+        return result
+
+    def _miss(self) -> None:
+        self.stats["misses"] += 1
+        return None
+
+    def _save(self):
+        if self.era_cache:
+            self.era_cache.set_state(AUTHORSHIP_STATE, {"simple": self.simple, "deep": self.deep})
+
+
+# 프로세스 전역 인스턴스 (EraMonitor / WebSocketClient 의 CommandHandler 공용)
+authorship_cache = AuthorshipCache()
+
 class CommandHandler:
     """웹소켓으로 받은 명령어를 처리하는 핸들러"""
     
@@ -65,13 +127,7 @@ class CommandHandler:
             elif command_type == 'has_key':
                 result = await self._has_key(target, params)
             elif command_type == 'find_validator':
-                # 먼저 간단한 방법 시도
-                simple_result = await self._find_validator_simple(target, params)
-                if simple_result.get("is_validator") or not params.get("deep_search", True):
-                    result = simple_result
-                else:
-                    # 깊은 검색 수행
-                    result = await self._find_validator_account(target, params)
+                result = await self.find_validator(target, params)
             else:
                 raise ValueError(f"지원되지 않는 명령어: {command_type}")
             
@@ -389,15 +445,47 @@ class CommandHandler:
         except Exception as e:
             return {"error": str(e), "has_key": False}
     
+    async def _current_epoch(self, container: str) -> Optional[int]:
+        """노드가 속한 체인의 현재 BABE epoch (확인할 수 없으면 None)"""
+        try:
+            genesis = await chain_registry.resolve(container)
+            if not genesis:
+                return None
+            value = await chain_registry.query(genesis, "state_getStorage", [BABE_EPOCH_INDEX_KEY],
+                                               ttl=EPOCH_INDEX_TTL)
+            return decode_u64(hex_to_bytes(value))[0] if value else None
+        except Exception as e:
+            logger.debug(f"{container}: epoch 조회 실패: {e}")
+            return None
+    
+    async def find_validator(self, container: str, params: Dict) -> Dict:
+        """검증인 확인 (epoch 단위 캐시 사용, 블록 생성 추적에서도 사용)"""
+        epoch = await self._current_epoch(container)
+        
+        # 먼저 간단한 방법 시도 (같은 epoch 에서는 이전 결과 사용)
+        simple_result = authorship_cache.get_simple(container, epoch) if epoch is not None else None
+        if simple_result is None:
+            simple_result = await self._find_validator_simple(container, params)
+            if epoch is not None and simple_result.get("status") != "error":
+                simple_result["epoch_index"] = epoch
+                authorship_cache.put_simple(container, epoch, simple_result)
+        if simple_result.get("is_validator") or not params.get("deep_search", True):
+            return simple_result
+        
+        # 깊은 검색 수행 (세션 키가 그대로면 이전 결과 사용)
+        session_keys = params.get("session_keys")
+        if not session_keys:
+            return await self._find_validator_account(container, params)
+        result = authorship_cache.get_deep(container, session_keys)
+        if result is None:
+            result = await self._find_validator_account(container, params)
+            if "error" not in result:
+                authorship_cache.put_deep(container, session_keys, result)
+        return result
+    
     async def _find_validator_account(self, container: str, params: Dict) -> Dict:
-        """노드와 연결된 검증인 계정 찾기"""
+        """노드와 연결된 검증인 계정 찾기 (세션 키 -> 검증인 인덱스 사용)"""
         try:
-            # 포트 결정
-            if container.startswith('3node'):
-                port = 33980 + int(container.replace('3node', ''))
-            else:
-                port = 33880 + int(container.replace('node', ''))
-            
             # 1. 세션 키 파라미터 확인
             session_keys = params.get("session_keys")
             
@@ -409,101 +497,27 @@ class CommandHandler:
                     "suggestion": "세션 키를 제공하거나, deep_search: false로 로그 검색을 사용하세요."
                 }
             
-            # 2. 현재 활성 검증인 목록 가져오기
-            validators_cmd = [
-                'docker', 'exec', container,
-                'curl', '-s', '-H', 'Content-Type: application/json',
-                '-d', json.dumps({
-                    "jsonrpc": "2.0",
-                    "method": "state_getStorage",
-                    "params": ["0x5f3e4907f716ac89b6347d15ececedca9c6a637f62ae2af1c7e31eed7e96be04"],  # staking.validators
-                    "id": 1
-                }),
-                f'http://localhost:{port}/'
-            ]
+            # 2. 노드가 속한 체인 확인
+            genesis = await chain_registry.resolve(container)
+            if not genesis:
+                return {"error": "노드의 체인(genesis)을 확인할 수 없습니다", "container": container}
             
-            validators_output = await self._run_command(validators_cmd)
-            validators_response = json.loads(validators_output)
-            
-            if 'error' in validators_response:
-                # 대체 방법: RPC 메타데이터 사용
-                validators_cmd = [
-                    'docker', 'exec', container,
-                    'curl', '-s', '-H', 'Content-Type: application/json',
-                    '-d', json.dumps({
-                        "jsonrpc": "2.0",
-                        "method": "state_call",
-                        "params": ["StakingApi_validators", "0x"],
-                        "id": 1
-                    }),
-                    f'http://localhost:{port}/'
-                ]
-                validators_output = await self._run_command(validators_cmd)
-                validators_response = json.loads(validators_output)
-            
-            # 3. 각 검증인의 세션 키 확인
-            matched_validator = None
-            validators_checked = 0
-            session_keys_found = []
-            
-            if 'result' in validators_response and validators_response['result']:
-                # 검증인 목록 디코딩 (hex -> addresses)
-                validators_hex = validators_response['result']
-                
-                # 세션 키 정규화 (0x 제거)
-                target_session_keys = session_keys.replace('0x', '').lower()
-                
-                # 각 검증인의 nextKeys 확인
-                # Session.nextKeys storage key = twox_128("Session") + twox_128("NextKeys") + blake2_128_concat(validator)
-                session_prefix = "0x2099d7f109d6e535fb000bba623fd4409f99a2ce711f3a31b2fc05604c93f179"
-                
-                # 페이지네이션으로 모든 키 가져오기
-                all_keys_cmd = [
-                    'docker', 'exec', container,
-                    'curl', '-s', '-H', 'Content-Type: application/json',
-                    '-d', json.dumps({
-                        "jsonrpc": "2.0",
-                        "method": "state_getPairs",
-                        "params": [session_prefix],
-                        "id": 1
-                    }),
-                    f'http://localhost:{port}/'
-                ]
-                
-                all_keys_output = await self._run_command(all_keys_cmd)
-                all_keys_response = json.loads(all_keys_output)
-                
-                if 'result' in all_keys_response:
-                    for key_value_pair in all_keys_response['result']:
-                        storage_key = key_value_pair[0]
-                        storage_value = key_value_pair[1]
-                        
-                        # 스토리지 값에서 세션 키 추출 (hex 형식)
-                        stored_session_keys = storage_value.replace('0x', '').lower()
-                        
-                        # 매칭 확인
-                        if target_session_keys in stored_session_keys or stored_session_keys in target_session_keys:
-                            # 스토리지 키에서 검증인 주소 추출
-                            # 키 구조: prefix(64) + blake2_128_concat_hash(32) + validator_address(64)
-                            validator_hex = storage_key[96:]  # prefix와 hash 제거
-                            
-                            # SS58 주소로 변환 (간단한 예시, 실제로는 더 복잡)
-                            matched_validator = f"0x{validator_hex}"
-                            break
-                        
-                        validators_checked += 1
-                        session_keys_found.append(stored_session_keys[:16] + "...")
+            # 3. 현재 세션 기준 Session.NextKeys 인덱스에서 조회 (세션이 바뀔 때만 다시 만듦)
+            found = await session_key_index.lookup(genesis, session_keys)
+            index = session_key_index.indexes.get(genesis)
+            matched_validator = found["account"] if found else None
             
             # 4. 결과 반환
             result = {
                 "container": container,
                 "session_keys": session_keys[:32] + "..." if len(session_keys) > 36 else session_keys,
                 "validator_account": matched_validator,
-                "validators_checked": validators_checked,
-                "session_keys_found": session_keys_found[:5]  # 처음 5개만
+                "validators_checked": index.validators if index else 0,
+                "session_index": index.session_index if index else None
             }
             
             if matched_validator:
+                result["matched_key"] = found["matched"]
                 result["status"] = "success"
                 result["message"] = f"노드가 검증인 계정 {matched_validator[:16]}...와 연결되어 있습니다"
             else:
@@ -541,12 +555,16 @@ class CommandHandler:
 
             # 결과 확인 - 비어있지 않으면 검증인
             if 'result' in babe_response and babe_response['result']:
+                authorship = babe_response['result']  # {BABE 공개키: {primary, secondary, secondary_vrf}}
                 return {
                     "container": container,
                     "is_validator": True,
                     "status": "active",
                     "message": "노드가 활성 검증인으로 작동 중입니다.",
-                    "epoch_slots": len(babe_response['result'])  # 할당된 슬롯 수
+                    "epoch_slots": len(authorship),  # 할당된 슬롯 수
+                    "babe_keys": list(authorship),
+                    "slots": sorted({slot for claims in authorship.values()
+                                     for slots in claims.values() for slot in slots})
                 }
             else:
                 return {
@@ -5,7 +5,10 @@ import logging
 import time
 import os
 import subprocess
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+
+from traffic_recorder import TrafficRecorder, TrafficReplayer
+from stage_metrics import stage_metrics, STAGE_HEALTH_PROBE, STAGE_SUBPROCESS_SPAWN, STAGE_SUBPROCESS
 
 # 로깅 설정
 logging.basicConfig(
@@ -17,7 +20,8 @@ logger = logging.getLogger(__name__)
 class DockerStatsClient:
     """Docker 컨테이너 통계를 수집하는 클라이언트"""
     
-    def __init__(self):
+    def __init__(self, record_path: Optional[str] = None, replay_path: Optional[str] = None,
+                 replay_speed: float = 1.0):
         self.docker_available = False
         self.container_stats = {}  # 컨테이너 이름 -> 통계 데이터
         self.stats_process = None
@@ -44,22 +48,68 @@ class DockerStatsClient:
         logging.getLogger('websockets.server').setLevel(logging.WARNING)
         logging.getLogger('websockets.protocol').setLevel(logging.WARNING)
         
+        # docker 트래픽 기록/재생 (재생 모드에서는 docker 를 실행하지 않음)
+        self.recorder: Optional[TrafficRecorder] = None
+        self.replayer: Optional[TrafficReplayer] = None
+        if replay_path:
+            self.replayer = TrafficReplayer(replay_path, replay_speed)
+            self.docker_available = True
+        elif record_path:
+            self.recorder = TrafficRecorder(record_path)
+        
         # Docker 명령어 사용 가능 여부 확인
-        try:
-            result = subprocess.run(["docker", "version"], capture_output=True, text=True)
-            if result.returncode == 0:
-                self.docker_available = True
-                logger.info("Docker 사용 가능")
-            else:
-                logger.error("Docker 사용 불가: %s", result.stderr)
-        except Exception as e:
-            logger.error("Docker 확인 중 오류: %s", str(e))
+        if not self.replayer:
+            try:
+                result = subprocess.run(["docker", "version"], capture_output=True, text=True)
+                if result.returncode == 0:
+                    self.docker_available = True
+                    logger.info("Docker 사용 가능")
+                else:
+                    logger.error("Docker 사용 불가: %s", result.stderr)
+            except Exception as e:
+                logger.error("Docker 확인 중 오류: %s", str(e))
         
         # 컨테이너별 환경변수 캐시 및 타임스탬프
         self.container_env_cache = {}
         self.env_cache_timestamps = {}
         self.env_cache_ttl = 1.0  # 1초 캐시 유효 시간
     
+    @staticmethod
+    def _rpc_method(cmd: Tuple[str, ...]) -> Optional[str]:
+        """`docker exec ... curl -d <JSON-RPC>` 명령에서 RPC 메서드 이름 추출"""
+        if len(cmd) < 2 or cmd[1] != "exec" or "-d" not in cmd:
+            return None
+        try:
+            payload = cmd[cmd.index("-d") + 1]
+            return json.loads(payload).get("method")
+        except (IndexError, ValueError, AttributeError):
+            return None
+    
+    async def _exec(self, *cmd: str) -> Tuple[int, bytes, bytes]:
+        """docker 명령 실행 후 (종료 코드, stdout, stderr) 반환 (기록/재생 모드 지원)"""
+        subcommand = cmd[1] if len(cmd) > 1 else cmd[0]
+        rpc_method = self._rpc_method(cmd)
+        started = time.perf_counter()
+        if self.replayer:
+            returncode, stdout, stderr = await self.replayer.exec(cmd)
+        else:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            stage_metrics.observe(STAGE_SUBPROCESS_SPAWN, time.perf_counter() - started, subcommand)
+            stdout, stderr = await process.communicate()
+            returncode = process.returncode
+        
+        elapsed = time.perf_counter() - started
+        stage_metrics.observe(STAGE_SUBPROCESS, elapsed, subcommand)
+        if rpc_method:
+            stage_metrics.observe(STAGE_HEALTH_PROBE, elapsed, rpc_method)
+        if self.recorder:
+            self.recorder.record_exec(cmd, returncode, stdout, stderr, elapsed)
+        return returncode, stdout, stderr
+    
     async def get_container_env(self, container_name: str) -> Dict[str, str]:
         """컨테이너의 환경변수를 가져옴"""
         current_time = time.time()
@@ -72,14 +122,9 @@ class DockerStatsClient:
         
         try:
             # docker inspect로 환경변수 가져오기
-            result = await asyncio.create_subprocess_exec(
-                "docker", "inspect", container_name,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout, stderr = await result.communicate()
+            returncode, stdout, stderr = await self._exec("docker", "inspect", container_name)
             
-            if result.returncode == 0:
+            if returncode == 0:
                 container_info = json.loads(stdout.decode())
                 if container_info and len(container_info) > 0:
                     env_list = container_info[0].get("Config", {}).get("Env", [])
@@ -110,14 +155,9 @@ class DockerStatsClient:
         
         try:
             # docker inspect로 컨테이너 정보 가져오기
-            result = await asyncio.create_subprocess_exec(
-                "docker", "inspect", container_name,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout, stderr = await result.communicate()
+            returncode, stdout, stderr = await self._exec("docker", "inspect", container_name)
             
-            if result.returncode == 0:
+            if returncode == 0:
                 container_info = json.loads(stdout.decode())
                 if container_info and len(container_info) > 0:
                     info = container_info[0]
@@ -153,14 +193,9 @@ class DockerStatsClient:
     async def get_image_info(self, image_name: str) -> Dict[str, Any]:
         """이미지 정보를 가져옴"""
         try:
-            result = await asyncio.create_subprocess_exec(
-                "docker", "image", "inspect", image_name,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout, stderr = await result.communicate()
+            returncode, stdout, stderr = await self._exec("docker", "image", "inspect", image_name)
             
-            if result.returncode == 0:
+            if returncode == 0:
                 image_info = json.loads(stdout.decode())
                 if image_info and len(image_info) > 0:
                     info = image_info[0]
@@ -219,14 +254,9 @@ class DockerStatsClient:
                 f"http://localhost:{rpc_port}/"
             ]
             
-            result = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout, stderr = await result.communicate()
+            returncode, stdout, stderr = await self._exec(*cmd)
             
-            if result.returncode == 0:
+            if returncode == 0:
                 response = json.loads(stdout.decode())
                 if "result" in response:
                     health = response["result"]
@@ -281,14 +311,9 @@ class DockerStatsClient:
         try:
             # 컨테이너 실행 상태 확인
             check_cmd = ["docker", "inspect", "-f", "{{.State.Running}}", container_name]
-            check_result = await asyncio.create_subprocess_exec(
-                *check_cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout, _ = await check_result.communicate()
+            check_returncode, stdout, _ = await self._exec(*check_cmd)
             
-            if check_result.returncode != 0 or stdout.decode().strip() != "true":
+            if check_returncode != 0 or stdout.decode().strip() != "true":
                 logger.debug(f"컨테이너 {container_name}가 실행 중이 아님 - 블록 정보 건너뜀")
                 return {"current_block": 0, "best_block": 0, "finalized_block": 0}
             
@@ -300,14 +325,9 @@ class DockerStatsClient:
                 f"http://localhost:{rpc_port}/"
             ]
             
-            result = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout, stderr = await result.communicate()
+            returncode, stdout, stderr = await self._exec(*cmd)
             
-            if result.returncode == 0:
+            if returncode == 0:
                 response = json.loads(stdout.decode())
                 if "result" in response:
                     header = response["result"]
@@ -336,14 +356,9 @@ class DockerStatsClient:
                 f"http://localhost:{rpc_port}/"
             ]
             
-            result = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout, stderr = await result.communicate()
+            returncode, stdout, stderr = await self._exec(*cmd)
             
-            if result.returncode == 0:
+            if returncode == 0:
                 response = json.loads(stdout.decode())
                 if "result" in response:
                     # Finalized 블록 해시로 헤더 정보 가져오기
@@ -357,14 +372,9 @@ class DockerStatsClient:
                         f"http://localhost:{rpc_port}/"
                     ]
                     
-                    result2 = await asyncio.create_subprocess_exec(
-                        *cmd2,
-                        stdout=asyncio.subprocess.PIPE,
-                        stderr=asyncio.subprocess.PIPE
-                    )
-                    stdout2, stderr2 = await result2.communicate()
+                    returncode2, stdout2, stderr2 = await self._exec(*cmd2)
                     
-                    if result2.returncode == 0:
+                    if returncode2 == 0:
                         response2 = json.loads(stdout2.decode())
                         if "result" in response2:
                             header = response2["result"]
@@ -379,14 +389,9 @@ class DockerStatsClient:
         try:
             # 컨테이너 실행 상태 확인
             check_cmd = ["docker", "inspect", "-f", "{{.State.Running}}", container_name]
-            check_result = await asyncio.create_subprocess_exec(
-                *check_cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout, _ = await check_result.communicate()
+            check_returncode, stdout, _ = await self._exec(*check_cmd)
             
-            if check_result.returncode != 0 or stdout.decode().strip() != "true":
+            if check_returncode != 0 or stdout.decode().strip() != "true":
                 logger.debug(f"컨테이너 {container_name}가 실행 중이 아님 - 동기화 상태 건너뜀")
                 return {"highest_block": 0, "starting_block": 0}
             cmd = [
@@ -396,14 +401,9 @@ class DockerStatsClient:
                 f"http://localhost:{rpc_port}/"
             ]
             
-            result = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout, stderr = await result.communicate()
+            returncode, stdout, stderr = await self._exec(*cmd)
             
-            if result.returncode == 0 and stdout:
+            if returncode == 0 and stdout:
                 try:
                     response = json.loads(stdout.decode())
                     if "result" in response and response["result"] is not None:
@@ -472,15 +472,10 @@ class DockerStatsClient:
             # docker ps로 빌드 중인 컨테이너 확인
             cmd = ["docker", "ps", "--filter", "status=created", "--format", "{{json .}}"]
             
-            result = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout, stderr = await result.communicate()
+            returncode, stdout, stderr = await self._exec(*cmd)
             
             building_images = []
-            if result.returncode == 0 and stdout:
+            if returncode == 0 and stdout:
                 lines = stdout.decode().strip().split('\n')
                 for line in lines:
                     if line:
@@ -498,15 +493,10 @@ class DockerStatsClient:
             # docker images로 최근 생성된 이미지 확인
             cmd2 = ["docker", "images", "--format", "{{json .}}"]
             
-            result2 = await asyncio.create_subprocess_exec(
-                *cmd2,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout2, stderr2 = await result2.communicate()
+            returncode2, stdout2, stderr2 = await self._exec(*cmd2)
             
             recent_images = []
-            if result2.returncode == 0 and stdout2:
+            if returncode2 == 0 and stdout2:
                 lines = stdout2.decode().strip().split('\n')[:5]  # 최근 5개만
                 for line in lines:
                     if line:
@@ -540,14 +530,9 @@ class DockerStatsClient:
             try:
                 # 컨테이너가 실행 중인지 먼저 확인
                 cmd = ["docker", "inspect", "-f", "{{.State.Running}}", container_name]
-                result = await asyncio.create_subprocess_exec(
-                    *cmd,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-                stdout, stderr = await result.communicate()
+                returncode, stdout, stderr = await self._exec(*cmd)
                 
-                if result.returncode != 0 or stdout.decode().strip() != "true":
+                if returncode != 0 or stdout.decode().strip() != "true":
                     logger.warning(f"컨테이너 {container_name}가 실행 중이 아닙니다. 헬스체크 건너뜀")
                     # 오프라인 상태로 캐시 업데이트
                     self.container_status_cache[container_name] = {
@@ -642,6 +627,10 @@ class DockerStatsClient:
                 pass
         self.health_check_tasks.clear()
         
+        if self.recorder:
+            self.recorder.close()
+            self.recorder = None
+        
         logger.info("Docker stats 모니터링 중지")
         return True
     
@@ -654,12 +643,15 @@ class DockerStatsClient:
             
             logger.info(f"Docker stats 스트림 시작: {' '.join(cmd)}")
             
-            # 비동기 프로세스 실행
-            self.stats_process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
+            # 비동기 프로세스 실행 (재생 모드에서는 기록된 스트림 사용)
+            if self.replayer:
+                self.stats_process = self.replayer.open_stream()
+            else:
+                self.stats_process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE
+                )
             
             # 에러 스트림 읽기 태스크
             error_task = asyncio.create_task(self._read_stderr())
@@ -682,6 +674,9 @@ class DockerStatsClient:
                             await asyncio.sleep(0.1)
                             continue
                         
+                        if self.recorder:
+                            self.recorder.record_stream(chunk)
+                        
                         # 버퍼에 데이터 추가
                         buffer += chunk.decode('utf-8')
                         
@@ -1139,26 +1134,16 @@ class DockerStatsClient:
         try:
             # 볼륨 경로 찾기
             cmd = ["docker", "inspect", container_name, "--format", '{{range .Mounts}}{{if eq .Destination "/root/data"}}{{.Source}}{{end}}{{end}}']
-            result = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout, stderr = await result.communicate()
+            returncode, stdout, stderr = await self._exec(*cmd)
             
-            if result.returncode == 0:
+            if returncode == 0:
                 volume_path = stdout.decode().strip()
                 if volume_path:
                     logger.debug(f"볼륨 경로 ({container_name}): {volume_path}")
                     # 컨테이너 내부에서 du 명령 실행
-                    du_result = await asyncio.create_subprocess_exec(
-                        "docker", "exec", container_name, "du", "-sb", "/root/data",
-                        stdout=asyncio.subprocess.PIPE,
-                        stderr=asyncio.subprocess.PIPE
-                    )
-                    du_stdout, du_stderr = await du_result.communicate()
+                    du_returncode, du_stdout, du_stderr = await self._exec("docker", "exec", container_name, "du", "-sb", "/root/data")
                     
-                    if du_result.returncode == 0:
+                    if du_returncode == 0:
                         # du 출력: "크기\t경로"
                         size_str = du_stdout.decode().split('\t')[0]
                         size = int(size_str)
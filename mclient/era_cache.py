@@ -0,0 +1,125 @@
+# era_cache.py
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Dict, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+# addmc.sh 가 ./mclient_data 를 /app/data 로 마운트
+DEFAULT_ERA_CACHE_PATH = "/app/data/era_cache.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS era_data (
+    genesis TEXT NOT NULL,
+    era INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (genesis, era, kind, key)
+);
+CREATE TABLE IF NOT EXISTS monitor_state (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+class EraCache:
+    """지난 era 의 체인 데이터를 디스크(SQLite)에 보관하는 캐시
+
+    - 끝난 era 의 값(노출 정보, 청구 완료 여부 등)은 finalized 이후 바뀌지 않으므로
+      (genesis 해시, era, 종류, 키) 단위로 한 번만 저장하고 재시작 후에도 재사용
+    - 조회는 (genesis, era, 종류) 단위로 메모리에 올려 두고 사용
+    - EraMonitor 의 previous_era 같은 작은 상태도 monitor_state 테이블에 보관
+    """
+
+    def __init__(self, path: str = DEFAULT_ERA_CACHE_PATH):
+        self.path = path
+        self.memory: Dict[Tuple[str, int, str], Dict[str, Any]] = {}
+        self.stats = {"writes": 0}
+        self.conn = self._open(path)
+
+    def _open(self, path: str) -> sqlite3.Connection:
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(path)
+            conn.executescript(SCHEMA)
+            logger.info(f"Era 캐시 사용: {path}")
+            return conn
+        except (sqlite3.Error, OSError) as e:
+            # 디스크에 쓸 수 없으면 메모리 DB 로 동작 (재시작 시 초기화)
+            logger.error(f"Era 캐시 파일을 열 수 없어 메모리 캐시로 동작합니다 ({path}): {e}")
+            conn = sqlite3.connect(":memory:")
+            conn.executescript(SCHEMA)
+            return conn
+
+    def get_era(self, genesis: str, era: int, kind: str) -> Dict[str, Any]:
+        """(genesis, era, 종류) 에 저장된 키 -> 값 (없으면 빈 dict)"""
+        cache_key = (genesis, era, kind)
+        values = self.memory.get(cache_key)
+        if values is None:
+            rows = self.conn.execute(
+                "SELECT key, value FROM era_data WHERE genesis = ? AND era = ? AND kind = ?",
+                cache_key
+            ).fetchall()
+            values = {key: json.loads(value) for key, value in rows}
+            self.memory[cache_key] = values
+        return values
+
+    def put_era(self, genesis: str, era: int, kind: str, values: Dict[str, Any]):
+        """끝난 era 의 값 저장 (이미 같은 값이 있는 키는 건너뜀)"""
+        current = self.get_era(genesis, era, kind)
+        values = {key: value for key, value in values.items() if current.get(key) != value}
+        if not values:
+            return
+        try:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO era_data (genesis, era, kind, key, value) VALUES (?, ?, ?, ?, ?)",
+                [(genesis, era, kind, key, json.dumps(value)) for key, value in values.items()]
+            )
+            self.conn.commit()
+            current.update(values)
+            self.stats["writes"] += len(values)
+        except sqlite3.Error as e:
+            logger.error(f"Era 캐시 저장 실패 (era {era}, {kind}): {e}")
+
+    def prune(self, genesis: str, before_era: int):
+        """HistoryDepth 밖으로 밀려난 era 삭제"""
+        try:
+            deleted = self.conn.execute(
+                "DELETE FROM era_data WHERE genesis = ? AND era < ?", (genesis, before_era)
+            ).rowcount
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Era 캐시 정리 실패: {e}")
+            return
+        for cache_key in [key for key in self.memory if key[0] == genesis and key[1] < before_era]:
+            del self.memory[cache_key]
+        if deleted:
+            logger.debug(f"Era 캐시 정리: era {before_era} 이전 {deleted}건 삭제")
+
+    def get_state(self, name: str, default: Any = None) -> Any:
+        row = self.conn.execute("SELECT value FROM monitor_state WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_state(self, name: str, value: Any):
+        try:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO monitor_state (name, value, updated_at) VALUES (?, ?, ?)",
+                (name, json.dumps(value), time.time())
+            )
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"상태 저장 실패 ({name}): {e}")
+
+    def close(self):
+        try:
+            self.conn.close()
+        except sqlite3.Error:
+            pass
@@ -1,30 +1,270 @@
 # era_monitor.py
+import asyncio
+import json
 import logging
 import time
-from typing import Dict, Any, Optional
-from command_handler import CommandHandler
+from typing import Dict, List, Any, Optional
+
+import websockets
+
+from block_authorship import block_tracker
+from chain_registry import chain_registry, node_rpc_port, node_socket
+from command_handler import CommandHandler, BABE_EPOCH_INDEX_KEY
+from session_index import SESSION_CURRENT_INDEX_KEY
+from substrate_utils import storage_key, hex_to_bytes, decode_u32, decode_u64, decode_active_era_info
 
 logger = logging.getLogger(__name__)
 
+PREVIOUS_ERA_STATE = "era_monitor.previous_era"
+
+STAKING_ACTIVE_ERA_KEY = storage_key("Staking", "ActiveEra")
+# 구독 키: era 전환, 세션 변경 (세션 키 인덱스), BABE epoch 변경 (검증인 확인 캐시)
+SUBSCRIBED_KEYS = (STAKING_ACTIVE_ERA_KEY, SESSION_CURRENT_INDEX_KEY, BABE_EPOCH_INDEX_KEY)
+# 구독 가능한 노드가 없는 체인은 이 주기(이전 요약 주기)로 한 번 조회하고 구독을 다시 시도 (초)
+DEGRADED_POLL_INTERVAL = 60.0
+# 설정된 노드의 체인(genesis)을 다시 확인하는 주기 (초)
+CHAIN_REFRESH_INTERVAL = 300.0
+
 class EraMonitor:
-    """Era 전환 감지 및 검증인 활성화 모니터링"""
+    """Era 전환 감지 및 검증인 활성화 모니터링
+
+    체인마다 노드 하나에 (docker exec 로 컨테이너 안의 RPC 포트에 연결해) state_subscribeStorage 로 Staking.ActiveEra, Session.CurrentIndex,
+    Babe.EpochIndex 를 구독하고, 값이 바뀐 블록에서 바로 전환을 처리한다. 감지된 전환은
+    pop_transitions() 로 다음 요약에 포함된다. 같은 연결로 chain_subscribeNewHeads 도 구독해
+    새 헤더를 블록 생성 추적(block_tracker)에 넘긴다. 구독할 수 있는 노드가 없는 체인은
+    DEGRADED_POLL_INTERVAL 마다 조회로 대체하고 status() 에 저하 상태로 보고한다.
+    """
     
-    def __init__(self, websocket_client=None):
+    def __init__(self, websocket_client=None, era_cache=None, registry=None, tracker=None):
         self.previous_era = {}  # {node_name: era_number}
         self.websocket_client = websocket_client
         self.command_handler = CommandHandler()
         self.known_validators = {}  # {node_name: validator_account} - 이미 알려진 검증인
-        
+        self.registry = registry or chain_registry
+        self.tracker = tracker or block_tracker
+        self.chain_era: Dict[str, int] = {}      # genesis -> 마지막으로 받은 active era
+        self.chain_session: Dict[str, int] = {}  # genesis -> 마지막으로 받은 세션 번호
+        self.chain_epoch: Dict[str, int] = {}    # genesis -> 마지막으로 받은 BABE epoch
+        self.pending_transitions: Dict[str, Dict[str, Any]] = {}  # 다음 요약에 보낼 전환
+        self.watchers: Dict[str, asyncio.Task] = {}  # genesis -> 구독 태스크
+        self.refresh_task: Optional[asyncio.Task] = None
+        self.subscribe_failed = set()  # 구독에 실패한 노드 (같은 경고를 반복하지 않음)
+        self.degraded: Dict[str, Dict[str, Any]] = {}  # genesis -> 구독 없이 조회로 대체 중인 체인 정보
+        # 재시작 후에도 이전 Era 를 유지하도록 EraCache 에 저장
+        self.era_cache = era_cache
+        if era_cache:
+            self.previous_era = {
+                node_name: int(era) for node_name, era in era_cache.get_state(PREVIOUS_ERA_STATE, {}).items()
+            }
+            if self.previous_era:
+                logger.info(f"저장된 Era 정보 복원: {self.previous_era}")
+    
+    def merge_previous_era(self, last_era_info: Dict[str, Any]):
+        """서버가 보낸 last_era_info 와 저장된 Era 병합 (Era 는 증가만 하므로 큰 값 사용)"""
+        for node_name, era in last_era_info.items():
+            try:
+                era = int(era)
+            except (TypeError, ValueError):
+                continue
+            if era > self.previous_era.get(node_name, -1):
+                self.previous_era[node_name] = era
+        self._save_previous_era()
+    
+    def _save_previous_era(self):
+        if self.era_cache:
+            self.era_cache.set_state(PREVIOUS_ERA_STATE, self.previous_era)
+    
+    def start(self, node_names: List[str]):
+        """설정된 노드의 체인별 구독 시작 (체인 구성은 CHAIN_REFRESH_INTERVAL 마다 다시 확인)"""
+        if self.refresh_task is None or self.refresh_task.done():
+            self.refresh_task = asyncio.create_task(self._refresh_chains(node_names))
+    
+    async def stop(self):
+        tasks = list(self.watchers.values())
+        if self.refresh_task:
+            tasks.append(self.refresh_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.watchers.clear()
+        self.refresh_task = None
+    
+    def status(self) -> Dict[str, Any]:
+        """체인별 감시 방식 (subscription / polling) 과 조회로 대체 중인 이유"""
+        chains = {}
+        for genesis in self.watchers:
+            degraded = self.degraded.get(genesis)
+            chains[genesis] = {
+                "name": self.registry.chain(genesis).name,
+                "mode": "polling" if degraded else "subscription",
+            }
+            if degraded:
+                chains[genesis].update(degraded)
+        return {"degraded": bool(self.degraded), "chains": chains}
+    
+    def pop_transitions(self) -> Dict[str, Dict[str, Any]]:
+        """지난 요약 이후 감지된 전환 (가져가면 비움)"""
+        transitions, self.pending_transitions = self.pending_transitions, {}
+        return transitions
+    
+    async def _refresh_chains(self, node_names: List[str]):
+        containers = [name for name in node_names if name.startswith(('node', '3node'))]
+        while True:
+            try:
+                groups, unresolved = await self.registry.group(containers)
+                if unresolved:
+                    logger.debug(f"체인을 확인할 수 없는 노드: {unresolved}")
+                for genesis, nodes in groups.items():
+                    watcher = self.watchers.get(genesis)
+                    if watcher is None or watcher.done():
+                        self.watchers[genesis] = asyncio.create_task(self._watch_chain(genesis))
+                    elif genesis in self.chain_era:
+                        # 이미 구독 중인 체인에 새로 추가된 노드는 현재 era 로 첫 확인
+                        await self._apply_chain_era(genesis, self.chain_era[genesis])
+            except Exception as e:
+                logger.error(f"Era 구독 대상 확인 실패: {e}")
+            await asyncio.sleep(CHAIN_REFRESH_INTERVAL)
+    
+    async def _watch_chain(self, genesis: str):
+        """체인 하나의 구독 유지 (끊기면 다음 노드로, 구독 가능한 노드가 없으면 조회로 대체)"""
+        chain = self.registry.chain(genesis)
+        while True:
+            last_error = "구독 가능한 노드 없음"
+            for node_name in chain.candidates():
+                try:
+                    await self._subscribe(genesis, node_name)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    last_error = str(e)
+                    if node_name in self.subscribe_failed:
+                        logger.debug(f"{chain.name}: {node_name} 스토리지 구독 실패: {e}")
+                    else:
+                        self.subscribe_failed.add(node_name)
+                        logger.warning(f"{chain.name}: {node_name} 스토리지 구독 실패: {e}")
+            if genesis not in self.degraded:
+                logger.error(f"{chain.name}: 구독 가능한 노드가 없어 Era 모니터 저하 - "
+                             f"{DEGRADED_POLL_INTERVAL:.0f}초마다 조회로 대체 (Era 전환/블록 생성 감지 지연)")
+                self.degraded[genesis] = {"since": int(time.time()), "error": last_error}
+            else:
+                self.degraded[genesis]["error"] = last_error
+            try:
+                await self._poll_once(genesis)
+                await self.tracker.poll(genesis)
+            except Exception as e:
+                logger.error(f"{chain.name}: Era 조회 실패: {e}")
+            await asyncio.sleep(DEGRADED_POLL_INTERVAL)
+    
+    async def _subscribe(self, genesis: str, node_name: str):
+        """노드 RPC 웹소켓에 state_subscribeStorage, chain_subscribeNewHeads 구독 후 알림 처리 (연결이 끊기면 반환)
+
+        노드 RPC 는 컨테이너 localhost 에서만 받으므로 docker exec 중계 소켓으로 연결한다.
+        """
+        port = node_rpc_port(node_name)
+        async with node_socket(node_name, port) as sock, \
+                websockets.connect(f"ws://127.0.0.1:{port}", sock=sock, open_timeout=5, ping_interval=20,
+                                   ping_timeout=10, max_size=None, compression=None) as ws:
+            await ws.send(json.dumps({
+                "jsonrpc": "2.0",
+                "id": 1,
+                "method": "state_subscribeStorage",
+                "params": [list(SUBSCRIBED_KEYS)]
+            }))
+            await ws.send(json.dumps({
+                "jsonrpc": "2.0",
+                "id": 2,
+                "method": "chain_subscribeNewHeads",
+                "params": []
+            }))
+            async for message in ws:
+                data = json.loads(message)
+                if data.get('id') == 1:
+                    if 'error' in data:
+                        raise RuntimeError(data['error'].get('message'))
+                    self.subscribe_failed.discard(node_name)
+                    if self.degraded.pop(genesis, None) is not None:
+                        logger.warning(f"{self.registry.chain(genesis).name}: Era 모니터 구독 복구 ({node_name})")
+                    logger.info(f"{self.registry.chain(genesis).name}: {node_name} 에서 Era/세션 구독 시작")
+                    continue
+                if data.get('id') == 2:
+                    if 'error' in data:
+                        # 헤더 구독이 안 되어도 Era/세션 구독은 유지 (블록 생성 수는 집계되지 않음)
+                        logger.warning(f"{node_name}: 새 헤더 구독 실패: {data['error'].get('message')}")
+                    continue
+                method = data.get('method')
+                if method == "chain_newHead":
+                    await self.tracker.on_new_head(genesis, data.get('params', {}).get('result'))
+                elif method == "state_storage":
+                    result = data.get('params', {}).get('result', {})
+                    await self._handle_changes(genesis, result.get('changes', []))
+            raise RuntimeError("구독 연결 종료")
+    
+    async def _poll_once(self, genesis: str):
+        """구독을 사용할 수 없을 때 같은 키를 한 번 조회"""
+        values = await asyncio.gather(*[
+            self.registry.query(genesis, "state_getStorage", [key], ttl=0) for key in SUBSCRIBED_KEYS
+        ])
+        await self._handle_changes(genesis, list(zip(SUBSCRIBED_KEYS, values)))
+    
+    async def _handle_changes(self, genesis: str, changes: List[List[Optional[str]]]):
+        for key, value in changes:
+            if not value:
+                continue
+            if key == SESSION_CURRENT_INDEX_KEY:
+                session = decode_u32(hex_to_bytes(value))[0]
+                if self.chain_session.get(genesis) != session:
+                    self.chain_session[genesis] = session
+                    # 세션 키 인덱스가 새 세션 번호를 바로 보도록 캐시된 조회 무효화
+                    self.registry.invalidate(genesis, "state_getStorage")
+                    logger.debug(f"{self.registry.chain(genesis).name}: 세션 {session}")
+            elif key == BABE_EPOCH_INDEX_KEY:
+                epoch = decode_u64(hex_to_bytes(value))[0]
+                if self.chain_epoch.get(genesis) != epoch:
+                    self.chain_epoch[genesis] = epoch
+                    # 검증인 확인 캐시가 새 epoch 를 바로 보도록 캐시된 조회 무효화
+                    self.registry.invalidate(genesis, "state_getStorage")
+                    logger.debug(f"{self.registry.chain(genesis).name}: epoch {epoch}")
+                    await self.tracker.on_epoch(genesis, epoch)
+            elif key == STAKING_ACTIVE_ERA_KEY:
+                era = decode_active_era_info(hex_to_bytes(value))[0]['index']
+                if self.chain_era.get(genesis) != era:
+                    self.chain_era[genesis] = era
+                    await self._apply_chain_era(genesis, era)
+    
+    async def _apply_chain_era(self, genesis: str, current_era: int):
+        chain = self.registry.chain(genesis)
+        transitions = await self._apply_era(chain.name, list(chain.nodes), current_era)
+        self.pending_transitions.update(transitions)
+    
     async def check_era_transition(self, payout_info: Dict[str, Any]) -> Dict[str, Any]:
-        """Era 전환 감지 및 모든 노드의 검증인 상태 체크"""
+        """PayoutChecker 결과의 era 로 전환 확인 (수동 확인/테스트 스크립트용)
+        
+        era 는 체인 전역 값이므로 체인당 한 번 조회한 값(payout_info['chains'])을
+        그 체인의 모든 노드에 적용하고, 검증인 상태(세션 키)만 노드별로 확인한다.
+        """
         transitions = {}
-        payout_checks = payout_info.get('payout_checks', {})
+        chains = payout_info.get('chains')
+        if chains is None:
+            # 체인 정보가 없는 결과는 노드별 era 그대로 사용
+            chains = {
+                node_name: {'name': node_name, 'nodes': [node_name], 'current_era': info.get('current_era')}
+                for node_name, info in payout_info.get('payout_checks', {}).items()
+            }
         
-        for node_name, info in payout_checks.items():
-            current_era = info.get('current_era')
-            if current_era is None:
-                continue
-                
+        for chain in chains.values():
+            current_era = chain.get('current_era')
+            if current_era is not None:
+                transitions.update(await self._apply_era(chain['name'], chain['nodes'], current_era))
+        return transitions
+    
+    async def _apply_era(self, chain_name: str, nodes: List[str], current_era: int) -> Dict[str, Any]:
+        """체인의 현재 era 를 노드별 이전 era 와 비교해 전환 처리"""
+        transitions = {}
+        known = [self.previous_era[node] for node in nodes if node in self.previous_era]
+        if known and current_era > max(known):
+            logger.info(f"{chain_name}: Era 전환 감지 {max(known)} → {current_era} ({len(nodes)}개 노드)")
+        
+        for node_name in nodes:
             # 첫 실행이거나 Era가 변경된 경우
             if node_name not in self.previous_era:
                 # 첫 실행 시: 즉시 검증인 상태 체크
@@ -39,17 +279,18 @@ class EraMonitor:
                 # 이전 Era와 비교
                 previous = self.previous_era[node_name]
                 if current_era > previous:
-                    logger.info(f"{node_name}: Era 전환 감지 {previous} → {current_era}")
                     transitions[node_name] = {
                         'previous_era': previous,
                         'current_era': current_era
                     }
-                    # Era 변경 시 검증인 상태 체크
+                    # Era 변경 시 검증인 상태 체크 (노드별)
                     await self._check_validator_status(node_name, current_era)
             
-            # Era 업데이트
-            self.previous_era[node_name] = current_era
+            # Era 업데이트 (감소하지 않음)
+            self.previous_era[node_name] = max(current_era, self.previous_era.get(node_name, current_era))
         
+        if transitions:
+            self._save_previous_era()
         return transitions
     
     async def _check_validator_status(self, node_name: str, current_era: int):
@@ -0,0 +1,121 @@
+# loop_monitor.py
+import asyncio
+import collections
+import logging
+import time
+from typing import Dict, Any, Optional
+
+from stage_metrics import stage_metrics
+
+logger = logging.getLogger(__name__)
+
+STAGE_LOOP_LAG = "loop_lag"              # 예정 시각 대비 실제 깨어난 시각의 지연
+SAMPLE_INTERVAL = 0.5                    # 지연 측정 주기 (초)
+INVENTORY_INTERVAL = 10.0                # 태스크 목록 집계 주기 (초)
+STALL_THRESHOLD = 0.25                   # 이 이상 지연되면 블로킹으로 보고 경고 (초)
+HEALTH_CHECK_CORO = "DockerStatsClient._health_check_stream"
+
+
+def task_name(task: asyncio.Task) -> str:
+    """태스크의 코루틴 이름 (예: WebSocketClient._ping_loop)"""
+    coro = task.get_coro()
+    return getattr(coro, "__qualname__", None) or type(coro).__name__
+
+
+class LoopMonitor:
+    """asyncio 이벤트 루프 지연 측정 및 태스크 목록 집계
+
+    - SAMPLE_INTERVAL 마다 sleep 후 예정 시각과 실제 시각의 차이를 loop_lag 히스토그램에 기록
+    - INVENTORY_INTERVAL 마다 살아 있는 태스크를 코루틴 이름별로 집계
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL, inventory_interval: float = INVENTORY_INTERVAL,
+                 stall_threshold: float = STALL_THRESHOLD):
+        self.interval = interval
+        self.inventory_interval = inventory_interval
+        self.stall_threshold = stall_threshold
+        self.task: Optional[asyncio.Task] = None
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.stalls = 0
+        # 요약 전송 구간 통계 (summary 호출 시 초기화)
+        self.window_max_lag = 0.0
+        self.window_stalls = 0
+        self.inventory: Dict[str, int] = {}
+        self.inventory_time = 0.0
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+            logger.info(f"이벤트 루프 모니터 시작 (측정 주기 {self.interval}초, 경고 기준 {self.stall_threshold * 1000:.0f}ms)")
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        next_inventory = loop.time()
+        while True:
+            scheduled = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            now = loop.time()
+            self._record_lag(max(0.0, now - scheduled))
+            if now >= next_inventory:
+                self.take_inventory()
+                next_inventory = now + self.inventory_interval
+
+    def _record_lag(self, lag: float):
+        self.last_lag = lag
+        stage_metrics.observe(STAGE_LOOP_LAG, lag)
+        if lag > self.max_lag:
+            self.max_lag = lag
+        if lag > self.window_max_lag:
+            self.window_max_lag = lag
+        if lag >= self.stall_threshold:
+            self.stalls += 1
+            self.window_stalls += 1
+            logger.warning(f"이벤트 루프 지연 {lag * 1000:.0f}ms (블로킹 호출 의심)")
+
+    def take_inventory(self) -> Dict[str, int]:
+        counts = collections.Counter(task_name(task) for task in asyncio.all_tasks())
+        self.inventory = dict(counts.most_common())
+        self.inventory_time = time.time()
+        return self.inventory
+
+    @property
+    def health_check_tasks(self) -> int:
+        return self.inventory.get(HEALTH_CHECK_CORO, 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "last_lag_ms": round(self.last_lag * 1000, 3),
+            "max_lag_ms": round(self.max_lag * 1000, 3),
+            "stalls": self.stalls,
+            "tasks_total": sum(self.inventory.values()),
+            "health_check_tasks": self.health_check_tasks,
+            "tasks": self.inventory,
+        }
+
+    def summary(self, reset: bool = True) -> Dict[str, Any]:
+        """요약 전송용 (지난 요약 이후 최대 지연과 블로킹 횟수 + 현재 태스크 목록)"""
+        result = {
+            "max_lag_ms": round(self.window_max_lag * 1000, 3),
+            "stalls": self.window_stalls,
+            "tasks_total": sum(self.inventory.values()),
+            "health_check_tasks": self.health_check_tasks,
+            "tasks": self.inventory,
+        }
+        if reset:
+            self.window_max_lag = 0.0
+            self.window_stalls = 0
+        return result
+
+
+# 프로세스 전역 인스턴스
+loop_monitor = LoopMonitor()
@@ -16,6 +16,10 @@ from pathlib import Path
 import getpass
 import aiohttp
 
+from loop_monitor import loop_monitor
+from metrics_exporter import metrics_state
+from stage_metrics import stage_metrics, STAGE_LOOP, STAGE_SYSTEM_COLLECT, STAGE_CONTAINER_SNAPSHOT
+
 # 로깅 설정
 logging.basicConfig(
     level=logging.INFO,
@@ -30,6 +34,9 @@ except ImportError:
     logger.warning("PayoutChecker not available")
     PayoutChecker = None
 
+from era_cache import EraCache, DEFAULT_ERA_CACHE_PATH
+from command_handler import authorship_cache
+
 # EraMonitor import
 try:
     from era_monitor import EraMonitor
@@ -304,7 +311,13 @@ class Settings:
         # 기본 설정
         self.SERVER_ID = os.environ.get("SERVER_ID", "")
         self.NODE_NAMES = os.environ.get("NODE_NAMES", "")
+        # 미청구 보상을 확인할 검증인 stash 계정 (SS58 또는 0x hex, 쉼표로 구분)
+        self.VALIDATOR_STASHES = [
+            address.strip() for address in os.environ.get("VALIDATOR_STASHES", "").split(",") if address.strip()
+        ]
         self.MONITOR_INTERVAL = int(os.environ.get("MONITOR_INTERVAL", "5"))
+        # 지난 era 체인 데이터 / EraMonitor 상태를 보관할 SQLite 파일
+        self.ERA_CACHE_PATH = os.environ.get("ERA_CACHE_PATH", DEFAULT_ERA_CACHE_PATH)
         
         # WebSocket 설정
         self.SERVER_URL = os.environ.get("SERVER_URL")
@@ -326,6 +339,14 @@ class Settings:
         
         # Docker 설정
         self.CREDITCOIN_DIR = os.environ.get("CREDITCOIN_DIR", "")
+        # docker 트래픽 기록/재생 (gzip JSON Lines 파일 경로)
+        self.DOCKER_RECORD_PATH = os.environ.get("DOCKER_RECORD_PATH", "")
+        self.DOCKER_REPLAY_PATH = os.environ.get("DOCKER_REPLAY_PATH", "")
+        self.DOCKER_REPLAY_SPEED = float(os.environ.get("DOCKER_REPLAY_SPEED", "1.0"))
+        
+        # 로컬 메트릭 엔드포인트 (0 = 비활성화)
+        self.METRICS_PORT = int(os.environ.get("METRICS_PORT", "0"))
+        self.METRICS_HOST = os.environ.get("METRICS_HOST", "127.0.0.1")
         
         # 실행 모드 설정
         self.LOCAL_MODE = os.environ.get("LOCAL_MODE", "").lower() in ('true', '1', 'yes')
@@ -379,6 +400,14 @@ class Settings:
                 self.MAX_RETRIES = args.max_retries
             if args.retry_interval:
                 self.RETRY_INTERVAL = args.retry_interval
+            if args.record:
+                self.DOCKER_RECORD_PATH = args.record
+            if args.replay:
+                self.DOCKER_REPLAY_PATH = args.replay
+            if args.replay_speed is not None:
+                self.DOCKER_REPLAY_SPEED = args.replay_speed
+            if args.metrics_port is not None:
+                self.METRICS_PORT = args.metrics_port
         
         # 디버그 모드면 로그 레벨 설정
         if self.DEBUG_MODE:
@@ -420,6 +449,12 @@ class Settings:
             logger.info(f"재시도 간격: {self.RETRY_INTERVAL}초")
         
         logger.info(f"Docker 모니터링: {'비활성화' if self.NO_DOCKER else '활성화'}")
+        if self.DOCKER_REPLAY_PATH:
+            logger.info(f"Docker 트래픽 재생: {self.DOCKER_REPLAY_PATH} ({self.DOCKER_REPLAY_SPEED}배속)")
+        elif self.DOCKER_RECORD_PATH:
+            logger.info(f"Docker 트래픽 기록: {self.DOCKER_RECORD_PATH}")
+        if self.METRICS_PORT:
+            logger.info(f"메트릭 엔드포인트: {self.METRICS_HOST}:{self.METRICS_PORT}")
         logger.info(f"Creditcoin 디렉토리: {self.CREDITCOIN_DIR}")
         logger.info(f"디버그 모드: {'활성화' if self.DEBUG_MODE else '비활성화'}")
         logger.info("================")
@@ -1210,6 +1245,10 @@ def parse_args():
     parser.add_argument('--no-docker', action='store_true', help='Docker 모니터링 비활성화')
     parser.add_argument('--max-retries', type=int, default=None, help='WebSocket 연결 최대 재시도 횟수 (0=무한)')
     parser.add_argument('--retry-interval', type=int, help='WebSocket 연결 재시도 간격(초)')
+    parser.add_argument('--record', help='docker 명령/stats 트래픽을 기록할 파일 (.jsonl.gz)')
+    parser.add_argument('--replay', help='기록된 docker 트래픽 파일을 재생 (docker 미사용)')
+    parser.add_argument('--replay-speed', type=float, default=None, help='재생 배속 (0=대기 없음)')
+    parser.add_argument('--metrics-port', type=int, default=None, help='로컬 메트릭 엔드포인트 포트 (0=비활성화)')
     
     return parser.parse_args()
 
@@ -1231,7 +1270,11 @@ async def run_local_mode(settings, node_names: List[str]):
         try:
             # 먼저 Docker Stats 클라이언트 사용 시도
             from docker_stats_client import DockerStatsClient
-            docker_stats_client = DockerStatsClient()
+            docker_stats_client = DockerStatsClient(
+                record_path=settings.DOCKER_RECORD_PATH or None,
+                replay_path=settings.DOCKER_REPLAY_PATH or None,
+                replay_speed=settings.DOCKER_REPLAY_SPEED
+            )
             
             # Docker stats 모니터링 시작
             success = await docker_stats_client.start_stats_monitoring(node_names)
@@ -1266,6 +1309,9 @@ async def run_local_mode(settings, node_names: List[str]):
             print_metrics(sys_metrics, container_list, settings.MONITOR_INTERVAL)
             sys.stdout.flush()
             
+            # 메트릭 엔드포인트용 상태 갱신
+            metrics_state.update_tick(sys_metrics, container_list)
+            
             # 실행 시간 계산
             loop_end_time = time.time()
             execution_time = loop_end_time - loop_start_time
@@ -1337,7 +1383,11 @@ async def run_websocket_mode(settings, node_names: List[str]):
         try:
             # Docker Stats 클라이언트 사용
             from docker_stats_client import DockerStatsClient
-            docker_stats_client = DockerStatsClient()
+            docker_stats_client = DockerStatsClient(
+                record_path=settings.DOCKER_RECORD_PATH or None,
+                replay_path=settings.DOCKER_REPLAY_PATH or None,
+                replay_speed=settings.DOCKER_REPLAY_SPEED
+            )
             
             # Docker stats 모니터링 시작
             success = await docker_stats_client.start_stats_monitoring(node_names)
@@ -1356,11 +1406,15 @@ async def run_websocket_mode(settings, node_names: List[str]):
     # 전송 통계
     stats = TransmissionStats()
     
+    # 지난 era 데이터 캐시 (PayoutChecker, EraMonitor 공용)
+    era_cache = EraCache(settings.ERA_CACHE_PATH)
+    authorship_cache.attach(era_cache)  # 검증인 확인 결과를 epoch 단위로 보관
+    
     # PayoutChecker 초기화
     payout_checker = None
     if PayoutChecker:
         try:
-            payout_checker = PayoutChecker()
+            payout_checker = PayoutChecker(settings.VALIDATOR_STASHES, era_cache=era_cache)
             logger.info("PayoutChecker 초기화 완료")
         except Exception as e:
             logger.warning(f"PayoutChecker 초기화 실패: {e}")
@@ -1369,7 +1423,7 @@ async def run_websocket_mode(settings, node_names: List[str]):
     era_monitor = None
     if EraMonitor:
         try:
-            era_monitor = EraMonitor(websocket_client)
+            era_monitor = EraMonitor(websocket_client, era_cache=era_cache)
             websocket_client.set_era_monitor(era_monitor)  # WebSocketClient에 EraMonitor 설정
             logger.info("EraMonitor 초기화 완료")
         except Exception as e:
@@ -1421,6 +1475,11 @@ async def run_websocket_mode(settings, node_names: List[str]):
     
     logger.info("WebSocket 서버에 성공적으로 연결되었습니다!")
     
+    # 체인별 Era/세션 스토리지 구독 (register_ack 의 last_era_info 를 병합한 뒤 시작해야
+    # 첫 알림에서 모든 노드가 첫 실행으로 처리되지 않음)
+    if era_monitor:
+        era_monitor.start(node_names)
+    
     # 모니터링 루프
     try:
         while not shutdown_event.is_set():
@@ -1433,6 +1492,7 @@ async def run_websocket_mode(settings, node_names: List[str]):
             t_start = time.time()
             sys_metrics = system_info.collect()
             t_end = time.time()
+            stage_metrics.observe(STAGE_SYSTEM_COLLECT, t_end - t_start)
             if t_end - t_start > 0.1:  # 실행 시간이 0.1초 이상인 경우만 로그
                 logger.debug(f"시스템 정보 수집 시간: {t_end - t_start:.3f}초")
             
@@ -1459,6 +1519,7 @@ async def run_websocket_mode(settings, node_names: List[str]):
                     logger.error(f"Docker 정보 수집 실패: {e}")
                 
                 t_end = time.time()
+                stage_metrics.observe(STAGE_CONTAINER_SNAPSHOT, t_end - t_start)
                 if t_end - t_start > 0.5:  # 실행 시간이 0.5초 이상인 경우만 로그
                     logger.debug(f"Docker 정보 수집 시간: {t_end - t_start:.3f}초")
             
@@ -1495,6 +1556,7 @@ async def run_websocket_mode(settings, node_names: List[str]):
                 loop_end_time = time.time()
                 processing_time = loop_end_time - loop_start_time
                 stats.add_processing_time(processing_time)
+                stage_metrics.observe(STAGE_LOOP, processing_time)
                 
                 # 60회 데이터 버퍼에 추가
                 stats.add_sixty_point_data(
@@ -1541,19 +1603,27 @@ async def run_websocket_mode(settings, node_names: List[str]):
                                 else:
                                     logger.warning("No container names found for payout check")
                                 
-                                # Era 전환 체크
-                                if era_monitor and 'payout_info' in locals():
-                                    try:
-                                        transitions = await era_monitor.check_era_transition(payout_info)
-                                        if transitions:
-                                            summary_data['era_transitions'] = transitions
-                                            logger.info(f"Era 전환 감지: {list(transitions.keys())}")
-                                    except Exception as e:
-                                        logger.error(f"Era 전환 체크 실패: {e}")
                             except Exception as e:
                                 logger.error(f"페이아웃 체크 실패: {e}")
                                 summary_data['payout_info'] = {"error": str(e)}
                         
+                        # 지난 요약 이후 스토리지 구독으로 감지된 Era 전환
+                        if era_monitor:
+                            transitions = era_monitor.pop_transitions()
+                            if transitions:
+                                summary_data['era_transitions'] = transitions
+                                logger.info(f"Era 전환 감지: {list(transitions.keys())}")
+                            # 헤더 다이제스트로 집계한 epoch 별 블록 생성/누락 수
+                            block_production = era_monitor.tracker.summary()
+                            if block_production:
+                                summary_data['block_production'] = block_production
+                            # 구독 대신 조회로 대체 중인 체인이 있으면 서버에도 저하 상태로 보고
+                            summary_data['era_monitor'] = era_monitor.status()
+
+                        # 지난 요약 이후 단계별 지연 시간, 이벤트 루프 지연 및 태스크 목록
+                        summary_data['stage_timings'] = stage_metrics.summary()
+                        summary_data['event_loop'] = loop_monitor.summary()
+                        
                         logger.info(f"60회 평균 통계 계산 완료. 서버로 전송 중...")
                         summary_sent = await websocket_client.send_summary(summary_data)
                         if summary_sent:
@@ -1576,6 +1646,15 @@ async def run_websocket_mode(settings, node_names: List[str]):
                     configured_nodes=node_names  # configured_nodes 전달
                 )
             
+            # 메트릭 엔드포인트용 상태 갱신
+            metrics_state.update_tick(sys_metrics, container_list, {
+                "sent_total": stats.total_sent,
+                "success_total": stats.success_count,
+                "error_total": stats.error_count,
+                "bytes_sent_total": stats.total_bytes_sent,
+                "last_data_size_bytes": stats.last_data_size,
+            })
+            
             # 실행 시간 계산
             loop_end_time = time.time()
             execution_time = loop_end_time - loop_start_time
@@ -1633,6 +1712,10 @@ async def run_websocket_mode(settings, node_names: List[str]):
         except Exception as e:
             logger.error(f"WebSocket 연결 종료 중 오류: {e}")
         
+        if era_monitor:
+            await era_monitor.stop()
+        
+        era_cache.close()
         logger.info("모니터링 종료")
 
 # 메인 함수
@@ -1677,11 +1760,27 @@ async def main():
     # 설정 정보 출력
     settings.print_settings()
     
+    # 로컬 메트릭 엔드포인트
+    metrics_server = None
+    if settings.METRICS_PORT:
+        from metrics_server import MetricsServer
+        metrics_server = MetricsServer(settings.METRICS_PORT, settings.METRICS_HOST)
+        if not await metrics_server.start():
+            metrics_server = None
+    
+    # 이벤트 루프 지연 / 태스크 목록 모니터
+    loop_monitor.start()
+    
     # 실행 모드 선택
-    if settings.LOCAL_MODE:
-        await run_local_mode(settings, node_names)
-    else:
-        await run_websocket_mode(settings, node_names)
+    try:
+        if settings.LOCAL_MODE:
+            await run_local_mode(settings, node_names)
+        else:
+            await run_websocket_mode(settings, node_names)
+    finally:
+        await loop_monitor.stop()
+        if metrics_server:
+            await metrics_server.stop()
 
 # 종료 플래그 (전역 변수)
 shutdown_event = asyncio.Event()  # 종료 이벤트 초기화
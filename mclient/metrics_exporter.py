@@ -0,0 +1,225 @@
+# metrics_exporter.py
+import logging
+import time
+from typing import Dict, List, Any, Optional, Tuple
+
+from loop_monitor import loop_monitor
+from stage_metrics import stage_metrics
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = "mclient"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# (메트릭 이름, 타입, 설명, sys_metrics 키)
+HOST_METRICS = (
+    ("host_cpu_usage_percent", "gauge", "호스트 CPU 사용률", "cpu_usage"),
+    ("host_cpu_user_percent", "gauge", "호스트 CPU user 비율", "cpu_user"),
+    ("host_cpu_system_percent", "gauge", "호스트 CPU system 비율", "cpu_system"),
+    ("host_cpu_idle_percent", "gauge", "호스트 CPU idle 비율", "cpu_idle"),
+    ("host_cpu_cores", "gauge", "호스트 CPU 코어 수", "cpu_cores"),
+    ("host_memory_total_bytes", "gauge", "호스트 전체 메모리", "host_memory_total"),
+    ("host_docker_memory_total_bytes", "gauge", "Docker 전체 메모리", "docker_memory_total"),
+    ("host_docker_memory_used_bytes", "gauge", "Docker 사용 메모리", "docker_memory_used"),
+    ("host_docker_memory_percent", "gauge", "Docker 메모리 사용률", "docker_memory_percent"),
+    ("host_swap_total_bytes", "gauge", "스왑 전체", "swap_total"),
+    ("host_swap_used_bytes", "gauge", "스왑 사용량", "swap_used"),
+    ("host_uptime_seconds", "gauge", "호스트 가동 시간", "uptime"),
+    ("host_disk_total_bytes", "gauge", "디스크 전체", "disk_total"),
+    ("host_disk_used_bytes", "gauge", "디스크 사용량", "disk_used"),
+    ("host_disk_available_bytes", "gauge", "디스크 여유 공간", "disk_available"),
+    ("host_disk_percent", "gauge", "디스크 사용률", "disk_percent"),
+)
+
+# (메트릭 이름, 타입, 설명, 컨테이너 dict 경로)
+CONTAINER_METRICS = (
+    ("container_cpu_percent", "gauge", "컨테이너 CPU 사용률", ("cpu", "percent")),
+    ("container_memory_usage_bytes", "gauge", "컨테이너 메모리 사용량", ("memory", "usage")),
+    ("container_memory_limit_bytes", "gauge", "컨테이너 메모리 한도", ("memory", "limit")),
+    ("container_memory_percent", "gauge", "컨테이너 메모리 사용률", ("memory", "percent")),
+    ("container_network_rx_bytes_total", "counter", "컨테이너 네트워크 수신량", ("network", "rx")),
+    ("container_network_tx_bytes_total", "counter", "컨테이너 네트워크 송신량", ("network", "tx")),
+    ("container_disk_read_bytes_total", "counter", "컨테이너 디스크 읽기량", ("disk", "read")),
+    ("container_disk_write_bytes_total", "counter", "컨테이너 디스크 쓰기량", ("disk", "write")),
+    ("container_data_size_bytes", "gauge", "노드 데이터 볼륨 크기", ("data_size",)),
+    ("node_current_block", "gauge", "현재(best) 블록 높이", ("blockchain", "current_block")),
+    ("node_finalized_block", "gauge", "Finalized 블록 높이", ("blockchain", "finalized_block")),
+    ("node_target_block", "gauge", "동기화 목표 블록 높이", ("blockchain", "target_block")),
+    ("node_peers", "gauge", "연결된 피어 수", ("blockchain", "peers")),
+)
+
+# DockerStatsClient 가 설정하는 sync_state 값
+SYNC_STATES = ("synced", "syncing", "catching_up", "no_peers", "initializing", "checking", "offline", "unknown")
+
+
+def escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label(value)}"' for key, value in labels.items()) + "}"
+
+
+def format_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    try:
+        return repr(float(value))
+    except (TypeError, ValueError):
+        return "0"
+
+
+def _lookup(data: Dict[str, Any], path: Tuple[str, ...]) -> Optional[Any]:
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+class MetricsState:
+    """마지막 수집 결과를 보관하고 Prometheus 텍스트로 변환
+
+    전송 루프가 매 틱 update_tick() 을 호출하고, 텍스트는 스크레이프 시점에
+    틱당 한 번만 생성해 캐시한다.
+    """
+
+    def __init__(self):
+        self.host_name = ""
+        self.sys_metrics: Dict[str, Any] = {}
+        self.containers: List[Dict[str, Any]] = []
+        self.transmission: Dict[str, Any] = {}
+        self.tick = 0
+        self.last_tick_time = 0.0
+        # 마지막 전송 메시지 (직렬화된 JSON, mtick / /debug/last_send 용)
+        self.last_send: Optional[str] = None
+        self.last_send_time = 0.0
+        self._cached_tick = -1
+        self._cached_text = ""
+
+    def update_tick(self, sys_metrics: Dict[str, Any], containers: List[Dict[str, Any]],
+                    transmission: Optional[Dict[str, Any]] = None):
+        self.sys_metrics = sys_metrics
+        self.host_name = sys_metrics.get("host_name", "")
+        self.containers = containers
+        if transmission is not None:
+            self.transmission = transmission
+        self.tick += 1
+        self.last_tick_time = time.time()
+
+    def set_last_send(self, message_json: str):
+        self.last_send = message_json
+        self.last_send_time = time.time()
+
+    def render(self) -> str:
+        """캐시된 Prometheus 텍스트 반환 (새 틱이 있으면 다시 생성)"""
+        if self._cached_tick != self.tick:
+            started = time.perf_counter()
+            self._cached_text = self._render()
+            self._cached_tick = self.tick
+            logger.debug(f"메트릭 렌더링: {len(self._cached_text)} 바이트, {(time.perf_counter() - started) * 1000:.2f}ms")
+        return self._cached_text
+
+    def _render(self) -> str:
+        lines: List[str] = []
+        host_labels = {"host": self.host_name}
+
+        def metric_header(name: str, metric_type: str, help_text: str):
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} {metric_type}")
+
+        def sample(name: str, labels: Dict[str, Any], value: Any):
+            lines.append(f"{METRIC_PREFIX}_{name}{format_labels(labels)} {format_value(value)}")
+
+        metric_header("last_tick_timestamp_seconds", "gauge", "마지막 수집 시각")
+        sample("last_tick_timestamp_seconds", host_labels, round(self.last_tick_time, 3))
+
+        for name, metric_type, help_text, key in HOST_METRICS:
+            value = self.sys_metrics.get(key)
+            if value is None:
+                continue
+            metric_header(name, metric_type, help_text)
+            sample(name, host_labels, value)
+
+        container_labels = []
+        for container in self.containers:
+            container_labels.append({
+                "host": self.host_name,
+                "container": container.get("name", ""),
+                "node_type": container.get("node_type", "unknown"),
+            })
+
+        for name, metric_type, help_text, path in CONTAINER_METRICS:
+            samples = []
+            for container, labels in zip(self.containers, container_labels):
+                value = _lookup(container, path)
+                if value is not None:
+                    samples.append((labels, value))
+            if not samples:
+                continue
+            metric_header(name, metric_type, help_text)
+            for labels, value in samples:
+                sample(name, labels, value)
+
+        sync_samples = [(container, labels) for container, labels in zip(self.containers, container_labels)
+                        if "sync_state" in container]
+        if sync_samples:
+            metric_header("node_sync_state", "gauge", "노드 동기화 상태 (해당 상태면 1)")
+            for container, labels in sync_samples:
+                current = container.get("sync_state", "unknown")
+                for state in SYNC_STATES:
+                    sample("node_sync_state", dict(labels, state=state), current == state)
+
+        if self.transmission:
+            for key, value in sorted(self.transmission.items()):
+                metric_type = "counter" if key.endswith("_total") else "gauge"
+                metric_header(f"transmission_{key}", metric_type, f"전송 통계 {key}")
+                sample(f"transmission_{key}", host_labels, value)
+
+        self._render_loop(lines, host_labels)
+        self._render_stages(lines, host_labels)
+        lines.append("")
+        return "\n".join(lines)
+
+    def _render_loop(self, lines: List[str], host_labels: Dict[str, Any]):
+        """이벤트 루프 지연 및 코루틴별 태스크 수 (지연 분포는 stage=loop_lag 히스토그램)"""
+        lines.append(f"# HELP {METRIC_PREFIX}_event_loop_lag_seconds 마지막 이벤트 루프 지연")
+        lines.append(f"# TYPE {METRIC_PREFIX}_event_loop_lag_seconds gauge")
+        lines.append(f"{METRIC_PREFIX}_event_loop_lag_seconds{format_labels(host_labels)} {format_value(loop_monitor.last_lag)}")
+        lines.append(f"# HELP {METRIC_PREFIX}_event_loop_stalls_total 경고 기준 이상 지연된 횟수")
+        lines.append(f"# TYPE {METRIC_PREFIX}_event_loop_stalls_total counter")
+        lines.append(f"{METRIC_PREFIX}_event_loop_stalls_total{format_labels(host_labels)} {loop_monitor.stalls}")
+        if loop_monitor.inventory:
+            lines.append(f"# HELP {METRIC_PREFIX}_asyncio_tasks 코루틴별 실행 중인 태스크 수")
+            lines.append(f"# TYPE {METRIC_PREFIX}_asyncio_tasks gauge")
+            for coroutine, count in sorted(loop_monitor.inventory.items()):
+                labels = dict(host_labels, coroutine=coroutine)
+                lines.append(f"{METRIC_PREFIX}_asyncio_tasks{format_labels(labels)} {count}")
+
+    def _render_stages(self, lines: List[str], host_labels: Dict[str, Any]):
+        """단계별 지연 시간 히스토그램"""
+        name = f"{METRIC_PREFIX}_stage_duration_seconds"
+        histograms = sorted(stage_metrics.histograms.items())
+        if not histograms:
+            return
+        lines.append(f"# HELP {name} 처리 단계별 소요 시간")
+        lines.append(f"# TYPE {name} histogram")
+        for (stage, label), histogram in histograms:
+            labels = dict(host_labels, stage=stage)
+            if label:
+                labels["label"] = label
+            cumulative = 0
+            for index, bucket_count in enumerate(histogram.counts):
+                cumulative += bucket_count
+                le = repr(histogram.buckets[index]) if index < len(histogram.buckets) else "+Inf"
+                lines.append(f"{name}_bucket{format_labels(dict(labels, le=le))} {cumulative}")
+            lines.append(f"{name}_sum{format_labels(labels)} {format_value(histogram.sum)}")
+            lines.append(f"{name}_count{format_labels(labels)} {histogram.count}")
+
+
+# 프로세스 전역 인스턴스 (main 이 갱신, metrics_server 가 제공)
+metrics_state = MetricsState()
@@ -0,0 +1,68 @@
+# metrics_server.py
+import json
+import logging
+from typing import Optional
+
+from aiohttp import web
+
+from loop_monitor import loop_monitor
+from metrics_exporter import metrics_state, CONTENT_TYPE
+from stage_metrics import stage_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsServer:
+    """로컬 메트릭 HTTP 엔드포인트
+
+    GET /metrics          - Prometheus 텍스트 (틱당 한 번 생성 후 캐시)
+    GET /stages           - 단계별 지연 시간 히스토그램 (JSON)
+    GET /loop             - 이벤트 루프 지연 및 태스크 목록 (JSON)
+    GET /debug/last_send  - 마지막으로 전송한 stats 메시지 (mtick 용)
+    """
+
+    def __init__(self, port: int, host: str = "127.0.0.1"):
+        self.host = host
+        self.port = port
+        self.app = web.Application()
+        self.app.router.add_get("/metrics", self.handle_metrics)
+        self.app.router.add_get("/stages", self.handle_stages)
+        self.app.router.add_get("/loop", self.handle_loop)
+        self.app.router.add_get("/debug/last_send", self.handle_last_send)
+        self.runner: Optional[web.AppRunner] = None
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        response = web.Response(text=metrics_state.render())
+        # aiohttp 는 content_type 인자에 charset 포함을 허용하지 않으므로 헤더로 지정
+        response.headers["Content-Type"] = CONTENT_TYPE
+        return response
+
+    async def handle_last_send(self, request: web.Request) -> web.Response:
+        if metrics_state.last_send is None:
+            return web.json_response({"error": "아직 전송된 데이터가 없습니다"}, status=404)
+        return web.Response(text=metrics_state.last_send, content_type="application/json")
+
+    async def handle_stages(self, request: web.Request) -> web.Response:
+        return web.Response(text=json.dumps(stage_metrics.snapshot()), content_type="application/json")
+
+    async def handle_loop(self, request: web.Request) -> web.Response:
+        return web.json_response(loop_monitor.snapshot())
+
+    async def start(self) -> bool:
+        try:
+            self.runner = web.AppRunner(self.app, access_log=None)
+            await self.runner.setup()
+            site = web.TCPSite(self.runner, self.host, self.port)
+            await site.start()
+            logger.info(f"메트릭 엔드포인트 시작: http://{self.host}:{self.port}/metrics")
+            return True
+        except Exception as e:
+            logger.error(f"메트릭 엔드포인트 시작 실패: {e}")
+            self.runner = None
+            return False
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+            logger.info("메트릭 엔드포인트 중지")
@@ -1,31 +1,78 @@
 # payout_checker.py
 import asyncio
-import json
 import logging
-from typing import Dict, List, Any, Optional
+import time
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 
+from chain_registry import chain_registry, node_rpc, node_rpc_port
+from stage_metrics import stage_metrics
+from substrate_utils import (
+    twox_64_concat, ss58_decode, storage_key, storage_prefix_hex, storage_map_keys, hex_to_bytes,
+    decode_u32, decode_u32_vec, decode_staking_ledger, decode_exposure_metadata, decode_exposure_total,
+    decode_active_era_info,
+)
+
 logger = logging.getLogger(__name__)
 
+# Staking 스토리지 키 (twox_128("Staking") + twox_128(항목 이름))
+STAKING_ACTIVE_ERA_KEY = storage_key("Staking", "ActiveEra")
+STAKING_HISTORY_DEPTH_KEY = storage_key("Staking", "HistoryDepth")
+STAKING_BONDED_PREFIX = storage_prefix_hex("Staking", "Bonded")
+STAKING_LEDGER_PREFIX = storage_prefix_hex("Staking", "Ledger")
+STAKING_ERAS_STAKERS_PREFIX = storage_prefix_hex("Staking", "ErasStakers")
+STAKING_ERAS_STAKERS_OVERVIEW_PREFIX = storage_prefix_hex("Staking", "ErasStakersOverview")
+STAKING_CLAIMED_REWARDS_PREFIX = storage_prefix_hex("Staking", "ClaimedRewards")
+
+# 런타임에 HistoryDepth 스토리지가 없으면 (상수로 바뀐 버전) 사용하는 기본값
+DEFAULT_HISTORY_DEPTH = 84
+# state_queryStorageAt 한 번에 조회할 키 수
+QUERY_BATCH_SIZE = 1000
+
+# 지난번 성공한 노드를 다른 노드보다 먼저 확인하는 시간 (초)
+PREFERRED_HEAD_START = 2.0
+STAGE_PAYOUT_PROBE = "payout_probe"
+
+# EraCache 에 저장하는 값 종류 (키: stash AccountId hex)
+ERA_KIND_EXPOSURE_PAGES = "exposure_pages"  # 보상 페이지 수 (0 = 해당 era 미선출)
+ERA_KIND_CLAIMED = "claimed"                # 모든 페이지 청구 완료
+
+
 class PayoutChecker:
     """페이아웃 체크 기능 - 누구나 실행 가능한 페이아웃 확인"""
     
-    def __init__(self):
+    def __init__(self, validator_stashes: Optional[List[str]] = None, era_cache=None, registry=None):
         self.payout_cache = {}
         self.last_check_time = {}
+        self.era_cache = era_cache  # EraCache (없으면 매번 전체 조회)
+        # 체인별 노드 묶음, 체인 전역 조회 라우팅/캐시, 마지막으로 동기화가 확인된 노드
+        self.registry = registry or chain_registry
+        # 미청구 보상을 확인할 검증인 stash 계정 (SS58 또는 0x hex)
+        self.validator_stashes: Dict[str, bytes] = {}
+        for address in validator_stashes or []:
+            try:
+                self.validator_stashes[address] = ss58_decode(address)
+            except ValueError as e:
+                logger.error(f"검증인 stash 주소 무시: {e}")
         
     async def check_container_payout(self, container_name: str) -> Dict[str, Any]:
         """노드를 통해 네트워크의 미청구 페이아웃 확인"""
+        genesis = await self.registry.resolve(container_name)
+        if genesis is None:
+            return {"container": container_name, "error": "Failed to get chain genesis"}
+        probe = await self._probe_container(container_name)
+        if probe.get('error'):
+            return probe
+        self.registry.mark_healthy(container_name)
+        return await self._scan_chain(genesis, container_name)
+    
+    async def _probe_container(self, container_name: str) -> Dict[str, Any]:
+        """노드 동기화 상태 확인 (노드별 조회 - 체인 조회에 쓸 수 있는 노드인지)"""
         try:
-            # 포트 결정
-            if container_name.startswith('3node'):
-                port = 33980 + int(container_name.replace('3node', ''))
-            elif container_name.startswith('node'):
-                port = 33970 + int(container_name.replace('node', ''))
-            else:
+            port = node_rpc_port(container_name)
+            if port is None:
                 return {"error": f"Unknown container type: {container_name}"}
             
-            # 1. 노드 동기화 상태 확인
             sync_status = await self._check_sync_status(container_name, port)
             if not sync_status.get('synced'):
                 return {
@@ -34,33 +81,12 @@ class PayoutChecker:
                     "sync_status": sync_status
                 }
             
-            # 2. 현재 era 가져오기
-            current_era = await self._get_current_era(container_name, port)
-            if current_era is None:
-                return {
-                    "container": container_name,
-                    "error": "Failed to get current era"
-                }
-            
-            # 3. 전체 검증인의 미청구 페이아웃 확인
-            # 실제로는 특정 검증인 리스트가 있다면 그것만 체크하는 것이 효율적
-            payout_info = await self._check_unclaimed_payouts(container_name, port, current_era)
-            
-            result = {
+            return {
                 "container": container_name,
-                "current_era": current_era,
-                "unclaimed_payouts": payout_info.get('unclaimed_count', 0),
-                "sample_validators": payout_info.get('sample_validators', []),
-                "timestamp": datetime.now().isoformat(),
-                "synced": True
+                "synced": True,
+                "peers": sync_status.get('peers', 0)
             }
             
-            # 캐시에 저장
-            self.payout_cache[container_name] = result
-            self.last_check_time[container_name] = datetime.now()
-            
-            return result
-            
         except Exception as e:
             logger.error(f"Payout check failed for {container_name}: {e}")
             return {
@@ -68,117 +94,368 @@ class PayoutChecker:
                 "error": str(e)
             }
     
+    async def _scan_chain(self, genesis: str, container_name: str) -> Dict[str, Any]:
+        """체인의 현재 era 확인 후 설정된 검증인 stash 의 미청구 페이아웃 확인 (HistoryDepth 전체)"""
+        # 현재 era 가져오기 (체인 전역 조회 - EraMonitor 등과 캐시 공유)
+        current_era = await self._get_current_era(genesis)
+        if current_era is None:
+            return {
+                "container": container_name,
+                "error": "Failed to get current era"
+            }
+        
+        payout_info = await self._check_unclaimed_payouts(genesis, current_era)
+        
+        result = {
+            "container": container_name,
+            "current_era": current_era,
+            "unclaimed_payouts": payout_info.get('unclaimed_count', 0),
+            "unclaimed_count": payout_info.get('unclaimed_count', 0),
+            "unclaimed_eras": payout_info.get('unclaimed_eras', []),
+            "validators": payout_info.get('validators', {}),
+            "checked_eras": payout_info.get('checked_eras', 0),
+            "timestamp": datetime.now().isoformat(),
+            "synced": True
+        }
+        if 'error' in payout_info:
+            result["scan_error"] = payout_info['error']
+        
+        # 캐시에 저장
+        self.payout_cache[container_name] = result
+        self.last_check_time[container_name] = datetime.now()
+        
+        return result
+    
     async def _check_sync_status(self, container_name: str, port: int) -> Dict[str, Any]:
         """노드 동기화 상태 확인"""
         try:
-            cmd = [
-                'docker', 'exec', container_name,
-                'curl', '-s', '-H', 'Content-Type: application/json',
-                '-d', json.dumps({
-                    "jsonrpc": "2.0",
-                    "method": "system_health",
-                    "params": [],
-                    "id": 1
-                }),
-                f'http://localhost:{port}/'
-            ]
-            
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout, stderr = await process.communicate()
-            
-            if process.returncode == 0:
-                response = json.loads(stdout.decode())
-                health = response.get('result', {})
-                return {
-                    "synced": health.get('isSyncing', True) == False,
-                    "peers": health.get('peers', 0)
-                }
+            health = await node_rpc(container_name, port, "system_health", []) or {}
+            return {
+                "synced": health.get('isSyncing', True) == False,
+                "peers": health.get('peers', 0)
+            }
         except Exception as e:
             logger.error(f"Failed to check sync status: {e}")
         
         return {"synced": False, "peers": 0}
     
-    async def _get_current_era(self, container_name: str, port: int) -> Optional[int]:
-        """현재 era 가져오기"""
+    async def _get_current_era(self, genesis: str) -> Optional[int]:
+        """현재 era 가져오기 (Staking.ActiveEra: Option<ActiveEraInfo>)"""
         try:
-            cmd = [
-                'docker', 'exec', container_name,
-                'curl', '-s', '-H', 'Content-Type: application/json',
-                '-d', json.dumps({
-                    "jsonrpc": "2.0",
-                    "method": "query_staking_activeEra",
-                    "params": [],
-                    "id": 1
-                }),
-                f'http://localhost:{port}/'
-            ]
-            
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout, stderr = await process.communicate()
-            
-            if process.returncode == 0:
-                response = json.loads(stdout.decode())
-                return response.get('result', {}).get('index')
+            value = await self.registry.query(genesis, "state_getStorage", [STAKING_ACTIVE_ERA_KEY])
+            if not value:
+                return None
+            return decode_active_era_info(hex_to_bytes(value))[0]['index']
         except Exception as e:
             logger.error(f"Failed to get current era: {e}")
         
         return None
     
-    async def _check_unclaimed_payouts(self, container_name: str, port: int, current_era: int) -> Dict[str, Any]:
-        """미청구 페이아웃 확인 (샘플링)"""
+    async def _query_storage(self, genesis: str, keys: List[str], block_hash: str,
+                             stats: Dict[str, int]) -> Dict[str, Optional[bytes]]:
+        """state_queryStorageAt 으로 여러 키를 한 번에 조회 (QUERY_BATCH_SIZE 단위로 나눠 병렬 요청)
+        
+        블록 해시를 고정하므로 체인의 어느 노드가 답해도 같은 결과 (응답 없으면 다음 노드로 전환)
+        """
+        batches = [keys[i:i + QUERY_BATCH_SIZE] for i in range(0, len(keys), QUERY_BATCH_SIZE)]
+        responses = await asyncio.gather(*[
+            self.registry.query(genesis, "state_queryStorageAt", [batch, block_hash], ttl=0)
+            for batch in batches
+        ])
+        
+        values: Dict[str, Optional[bytes]] = dict.fromkeys(keys)
+        for change_sets in responses:
+            for change_set in change_sets or []:
+                for key, value in change_set.get('changes', []):
+                    if value is not None:
+                        values[key.lower()] = hex_to_bytes(value)
+        stats["round_trips"] += len(batches)
+        return values
+    
+    def _store_era_cache(self, genesis: str, eras: List[int], stashes: Dict[str, bytes],
+                         new_pages: Dict[tuple, int], claimed_pairs: set):
+        """새로 확인한 선출 여부(페이지 수, 0=미선출)와 청구 완료 기록을 era 별로 저장"""
+        pages_by_era: Dict[int, Dict[str, Any]] = {}
+        claimed_by_era: Dict[int, Dict[str, Any]] = {}
+        for (era, name), count in new_pages.items():
+            pages_by_era.setdefault(era, {})[stashes[name].hex()] = count
+        for era, name in claimed_pairs:
+            claimed_by_era.setdefault(era, {})[stashes[name].hex()] = True
+        for era in eras:
+            self.era_cache.put_era(genesis, era, ERA_KIND_EXPOSURE_PAGES, pages_by_era.get(era, {}))
+            self.era_cache.put_era(genesis, era, ERA_KIND_CLAIMED, claimed_by_era.get(era, {}))
+        if eras:
+            self.era_cache.prune(genesis, eras[0])
+    
+    async def _check_unclaimed_payouts(self, genesis: str, current_era: int) -> Dict[str, Any]:
+        """설정된 검증인 stash 의 미청구 era 확인
+        
+        finalized 블록 기준으로 아래 순서로 일괄 조회 (era x 검증인 마다 RPC 를 보내지 않음)
+            1. HistoryDepth, Bonded(stash), Ledger(stash)
+            2. Ledger(controller) - controller 가 stash 와 다른 경우만
+            3. ErasStakersOverview(era, stash), ClaimedRewards(era, stash) - HistoryDepth 전체
+            4. ErasStakers(era, stash) - Overview 가 없는 (페이지 도입 이전) era 만
+        
+        era_cache 가 있으면 끝난 era 의 선출 여부와 청구 완료 기록을 재사용하므로
+        이후 실행에서는 아직 청구되지 않은 (era, stash) 의 ClaimedRewards 와 새 era 만 조회
+        """
+        if not self.validator_stashes:
+            return {
+                "unclaimed_count": 0,
+                "unclaimed_eras": [],
+                "validators": {},
+                "checked_eras": 0,
+                "note": "VALIDATOR_STASHES 가 설정되지 않아 미청구 보상을 확인하지 않습니다"
+            }
+        
         try:
-            # 실제 구현에서는 관심있는 검증인 리스트를 가지고 있거나
-            # 또는 전체 검증인 중 일부를 샘플링하여 체크
+            stats = {"round_trips": 1}
+            block_hash = await self.registry.query(genesis, "chain_getFinalizedHead", ttl=0)
+            stashes = self.validator_stashes
+            
+            # 1. HistoryDepth + Bonded + Ledger(stash)
+            bonded_keys = dict(zip(stashes, storage_map_keys("Staking", "Bonded", stashes.values(),
+                                                             hasher="twox_64_concat")))
+            ledger_keys = dict(zip(stashes, storage_map_keys("Staking", "Ledger", stashes.values())))
+            values = await self._query_storage(
+                genesis,
+                [STAKING_HISTORY_DEPTH_KEY] + list(bonded_keys.values()) + list(ledger_keys.values()),
+                block_hash, stats
+            )
+            
+            depth_value = values.get(STAKING_HISTORY_DEPTH_KEY)
+            history_depth = decode_u32(depth_value)[0] if depth_value else DEFAULT_HISTORY_DEPTH
+            
+            # 2. controller 가 stash 와 다른 계정이면 해당 Ledger 조회
+            ledgers: Dict[str, Optional[bytes]] = {}
+            controller_keys: Dict[str, str] = {}
+            for name, account in stashes.items():
+                controller = values.get(bonded_keys[name])
+                if controller is None:
+                    logger.warning(f"{name[:16]}...: 본딩되지 않은 stash")
+                elif controller != account:
+                    controller_keys[name] = storage_key("Staking", "Ledger", controller,
+                                                        hashers=("blake2_128_concat",))
+                else:
+                    ledgers[name] = values.get(ledger_keys[name])
+            if controller_keys:
+                controller_values = await self._query_storage(
+                    genesis, list(controller_keys.values()), block_hash, stats
+                )
+                for name, key in controller_keys.items():
+                    ledgers[name] = controller_values.get(key)
+            
+            legacy_claimed = {
+                name: set(decode_staking_ledger(ledger)[0]["legacy_claimed_rewards"]) if ledger else set()
+                for name, ledger in ledgers.items()
+            }
+            
+            # 3. 확인 대상 era: 청구 가능 기간 (active era 는 아직 보상 확정 전이므로 제외)
+            #    끝난 era 의 선출 여부/페이지 수와 청구 완료 여부는 바뀌지 않으므로 캐시에 있으면 조회 생략
+            eras = list(range(max(0, current_era - history_depth), current_era))
+            era_keys = {era: twox_64_concat(era.to_bytes(4, 'little')).hex() for era in eras}
+            account_keys = {name: twox_64_concat(stashes[name]).hex() for name in ledgers}
+            cache = self.era_cache
+            
+            # (era, stash) -> 보상 페이지 수 (선출되지 않은 era 는 없음)
+            page_counts: Dict[tuple, int] = {}
+            claimed_pairs = set()
+            overview_keys = {}
+            claimed_keys = {}
+            for era in eras:
+                cached_pages = cache.get_era(genesis, era, ERA_KIND_EXPOSURE_PAGES) if cache else {}
+                cached_claimed = cache.get_era(genesis, era, ERA_KIND_CLAIMED) if cache else {}
+                for name in ledgers:
+                    pair = (era, name)
+                    stash_hex = stashes[name].hex()
+                    pages = cached_pages.get(stash_hex)
+                    if pages == 0:
+                        continue  # 선출되지 않은 era
+                    if pages is not None:
+                        page_counts[pair] = pages
+                    if era in legacy_claimed[name] or cached_claimed.get(stash_hex):
+                        claimed_pairs.add(pair)
+                        continue
+                    suffix = era_keys[era] + account_keys[name]
+                    if pages is None:
+                        overview_keys[pair] = STAKING_ERAS_STAKERS_OVERVIEW_PREFIX + suffix
+                    claimed_keys[pair] = STAKING_CLAIMED_REWARDS_PREFIX + suffix
+            
+            values = {}
+            if overview_keys or claimed_keys:
+                values = await self._query_storage(
+                    genesis,
+                    list(overview_keys.values()) + list(claimed_keys.values()),
+                    block_hash, stats
+                )
+            
+            new_pages: Dict[tuple, int] = {}
+            for pair, key in overview_keys.items():
+                overview = values.get(key)
+                if overview is not None:
+                    # 지명자가 없는 검증인도 페이지 1개로 청구
+                    new_pages[pair] = max(1, decode_exposure_metadata(overview)[0]["page_count"])
+            
+            # 4. Overview 가 없는 era 는 기존 ErasStakers 로 선출 여부 확인
+            legacy_keys = {
+                pair: STAKING_ERAS_STAKERS_PREFIX + era_keys[pair[0]] + account_keys[pair[1]]
+                for pair in overview_keys if pair not in new_pages
+            }
+            if legacy_keys:
+                legacy_values = await self._query_storage(
+                    genesis, list(legacy_keys.values()), block_hash, stats
+                )
+                for pair, key in legacy_keys.items():
+                    exposure = legacy_values.get(key)
+                    # total 이 0 이면 선출되지 않은 것으로 간주
+                    new_pages[pair] = 1 if exposure is not None and decode_exposure_total(exposure)[0] > 0 else 0
+            page_counts.update((pair, pages) for pair, pages in new_pages.items() if pages)
+            
+            for pair, key in claimed_keys.items():
+                pages = page_counts.get(pair)
+                claimed = values.get(key)
+                if pages and claimed and len(decode_u32_vec(claimed)[0]) >= pages:
+                    claimed_pairs.add(pair)
             
-            # 여기서는 단순화를 위해 기본 정보만 반환
-            # 실제로는 query_staking_validators 등을 사용하여
-            # 검증인 목록을 가져오고 각각의 미청구 보상을 확인해야 함
+            if cache:
+                self._store_era_cache(genesis, eras, stashes, new_pages, claimed_pairs)
+            
+            validators = {}
+            unclaimed_eras = set()
+            unclaimed_count = 0
+            for name in ledgers:
+                eras_for_stash = [
+                    era for era in eras
+                    if (era, name) in page_counts and (era, name) not in claimed_pairs
+                ]
+                validators[name] = {
+                    "unclaimed_eras": eras_for_stash,
+                    "active_eras": sum(1 for era in eras if (era, name) in page_counts)
+                }
+                unclaimed_count += len(eras_for_stash)
+                unclaimed_eras.update(eras_for_stash)
+            
+            logger.info(f"{self.registry.chain(genesis).name}: 미청구 보상 {unclaimed_count}건 "
+                        f"(검증인 {len(ledgers)}명, era {len(eras)}개, 조회 키 {len(overview_keys) + len(claimed_keys)}개, "
+                        f"RPC {stats['round_trips']}회)")
             
             return {
-                "unclaimed_count": 0,  # 실제로는 체크 로직 필요
-                "sample_validators": [],
-                "checked_eras": 0,
-                "note": "Simplified implementation - actual payout checking requires validator list"
+                "unclaimed_count": unclaimed_count,
+                "unclaimed_eras": sorted(unclaimed_eras),
+                "validators": validators,
+                "checked_eras": len(eras),
+                "history_depth": history_depth,
+                "block_hash": block_hash,
+                "round_trips": stats['round_trips']
             }
             
         except Exception as e:
             logger.error(f"Failed to check unclaimed payouts: {e}")
-            return {"unclaimed_count": 0, "error": str(e)}
+            return {"unclaimed_count": 0, "unclaimed_eras": [], "error": str(e)}
     
     async def check_all_payouts(self, containers: List[str]) -> Dict[str, Any]:
-        """모든 컨테이너를 통해 페이아웃 체크"""
-        results = {}
+        """모든 컨테이너를 통해 페이아웃 체크
         
+        genesis 해시로 노드를 체인별로 묶고, 체인마다 노드를 동시에 확인해
+        가장 먼저 동기화가 확인된 노드 하나로만 체인 조회를 보낸다.
+        """
         logger.debug(f"PayoutChecker received containers: {containers}")
         
-        # 노드 컨테이너만 필터링
+        # 노드 컨테이너만 필터링 후 체인별로 묶음
         node_containers = [c for c in containers if c.startswith(('node', '3node'))]
         logger.debug(f"Filtered node containers: {node_containers}")
+        groups, unresolved = await self.registry.group(node_containers)
         
-        # 병렬로 체크 (하지만 첫 번째 동기화된 노드만 사용해도 충분)
-        for container in node_containers:
-            result = await self.check_container_payout(container)
-            results[container] = result
-            
-            # 동기화된 노드를 찾으면 그것만 사용
-            if result.get('synced') and not result.get('error'):
-                logger.info(f"Using synced node {container} for payout check")
-                break
+        results = {}
+        for container in unresolved:
+            results[container] = {"container": container, "error": "Failed to get chain genesis"}
+        
+        chains = {}
+        chain_results = await asyncio.gather(*[
+            self._check_chain(genesis, names) for genesis, names in groups.items()
+        ])
+        for (genesis, names), (checks, used_node) in zip(groups.items(), chain_results):
+            results.update(checks)
+            used = checks.get(used_node, {}) if used_node else {}
+            chains[genesis] = {
+                "name": self.registry.chain(genesis).name,
+                "nodes": names,
+                "node": used_node,
+                "current_era": used.get('current_era'),
+            }
         
         return {
             "payout_checks": results,
+            "chains": chains,
+            "query_stats": dict(self.registry.stats),
             "timestamp": datetime.now().isoformat(),
             "note": "Payout can be executed by anyone - gas fees paid by executor"
         }
     
+    async def _check_chain(self, genesis: str, containers: List[str]) -> Tuple[Dict[str, Dict[str, Any]], Optional[str]]:
+        """한 체인의 노드들을 동시에 확인하고 첫 번째로 동기화된 노드에서 페이아웃 조회
+        
+        - 지난번 성공한 노드가 있으면 PREFERRED_HEAD_START 동안 먼저 확인하고
+          응답이 늦거나 실패하면 나머지 노드도 함께 확인
+        - 동기화된 노드가 응답하면 나머지 확인은 취소
+        
+        반환: (컨테이너별 결과, 체인 조회에 사용한 노드)
+        """
+        started = time.monotonic()
+        chain = self.registry.chain(genesis)
+        preferred = chain.preferred
+        if preferred in containers:
+            first, waiting = [preferred], [c for c in containers if c != preferred]
+        else:
+            first, waiting = list(containers), []
+        
+        tasks: Dict[asyncio.Task, str] = {}
+        
+        def launch(names: List[str]):
+            for name in names:
+                tasks[asyncio.create_task(self._probe_container(name))] = name
+        
+        launch(first)
+        pending = set(tasks)
+        results: Dict[str, Dict[str, Any]] = {}
+        winner = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=PREFERRED_HEAD_START if waiting else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    probe = task.result()
+                    results[tasks[task]] = probe
+                    if winner is None and not probe.get('error'):
+                        winner = probe
+                if winner:
+                    break
+                # 먼저 확인한 노드가 늦거나 실패하면 나머지 노드도 시작
+                if waiting:
+                    launch(waiting)
+                    pending |= {task for task, name in tasks.items() if name in waiting}
+                    waiting = []
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        
+        stage_metrics.observe(STAGE_PAYOUT_PROBE, time.monotonic() - started, chain.name)
+        if winner is None:
+            logger.warning(f"{chain.name}: 동기화된 노드 없음 ({len(results)}개 확인)")
+            return results, None
+        
+        container = winner['container']
+        if container != preferred:
+            logger.info(f"Using synced node {container} for payout check ({chain.name})")
+        self.registry.mark_healthy(container)
+        results[container] = await self._scan_chain(genesis, container)
+        return results, container
+    
     def get_summary(self) -> Dict[str, Any]:
         """페이아웃 체크 요약"""
         synced_nodes = []
@@ -0,0 +1,162 @@
+# session_index.py
+import asyncio
+import logging
+import time
+from typing import Dict, List, Any, Optional, Tuple
+
+from chain_registry import chain_registry
+from substrate_utils import (
+    storage_key, storage_prefix_hex, hex_to_bytes, decode_u32, decode_session_keys, decode_map_key_account,
+    SESSION_KEY_TYPES,
+)
+
+logger = logging.getLogger(__name__)
+
+# twox_128("Session") + twox_128("NextKeys" / "CurrentIndex")
+SESSION_NEXT_KEYS_PREFIX = storage_prefix_hex("Session", "NextKeys")
+SESSION_CURRENT_INDEX_KEY = storage_key("Session", "CurrentIndex")
+PUBLIC_KEY_SIZE = 32
+# state_getKeysPaged 한 페이지 크기
+KEYS_PAGE_SIZE = 500
+# 현재 세션 번호 재확인 주기 (초)
+SESSION_INDEX_TTL = 30.0
+
+
+class _ChainSessionIndex:
+    """체인 하나의 세션 키 -> 검증인 맵 (세션 번호 단위)"""
+
+    __slots__ = ("session_index", "by_keys", "by_public_key", "validators", "skipped", "built_at", "build_seconds")
+
+    def __init__(self, session_index: int):
+        self.session_index = session_index
+        self.by_keys: Dict[bytes, bytes] = {}                      # SessionKeys 전체 -> AccountId
+        self.by_public_key: Dict[bytes, Tuple[bytes, str]] = {}   # 공개키 -> (AccountId, 키 타입)
+        self.validators = 0
+        self.skipped = 0  # 디코딩할 수 없어 건너뛴 NextKeys 값 수
+        self.built_at = 0.0
+        self.build_seconds = 0.0
+
+    def add(self, account: bytes, value: bytes):
+        # 키 타입 수는 값 길이로 결정 (SessionKeys 구성이 다른 체인도 공개키 단위로 색인)
+        count = len(value) // PUBLIC_KEY_SIZE
+        if count == 0:
+            raise ValueError(f"SessionKeys 길이 부족: {len(value)}바이트")
+        key_types = SESSION_KEY_TYPES if count == len(SESSION_KEY_TYPES) else tuple(f"key{i}" for i in range(count))
+        keys, _ = decode_session_keys(value, key_types=key_types)
+        self.by_keys[value] = account
+        for key_type, public_key in keys.items():
+            self.by_public_key[public_key] = (account, key_type)
+        self.validators += 1
+
+
+class SessionKeyIndex:
+    """Session.NextKeys 를 페이지 단위로 읽어 만든 세션 키 -> 검증인 인덱스
+
+    - state_getKeysPaged 로 키를 KEYS_PAGE_SIZE 개씩 받고 같은 블록 기준 state_queryStorageAt 으로
+      값을 받음 (다음 페이지 키 조회와 현재 페이지 값 조회를 동시에 진행)
+    - 값은 SessionKeys 구조체 (키 타입별 32바이트 공개키) 로 디코딩
+    - 체인(genesis)별로 현재 세션 번호와 함께 보관하고 세션이 바뀔 때만 다시 만듦
+    """
+
+    def __init__(self, registry=None, page_size: int = KEYS_PAGE_SIZE):
+        self.registry = registry or chain_registry
+        self.page_size = page_size
+        self.indexes: Dict[str, _ChainSessionIndex] = {}
+        self.locks: Dict[str, asyncio.Lock] = {}
+        self.stats = {"lookups": 0, "builds": 0, "pages": 0}
+
+    async def _current_session(self, genesis: str) -> int:
+        value = await self.registry.query(genesis, "state_getStorage", [SESSION_CURRENT_INDEX_KEY],
+                                          ttl=SESSION_INDEX_TTL)
+        return decode_u32(hex_to_bytes(value))[0] if value else 0
+
+    async def get(self, genesis: str) -> _ChainSessionIndex:
+        """현재 세션의 인덱스 (세션이 바뀌었으면 다시 만듦)"""
+        session = await self._current_session(genesis)
+        index = self.indexes.get(genesis)
+        if index is not None and index.session_index == session:
+            return index
+        lock = self.locks.setdefault(genesis, asyncio.Lock())
+        async with lock:
+            index = self.indexes.get(genesis)
+            if index is None or index.session_index != session:
+                index = await self._build(genesis, session)
+                self.indexes[genesis] = index
+        return index
+
+    async def _build(self, genesis: str, session: int) -> _ChainSessionIndex:
+        started = time.monotonic()
+        at = await self.registry.query(genesis, "chain_getFinalizedHead", ttl=0)
+        index = _ChainSessionIndex(session)
+        keys = await self._keys_page(genesis, None, at)
+        while keys:
+            # 마지막 페이지가 아니면 다음 키 페이지를 값 조회와 동시에 요청
+            if len(keys) >= self.page_size:
+                values, next_keys = await asyncio.gather(
+                    self._values(genesis, keys, at),
+                    self._keys_page(genesis, keys[-1], at)
+                )
+            else:
+                values, next_keys = await self._values(genesis, keys, at), []
+            for key, value in values:
+                if value is None:
+                    continue
+                try:
+                    index.add(decode_map_key_account(hex_to_bytes(key)), hex_to_bytes(value))
+                except ValueError as e:
+                    # 값 하나가 잘못되어도 나머지 검증인으로 인덱스를 만듦
+                    index.skipped += 1
+                    logger.debug(f"NextKeys 항목 건너뜀 ({key[-64:]}): {e}")
+            keys = next_keys
+        index.built_at = time.time()
+        index.build_seconds = time.monotonic() - started
+        self.stats["builds"] += 1
+        if index.skipped:
+            logger.warning(f"세션 {session}: 디코딩할 수 없는 NextKeys 값 {index.skipped}개 건너뜀")
+        logger.info(f"세션 키 인덱스 생성: 세션 {session}, 검증인 {index.validators}명, "
+                    f"{index.build_seconds * 1000:.0f}ms")
+        return index
+
+    async def _keys_page(self, genesis: str, start_key: Optional[str], at: str) -> List[str]:
+        self.stats["pages"] += 1
+        return await self.registry.query(
+            genesis, "state_getKeysPaged", [SESSION_NEXT_KEYS_PREFIX, self.page_size, start_key, at], ttl=0
+        ) or []
+
+    async def _values(self, genesis: str, keys: List[str], at: str) -> List[Tuple[str, Optional[str]]]:
+        change_sets = await self.registry.query(genesis, "state_queryStorageAt", [keys, at], ttl=0) or []
+        return [tuple(change) for change_set in change_sets for change in change_set.get('changes', [])]
+
+    async def lookup(self, genesis: str, session_keys: str) -> Optional[Dict[str, Any]]:
+        """세션 키(rotateKeys 결과 전체 또는 공개키 하나)로 검증인 찾기"""
+        self.stats["lookups"] += 1
+        index = await self.get(genesis)
+        keys = hex_to_bytes(session_keys)
+
+        account = index.by_keys.get(keys)
+        if account is not None:
+            return {"account": "0x" + account.hex(), "matched": "session_keys", "session_index": index.session_index}
+        for offset in range(0, len(keys) - PUBLIC_KEY_SIZE + 1, PUBLIC_KEY_SIZE):
+            found = index.by_public_key.get(keys[offset:offset + PUBLIC_KEY_SIZE])
+            if found is not None:
+                return {"account": "0x" + found[0].hex(), "matched": found[1], "session_index": index.session_index}
+        return None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "chains": {
+                genesis: {
+                    "session_index": index.session_index,
+                    "validators": index.validators,
+                    "skipped": index.skipped,
+                    "built_at": index.built_at,
+                    "build_ms": round(index.build_seconds * 1000, 1),
+                }
+                for genesis, index in self.indexes.items()
+            },
+            "stats": dict(self.stats),
+        }
+
+
+# 프로세스 전역 인스턴스
+session_key_index = SessionKeyIndex()
@@ -0,0 +1,154 @@
+# stage_metrics.py
+import bisect
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 고정 버킷 상한 (초) - 마지막 버킷 이후는 +Inf
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# 측정 단계 이름
+STAGE_LOOP = "loop"                        # 전송 루프 1회 전체
+STAGE_SYSTEM_COLLECT = "system_collect"    # SystemInfo.collect
+STAGE_CONTAINER_SNAPSHOT = "container_snapshot"  # 컨테이너 통계 스냅샷 구성
+STAGE_SERIALIZE = "serialize"              # 전송 메시지 생성 + JSON 직렬화
+STAGE_SEND = "send"                        # WebSocket send
+STAGE_ACK_RTT = "ack_rtt"                  # stats 전송 후 stats_ack 수신까지
+STAGE_HEALTH_PROBE = "health_probe"        # 노드 RPC 호출 (라벨: RPC 메서드)
+STAGE_SUBPROCESS_SPAWN = "subprocess_spawn"  # 프로세스 생성까지 걸린 시간 (라벨: docker 하위 명령)
+STAGE_SUBPROCESS = "subprocess"            # 프로세스 생성부터 종료까지 (라벨: docker 하위 명령)
+
+
+class LatencyHistogram:
+    """고정 버킷 지연 시간 히스토그램 (누적 + 요약 구간)"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        # 요약 전송 구간 (summary 호출 시 초기화)
+        self.window_counts = [0] * (len(buckets) + 1)
+        self.window_count = 0
+        self.window_sum = 0.0
+        self.window_max = 0.0
+
+    def observe(self, seconds: float):
+        index = bisect.bisect_left(self.buckets, seconds)
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.window_counts[index] += 1
+        self.window_count += 1
+        self.window_sum += seconds
+        if seconds > self.window_max:
+            self.window_max = seconds
+
+    def _quantile(self, counts: List[int], total: int, q: float, observed_max: float) -> float:
+        """버킷 상한 기준 분위수 추정 (+Inf 버킷은 관측 최댓값 사용)"""
+        if total == 0:
+            return 0.0
+        rank = q * total
+        running = 0
+        for index, bucket_count in enumerate(counts):
+            running += bucket_count
+            if running >= rank:
+                if index < len(self.buckets):
+                    return min(self.buckets[index], observed_max)
+                return observed_max
+        return observed_max
+
+    def _describe(self, counts: List[int], total: int, total_sum: float, observed_max: float) -> Dict[str, Any]:
+        return {
+            "count": total,
+            "avg_ms": round(total_sum / total * 1000, 3) if total else 0.0,
+            "p50_ms": round(self._quantile(counts, total, 0.50, observed_max) * 1000, 3),
+            "p95_ms": round(self._quantile(counts, total, 0.95, observed_max) * 1000, 3),
+            "p99_ms": round(self._quantile(counts, total, 0.99, observed_max) * 1000, 3),
+            "max_ms": round(observed_max * 1000, 3),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """누적 통계 + 버킷별 (누적) 카운트"""
+        result = self._describe(self.counts, self.count, self.sum, self.max)
+        result["sum_s"] = round(self.sum, 6)
+        cumulative = 0
+        buckets = []
+        for index, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            le = str(self.buckets[index]) if index < len(self.buckets) else "+Inf"
+            buckets.append([le, cumulative])
+        result["buckets"] = buckets
+        return result
+
+    def window_summary(self, reset: bool = True) -> Dict[str, Any]:
+        """마지막 요약 이후 구간의 통계"""
+        result = self._describe(self.window_counts, self.window_count, self.window_sum, self.window_max)
+        if reset:
+            self.window_counts = [0] * (len(self.buckets) + 1)
+            self.window_count = 0
+            self.window_sum = 0.0
+            self.window_max = 0.0
+        return result
+
+
+class StageMetrics:
+    """단계별(+라벨별) 지연 시간 히스토그램 모음"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.started = time.time()
+
+    def observe(self, stage: str, seconds: float, label: str = ""):
+        key = (stage, label)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = LatencyHistogram(self.buckets)
+        histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, stage: str, label: str = ""):
+        """with 블록 실행 시간 기록 (블록 안에서 await 해도 됨)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started, label)
+
+    def get(self, stage: str, label: str = "") -> Optional[LatencyHistogram]:
+        return self.histograms.get((stage, label))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """누적 히스토그램 전체 {stage: {label: {...}}} (라벨 없으면 "")"""
+        stages: Dict[str, Dict[str, Any]] = {}
+        for (stage, label), histogram in sorted(self.histograms.items()):
+            stages.setdefault(stage, {})[label] = histogram.to_dict()
+        return {
+            "started": int(self.started),
+            "uptime": int(time.time() - self.started),
+            "buckets": list(self.buckets),
+            "stages": stages,
+        }
+
+    def summary(self, reset: bool = True) -> Dict[str, Any]:
+        """요약 전송용 구간 통계 (관측 없는 항목 제외)"""
+        stages: Dict[str, Dict[str, Any]] = {}
+        for (stage, label), histogram in sorted(self.histograms.items()):
+            if histogram.window_count == 0:
+                continue
+            stages.setdefault(stage, {})[label] = histogram.window_summary(reset)
+        return stages
+
+
+# 프로세스 전역 인스턴스 (main, websocket_client, docker_stats_client 공용)
+stage_metrics = StageMetrics()
@@ -1,19 +1,382 @@
 # substrate_utils.py
 import hashlib
 import binascii
-from typing import Optional
+import struct
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+# xxhash (C 확장) 이 설치되어 있으면 사용, 없으면 아래 순수 파이썬 구현 사용
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+_MASK64 = (1 << 64) - 1
+_P1 = 11400714785074694791
+_P2 = 14029467366897019727
+_P3 = 1609587929392839161
+_P4 = 9650029242287828579
+_P5 = 2870177450012600261
+_STRIPE = struct.Struct("<4Q")
+_LANE = struct.Struct("<Q")
+_BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+
+def _rotl64(value: int, bits: int) -> int:
+    return ((value << bits) | (value >> (64 - bits))) & _MASK64
+
+
+def _xxh64_round(acc: int, lane: int) -> int:
+    return (_rotl64((acc + lane * _P2) & _MASK64, 31) * _P1) & _MASK64
+
+
+def xxh64(data: bytes, seed: int = 0) -> int:
+    """xxHash64 (순수 파이썬, 스토리지 키용 짧은 입력 기준)"""
+    length = len(data)
+    offset = 0
+    if length >= 32:
+        v1 = (seed + _P1 + _P2) & _MASK64
+        v2 = (seed + _P2) & _MASK64
+        v3 = seed
+        v4 = (seed - _P1) & _MASK64
+        while offset + 32 <= length:
+            l1, l2, l3, l4 = _STRIPE.unpack_from(data, offset)
+            v1 = _xxh64_round(v1, l1)
+            v2 = _xxh64_round(v2, l2)
+            v3 = _xxh64_round(v3, l3)
+            v4 = _xxh64_round(v4, l4)
+            offset += 32
+        h = (_rotl64(v1, 1) + _rotl64(v2, 7) + _rotl64(v3, 12) + _rotl64(v4, 18)) & _MASK64
+        for v in (v1, v2, v3, v4):
+            h ^= _xxh64_round(0, v)
+            h = (h * _P1 + _P4) & _MASK64
+    else:
+        h = (seed + _P5) & _MASK64
+    h = (h + length) & _MASK64
+
+    while offset + 8 <= length:
+        h ^= _xxh64_round(0, _LANE.unpack_from(data, offset)[0])
+        h = (_rotl64(h, 27) * _P1 + _P4) & _MASK64
+        offset += 8
+    if offset + 4 <= length:
+        h ^= (int.from_bytes(data[offset:offset + 4], "little") * _P1) & _MASK64
+        h = (_rotl64(h, 23) * _P2 + _P3) & _MASK64
+        offset += 4
+    while offset < length:
+        h ^= (data[offset] * _P5) & _MASK64
+        h = (_rotl64(h, 11) * _P1) & _MASK64
+        offset += 1
+
+    h ^= h >> 33
+    h = (h * _P2) & _MASK64
+    h ^= h >> 29
+    h = (h * _P3) & _MASK64
+    h ^= h >> 32
+    return h
+
+
+def _xxh64_digest(data: bytes, seed: int) -> bytes:
+    if xxhash is not None:
+        return xxhash.xxh64_intdigest(data, seed).to_bytes(8, "little")
+    return xxh64(data, seed).to_bytes(8, "little")
+
+
+def twox_64(data: bytes) -> bytes:
+    """Two XX 64-bit hash"""
+    return _xxh64_digest(data, 0)
+
+
+def twox_128(data: bytes) -> bytes:
+    """Two XX 128-bit hash (seed 0, 1 의 xxHash64 를 이어 붙임)"""
+    return _xxh64_digest(data, 0) + _xxh64_digest(data, 1)
+
+
+def twox_256(data: bytes) -> bytes:
+    """Two XX 256-bit hash (seed 0~3)"""
+    return b"".join(_xxh64_digest(data, seed) for seed in range(4))
+
+
+def twox_64_concat(data: bytes) -> bytes:
+    """Two XX 64-bit hash with concatenated data (EraIndex 등 맵 키)"""
+    return _xxh64_digest(data, 0) + data
+
+
+def blake2_128(data: bytes) -> bytes:
+    """Blake2 128-bit hash"""
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def blake2_256(data: bytes) -> bytes:
+    """Blake2 256-bit hash"""
+    return hashlib.blake2b(data, digest_size=32).digest()
+
 
 def blake2_128_concat(data: bytes) -> bytes:
     """Blake2 128-bit hash with concatenated data"""
-    h = hashlib.blake2b(data, digest_size=16)
-    return h.digest() + data
+    return hashlib.blake2b(data, digest_size=16).digest() + data
+
+
+def identity(data: bytes) -> bytes:
+    """Identity hasher (키를 그대로 사용)"""
+    return data
+
+
+# 메타데이터의 StorageHasher 이름 -> 해시 함수
+STORAGE_HASHERS: Dict[str, Callable[[bytes], bytes]] = {
+    "blake2_128": blake2_128,
+    "blake2_256": blake2_256,
+    "blake2_128_concat": blake2_128_concat,
+    "twox_128": twox_128,
+    "twox_256": twox_256,
+    "twox_64_concat": twox_64_concat,
+    "identity": identity,
+}
+
+
+@lru_cache(maxsize=None)
+def _pallet_prefix(pallet: str) -> bytes:
+    return twox_128(pallet.encode())
+
+
+@lru_cache(maxsize=None)
+def storage_prefix(pallet: str, item: str) -> bytes:
+    """스토리지 항목 접두사 twox_128(pallet) + twox_128(item) (한 번 계산 후 재사용)"""
+    return _pallet_prefix(pallet) + twox_128(item.encode())
+
+
+@lru_cache(maxsize=None)
+def storage_prefix_hex(pallet: str, item: str) -> str:
+    """storage_prefix 의 0x hex 문자열 (state_getKeysPaged 등의 접두사 인자)"""
+    return "0x" + storage_prefix(pallet, item).hex()
+
+
+def storage_key(pallet: str, item: str, *keys: bytes, hashers: Iterable[str] = ()) -> str:
+    """단일 값 또는 (다중) 맵 스토리지 키 -> 0x hex
+
+    storage_key("Staking", "ActiveEra")
+    storage_key("Staking", "Bonded", stash, hashers=("twox_64_concat",))
+    """
+    hashed = b"".join(STORAGE_HASHERS[hasher](key) for hasher, key in zip(hashers, keys))
+    return storage_prefix_hex(pallet, item) + hashed.hex()
+
+
+def storage_map_keys(pallet: str, item: str, keys: Iterable[bytes],
+                     hasher: str = "blake2_128_concat", prefix_keys: Iterable[bytes] = (),
+                     prefix_hashers: Iterable[str] = ()) -> List[str]:
+    """맵 스토리지 키를 한 번에 생성 (수천 개 계정 등)
+
+    접두사와 고정된 앞쪽 키(prefix_keys, 예: 이중 맵의 era)의 해시는 한 번만 계산하고
+    각 키는 해시 + hex 변환만 수행한다.
+    """
+    prefix = storage_prefix_hex(pallet, item)
+    fixed = b"".join(STORAGE_HASHERS[h](key) for h, key in zip(prefix_hashers, prefix_keys))
+    if fixed:
+        prefix += fixed.hex()
+    hash_key = STORAGE_HASHERS[hasher]
+    return [prefix + hash_key(key).hex() for key in keys]
+
+
+# ---------------------------------------------------------------------------
+# SCALE 디코더
+#
+# 모든 decode_* 함수는 bytes 또는 memoryview 와 시작 오프셋을 받아 (값, 다음 오프셋) 을 반환한다.
+# RPC 의 hex 문자열은 hex_to_bytes 로 한 번만 변환하고 이후에는 오프셋만 옮기며 읽는다.
+# ---------------------------------------------------------------------------
+
+Buffer = Union[bytes, bytearray, memoryview]
+Decoder = Callable[[Buffer, int], Tuple[Any, int]]
+
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+ACCOUNT_ID_SIZE = 32
+# Creditcoin 3 SessionKeys 필드 순서 (각 32바이트 공개키)
+SESSION_KEY_TYPES = ("gran", "babe", "imon", "audi")
+# concat 해셔가 원래 키 앞에 붙이는 해시 길이
+CONCAT_HASH_LENGTHS = {"blake2_128_concat": 16, "twox_64_concat": 8, "identity": 0}
+
+
+def hex_to_bytes(value: str) -> bytes:
+    """RPC hex 문자열 (0x 접두사 허용) -> bytes"""
+    return bytes.fromhex(value[2:] if value.startswith("0x") else value)
+
+
+def decode_compact(data: Buffer, offset: int = 0) -> Tuple[int, int]:
+    """Compact<정수>"""
+    first = data[offset]
+    mode = first & 0b11
+    if mode == 0:
+        return first >> 2, offset + 1
+    if mode == 1:
+        return _U16.unpack_from(data, offset)[0] >> 2, offset + 2
+    if mode == 2:
+        return _U32.unpack_from(data, offset)[0] >> 2, offset + 4
+    length = (first >> 2) + 4
+    return int.from_bytes(data[offset + 1:offset + 1 + length], "little"), offset + 1 + length
+
+
+def decode_u8(data: Buffer, offset: int = 0) -> Tuple[int, int]:
+    return data[offset], offset + 1
+
+
+def decode_bool(data: Buffer, offset: int = 0) -> Tuple[bool, int]:
+    return data[offset] == 1, offset + 1
+
+
+def decode_u32(data: Buffer, offset: int = 0) -> Tuple[int, int]:
+    return _U32.unpack_from(data, offset)[0], offset + 4
+
+
+def decode_u64(data: Buffer, offset: int = 0) -> Tuple[int, int]:
+    return _U64.unpack_from(data, offset)[0], offset + 8
+
+
+def decode_u128(data: Buffer, offset: int = 0) -> Tuple[int, int]:
+    return int.from_bytes(data[offset:offset + 16], "little"), offset + 16
+
+
+def decode_account_id(data: Buffer, offset: int = 0) -> Tuple[bytes, int]:
+    """AccountId32 (dict 키로 쓸 수 있도록 bytes 로 복사)"""
+    end = offset + ACCOUNT_ID_SIZE
+    if end > len(data):
+        raise ValueError(f"AccountId 길이 부족: {len(data) - offset}바이트")
+    return bytes(data[offset:end]), end
+
+
+def decode_vec(data: Buffer, offset: int, decode_item: Decoder) -> Tuple[List[Any], int]:
+    """Vec<T>"""
+    count, offset = decode_compact(data, offset)
+    items = []
+    for _ in range(count):
+        item, offset = decode_item(data, offset)
+        items.append(item)
+    return items, offset
+
+
+def decode_u32_vec(data: Buffer, offset: int = 0) -> Tuple[List[int], int]:
+    """Vec<u32> (EraIndex 목록 등, 한 번에 unpack)"""
+    count, offset = decode_compact(data, offset)
+    end = offset + count * 4
+    return list(struct.unpack_from(f"<{count}I", data, offset)), end
+
+
+def decode_option(data: Buffer, offset: int, decode_item: Decoder) -> Tuple[Optional[Any], int]:
+    """Option<T>"""
+    if data[offset] == 0:
+        return None, offset + 1
+    return decode_item(data, offset + 1)
+
+
+def decode_tuple(data: Buffer, offset: int, *decoders: Decoder) -> Tuple[tuple, int]:
+    """(T1, T2, ...)"""
+    items = []
+    for decode_item in decoders:
+        item, offset = decode_item(data, offset)
+        items.append(item)
+    return tuple(items), offset
+
+
+def decode_active_era_info(data: Buffer, offset: int = 0) -> Tuple[Dict[str, Any], int]:
+    """Staking.ActiveEra: ActiveEraInfo { index: u32, start: Option<u64> }"""
+    index, offset = decode_u32(data, offset)
+    start, offset = decode_option(data, offset, decode_u64)
+    return {"index": index, "start": start}, offset
+
+
+def decode_staking_ledger(data: Buffer, offset: int = 0) -> Tuple[Dict[str, Any], int]:
+    """Staking.Ledger: StakingLedger
+
+    stash + total(Compact) + active(Compact) + unlocking(Vec<(Compact, Compact)>)
+    + legacy_claimed_rewards(Vec<u32>, 런타임 버전에 따라 없음)
+    """
+    stash, offset = decode_account_id(data, offset)
+    total, offset = decode_compact(data, offset)
+    active, offset = decode_compact(data, offset)
+    unlocking, offset = decode_vec(data, offset, _decode_unlock_chunk)
+    claimed: List[int] = []
+    if offset < len(data):
+        claimed, offset = decode_u32_vec(data, offset)
+    return {"stash": stash, "total": total, "active": active, "unlocking": unlocking,
+            "legacy_claimed_rewards": claimed}, offset
+
+
+def _decode_unlock_chunk(data: Buffer, offset: int) -> Tuple[tuple, int]:
+    return decode_tuple(data, offset, decode_compact, decode_compact)
+
+
+def decode_exposure_metadata(data: Buffer, offset: int = 0) -> Tuple[Dict[str, int], int]:
+    """Staking.ErasStakersOverview: PagedExposureMetadata { total, own, nominator_count: u32, page_count: u32 }"""
+    total, offset = decode_compact(data, offset)
+    own, offset = decode_compact(data, offset)
+    nominator_count, offset = decode_u32(data, offset)
+    page_count, offset = decode_u32(data, offset)
+    return {"total": total, "own": own, "nominator_count": nominator_count, "page_count": page_count}, offset
+
+
+def decode_exposure_total(data: Buffer, offset: int = 0) -> Tuple[int, int]:
+    """Staking.ErasStakers: Exposure { total, own, others } 의 total (나머지는 읽지 않음)"""
+    return decode_compact(data, offset)
+
+
+def decode_session_keys(data: Buffer, offset: int = 0,
+                        key_types: Tuple[str, ...] = SESSION_KEY_TYPES) -> Tuple[Dict[str, bytes], int]:
+    """Session.NextKeys: SessionKeys (키 타입 순서대로 32바이트 공개키)"""
+    end = offset + 32 * len(key_types)
+    if end > len(data):
+        raise ValueError(f"SessionKeys 길이 부족: {len(data) - offset}바이트")
+    return {key_type: bytes(data[start:start + 32])
+            for key_type, start in zip(key_types, range(offset, end, 32))}, end
+
+
+def decode_map_key_account(key: Buffer, hasher: str = "blake2_128_concat", prefix_length: int = 32) -> bytes:
+    """접두사 + concat 해시 + AccountId 형태의 맵 스토리지 키에서 AccountId 추출"""
+    return decode_account_id(key, prefix_length + CONCAT_HASH_LENGTHS[hasher])[0]
+
+
+# DigestItem::PreRuntime 변형 번호, BABE 엔진 ID, PreDigest 변형
+DIGEST_PRE_RUNTIME = 6
+BABE_ENGINE_ID = b"BABE"
+BABE_PRE_DIGEST_KINDS = {1: "primary", 2: "secondary", 3: "secondary_vrf"}
+
+
+def decode_babe_pre_digest(log: Buffer) -> Optional[Dict[str, Any]]:
+    """헤더 digest 로그 하나가 BABE PreRuntime 이면 {kind, authority_index, slot}
+
+    PreRuntime(ConsensusEngineId, Vec<u8>) 안의 PreDigest 는 모든 변형이
+    authority_index: u32, slot: u64 로 시작하므로 VRF 출력/증명은 읽지 않는다.
+    """
+    if len(log) < 6 or log[0] != DIGEST_PRE_RUNTIME or bytes(log[1:5]) != BABE_ENGINE_ID:
+        return None
+    _, offset = decode_compact(log, 5)
+    kind = BABE_PRE_DIGEST_KINDS.get(log[offset])
+    if kind is None:
+        return None
+    authority_index, offset = decode_u32(log, offset + 1)
+    slot, _ = decode_u64(log, offset)
+    return {"kind": kind, "authority_index": authority_index, "slot": slot}
+
+
+def header_babe_pre_digest(header: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """chain_getHeader / chain_newHead 헤더에서 BABE 사전 다이제스트 찾기"""
+    for log in (header.get("digest") or {}).get("logs", []):
+        # PreRuntime 로그는 "0x06" 으로 시작하므로 다른 로그는 bytes 로 바꾸지 않음
+        if log.startswith("0x06"):
+            pre_digest = decode_babe_pre_digest(hex_to_bytes(log))
+            if pre_digest:
+                return pre_digest
+    return None
+
+
+def decode_babe_authorities(data: Buffer, offset: int = 0) -> Tuple[List[bytes], int]:
+    """Babe.Authorities: Vec<(AuthorityId, BabeAuthorityWeight)> -> authority index 순서의 공개키"""
+    count, offset = decode_compact(data, offset)
+    authorities = []
+    for _ in range(count):
+        authority, offset = decode_account_id(data, offset)
+        authorities.append(authority)
+        offset += 8  # weight: u64
+    return authorities, offset
 
-def twox_128(data: bytes) -> bytes:
-    """Two XX 128-bit hash"""
-    # 간단한 구현 (실제로는 xxhash 사용)
-    h1 = hashlib.blake2b(data, digest_size=8, key=b'0')
-    h2 = hashlib.blake2b(data, digest_size=8, key=b'1')
-    return h1.digest() + h2.digest()
 
 def decode_hex_string(hex_str: str) -> str:
     """Hex 문자열을 디코딩"""
@@ -32,6 +395,32 @@ def encode_account_id(account_hex: str) -> str:
         return account_hex
     return '0x' + account_hex
 
+def ss58_decode(address: str) -> bytes:
+    """SS58 주소 또는 0x hex 문자열을 32바이트 AccountId 로 변환"""
+    if address.startswith('0x'):
+        account = binascii.unhexlify(address[2:])
+        if len(account) != 32:
+            raise ValueError(f"AccountId 길이 오류: {address}")
+        return account
+
+    number = 0
+    for char in address:
+        index = _BASE58_ALPHABET.find(char)
+        if index < 0:
+            raise ValueError(f"잘못된 SS58 문자: {char}")
+        number = number * 58 + index
+    leading_zeros = len(address) - len(address.lstrip('1'))
+    raw = b'\x00' * leading_zeros + number.to_bytes((number.bit_length() + 7) // 8, 'big')
+
+    # 접두사 1바이트 (0~63) 또는 2바이트 + AccountId 32바이트 + 체크섬 2바이트
+    prefix_length = 1 if raw and raw[0] < 64 else 2
+    if len(raw) != prefix_length + 32 + 2:
+        raise ValueError(f"SS58 주소 길이 오류: {address}")
+    checksum = hashlib.blake2b(b'SS58PRE' + raw[:-2], digest_size=64).digest()[:2]
+    if checksum != raw[-2:]:
+        raise ValueError(f"SS58 체크섬 불일치: {address}")
+    return raw[prefix_length:prefix_length + 32]
+
 def extract_validator_from_storage_key(storage_key: str, prefix_length: int = 96) -> Optional[str]:
     """스토리지 키에서 검증인 AccountId 추출"""
     try:
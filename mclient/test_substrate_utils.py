@@ -0,0 +1,77 @@
+# test_substrate_utils.py
+"""
+substrate_utils 해시 / 스토리지 키 알려진 값 테스트
+
+    cd mclient && python3 -m pytest -q test_substrate_utils.py
+
+xxhash 확장이 설치되어 있으면 확장과 순수 파이썬 구현을 모두 확인한다.
+"""
+import pytest
+
+import substrate_utils
+from substrate_utils import storage_key, twox_64, twox_128, twox_256, xxh64
+
+# 알려진 Substrate 스토리지 키
+STORAGE_KEY_VECTORS = (
+    (("System", "Account"), "0x26aa394eea5630e07c48ae0c9558cef7b99d880ec681799c0cf30e8886371da9"),
+    (("System", "Number"), "0x26aa394eea5630e07c48ae0c9558cef702a5c1b19ab7a04f536c519aca4983ac"),
+    (("System", "Events"), "0x26aa394eea5630e07c48ae0c9558cef780d41e5e16056765bc8461851072c9d7"),
+    (("Staking", "ActiveEra"), "0x5f3e4907f716ac89b6347d15ececedca487df464e44a534ba6b0cbb32407b587"),
+    (("Staking", "CurrentEra"), "0x5f3e4907f716ac89b6347d15ececedca0b6a45321efae92aea15e0740ec7afe7"),
+    (("Session", "NextKeys"), "0xcec5070d609dd3497f72bde07fc96ba04c014e6bf8b8c2c011e7290b85696bb3"),
+    (("Session", "CurrentIndex"), "0xcec5070d609dd3497f72bde07fc96ba072763800a36a99fdfc7c10f6415f6ee6"),
+    (("AuthorityDiscovery", "Keys"), "0x2099d7f109d6e535fb000bba623fd4409f99a2ce711f3a31b2fc05604c93f179"),
+)
+# sp_core::hashing 테스트의 빈 입력 해시
+HASHER_VECTORS = (
+    (twox_64, "99e9d85137db46ef"),
+    (twox_128, "99e9d85137db46ef4bbea33613baafd5"),
+    (twox_256, "99e9d85137db46ef4bbea33613baafd56f963c64b1f3685a4eb4abd67ff6203a"),
+)
+# xxHash64 참조 구현 값 (32 바이트 이상 입력은 4-lane 경로)
+XXH64_VECTORS = (
+    (b"", 0, 0xEF46DB3751D8E999),
+    (b"a", 0, 0xD24EC4F1A98C6E5B),
+    (b"abc", 0, 0x44BC2CF5AD770999),
+    (b"Nobody inspects the spammish repetition", 0, 0xFBCEA83C8A378BF1),
+)
+# System.Account(Alice)
+ALICE_ACCOUNT = bytes.fromhex("d43593c715fdd31c61141abd04a99fd6822c8558854ccde39a5684e7a56da27d")
+ALICE_SYSTEM_ACCOUNT_KEY = (
+    "0x26aa394eea5630e07c48ae0c9558cef7b99d880ec681799c0cf30e8886371da9"
+    "de1e86a9a8c739864cf3cc5ec2bea59fd43593c715fdd31c61141abd04a99fd6822c8558854ccde39a5684e7a56da27d"
+)
+
+BACKENDS = ["python"] + (["xxhash"] if substrate_utils.xxhash is not None else [])
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request, monkeypatch):
+    """xxhash 확장 / 순수 파이썬 구현 각각으로 실행 (접두사 캐시는 매번 비움)"""
+    if request.param == "python":
+        monkeypatch.setattr(substrate_utils, "xxhash", None)
+    for cached in (substrate_utils._pallet_prefix, substrate_utils.storage_prefix, substrate_utils.storage_prefix_hex):
+        cached.cache_clear()
+    yield request.param
+    for cached in (substrate_utils._pallet_prefix, substrate_utils.storage_prefix, substrate_utils.storage_prefix_hex):
+        cached.cache_clear()
+
+
+@pytest.mark.parametrize("data, seed, expected", XXH64_VECTORS)
+def test_xxh64(data, seed, expected):
+    assert xxh64(data, seed) == expected
+
+
+@pytest.mark.parametrize("hasher, expected", HASHER_VECTORS)
+def test_twox_empty_input(backend, hasher, expected):
+    assert hasher(b"").hex() == expected
+
+
+@pytest.mark.parametrize("path, expected", STORAGE_KEY_VECTORS)
+def test_storage_key(backend, path, expected):
+    assert storage_key(*path) == expected
+
+
+def test_system_account_alice(backend):
+    key = storage_key("System", "Account", ALICE_ACCOUNT, hashers=("blake2_128_concat",))
+    assert key == ALICE_SYSTEM_ACCOUNT_KEY
@@ -0,0 +1,184 @@
+# traffic_recorder.py
+import asyncio
+import collections
+import gzip
+import json
+import logging
+import time
+from typing import Dict, List, Any, Optional, Tuple, Deque
+
+logger = logging.getLogger(__name__)
+
+RECORD_VERSION = 1
+# 기록 파일을 디스크에 반영하는 주기 (초)
+FLUSH_INTERVAL = 1.0
+
+
+class TrafficRecorder:
+    """docker 명령 결과와 docker stats 스트림을 gzip JSON Lines 파일로 기록
+
+    레코드 형식 (t 는 기록 시작 이후 경과 초):
+        {"k": "exec", "t": 1.234, "cmd": [...], "rc": 0, "out": "...", "err": "...", "d": 0.012}
+        {"k": "stream", "t": 1.500, "data": "..."}
+    노드 RPC 는 `docker exec <컨테이너> curl ...` 로 호출되므로 exec 레코드에 포함된다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.started = time.monotonic()
+        self.last_flush = self.started
+        self.records = 0
+        self.file = gzip.open(path, "wt", encoding="utf-8")
+        self._write({"k": "header", "version": RECORD_VERSION, "started": time.time()})
+        logger.info(f"docker 트래픽 기록 시작: {path}")
+
+    def _write(self, record: Dict[str, Any]):
+        if self.file is None:
+            return
+        self.file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self.records += 1
+        now = time.monotonic()
+        if now - self.last_flush >= FLUSH_INTERVAL:
+            self.file.flush()
+            self.last_flush = now
+
+    def _elapsed(self) -> float:
+        return round(time.monotonic() - self.started, 4)
+
+    def record_exec(self, cmd: Tuple[str, ...], returncode: int, stdout: bytes, stderr: bytes, duration: float):
+        self._write({
+            "k": "exec",
+            "t": self._elapsed(),
+            "cmd": list(cmd),
+            "rc": returncode,
+            "out": stdout.decode("utf-8", errors="replace"),
+            "err": stderr.decode("utf-8", errors="replace"),
+            "d": round(duration, 4),
+        })
+
+    def record_stream(self, data: bytes):
+        self._write({"k": "stream", "t": self._elapsed(), "data": data.decode("utf-8", errors="replace")})
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            logger.info(f"docker 트래픽 기록 종료: {self.path} ({self.records}건)")
+
+
+class ReplayStream:
+    """기록된 docker stats 청크를 원래 시각(배속 적용)에 맞춰 돌려주는 stdout 대용"""
+
+    def __init__(self, chunks: List[Tuple[float, bytes]], speed: float):
+        self.chunks = collections.deque(chunks)
+        self.speed = speed
+        self.started = time.monotonic()
+        self.closed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return not self.chunks or self.closed.is_set()
+
+    async def read(self, n: int = -1) -> bytes:
+        if self.finished:
+            return b""
+        t, data = self.chunks[0]
+        if self.speed > 0:
+            delay = t / self.speed - (time.monotonic() - self.started)
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self.closed.wait(), timeout=delay)
+                    return b""
+                except asyncio.TimeoutError:
+                    pass
+        self.chunks.popleft()
+        return data
+
+    async def readline(self) -> bytes:
+        # stderr 대용: 종료될 때까지 대기 후 EOF
+        await self.closed.wait()
+        return b""
+
+
+class ReplayProcess:
+    """asyncio.subprocess.Process 대신 사용하는 재생용 `docker stats` 프로세스"""
+
+    def __init__(self, chunks: List[Tuple[float, bytes]], speed: float):
+        self.stdout = ReplayStream(chunks, speed)
+        self.stderr = ReplayStream([], speed)
+        self._returncode = None
+
+    @property
+    def returncode(self) -> Optional[int]:
+        if self._returncode is None and self.stdout.finished:
+            self._returncode = 0
+            self.stderr.closed.set()
+        return self._returncode
+
+    def terminate(self):
+        if self._returncode is None:
+            self._returncode = -15
+            self.stdout.closed.set()
+            self.stderr.closed.set()
+
+    def kill(self):
+        self.terminate()
+
+    async def wait(self) -> int:
+        await self.stdout.closed.wait()
+        return self.returncode
+
+
+class TrafficReplayer:
+    """기록 파일을 읽어 docker 명령 결과와 stats 스트림을 재생
+
+    - 같은 명령은 기록된 순서대로 결과를 돌려주고, 다 쓰면 마지막 결과를 반복
+    - speed: 1.0 = 실제 속도, 10 = 10배속, 0 = 대기 없이 최대 속도
+    """
+
+    def __init__(self, path: str, speed: float = 1.0):
+        self.path = path
+        self.speed = speed
+        self.exec_results: Dict[Tuple[str, ...], Deque[Dict[str, Any]]] = {}
+        self.last_results: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+        self.stream_chunks: List[Tuple[float, bytes]] = []
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        exec_count = 0
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 기록 중 종료되어 마지막 줄이 잘린 경우
+                    continue
+                kind = record.get("k")
+                if kind == "exec":
+                    key = tuple(record["cmd"])
+                    self.exec_results.setdefault(key, collections.deque()).append(record)
+                    exec_count += 1
+                elif kind == "stream":
+                    self.stream_chunks.append((record["t"], record["data"].encode("utf-8")))
+        logger.info(f"docker 트래픽 재생 준비: {self.path} (명령 {exec_count}건, "
+                    f"stats 청크 {len(self.stream_chunks)}건, {self.speed}배속)")
+
+    async def exec(self, cmd: Tuple[str, ...]) -> Tuple[int, bytes, bytes]:
+        """기록된 명령 결과 반환 (기록된 실행 시간만큼 대기)"""
+        pending = self.exec_results.get(cmd)
+        if pending:
+            record = pending.popleft()
+            self.last_results[cmd] = record
+        else:
+            record = self.last_results.get(cmd)
+        if record is None:
+            self.misses += 1
+            logger.debug(f"기록되지 않은 명령: {' '.join(cmd)}")
+            return 1, b"", f"replay: no recorded result for {' '.join(cmd)}\n".encode()
+        if self.speed > 0 and record.get("d"):
+            await asyncio.sleep(record["d"] / self.speed)
+        return record["rc"], record["out"].encode("utf-8"), record["err"].encode("utf-8")
+
+    def open_stream(self) -> ReplayProcess:
+        return ReplayProcess(self.stream_chunks, self.speed)
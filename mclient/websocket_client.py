@@ -11,6 +11,8 @@ import os
 import aiohttp
 from typing import Dict, List, Any, Optional
 from command_handler import CommandHandler
+from metrics_exporter import metrics_state
+from stage_metrics import stage_metrics, STAGE_SERIALIZE, STAGE_SEND, STAGE_ACK_RTT
 
 # 로깅 설정
 logging.basicConfig(
@@ -19,6 +21,65 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+CLIENT_VERSION = "1.1.0"
+
+
+def build_register_message(server_id: str) -> Dict[str, Any]:
+    """등록 메시지 생성"""
+    return {
+        "type": "register",
+        "serverId": server_id,
+        "version": CLIENT_VERSION,
+        "timestamp": int(time.time() * 1000)
+    }
+
+
+def build_heartbeat_message(server_id: str) -> Dict[str, Any]:
+    """하트비트 메시지 생성"""
+    return {
+        "type": "heartbeat",
+        "serverId": server_id,
+        "timestamp": int(time.time() * 1000)
+    }
+
+
+def build_stats_message(server_id: str, sequence: int, interval: int, stats: Dict[str, Any]) -> Dict[str, Any]:
+    """통계 메시지 생성"""
+    return {
+        "type": "stats",
+        "serverId": server_id,
+        "timestamp": int(time.time() * 1000),
+        "sequence": sequence,
+        "interval": interval,
+        "data": stats
+    }
+
+
+def build_summary_message(server_id: str, sequence: int, interval: int, summary_data: Dict[str, Any]) -> Dict[str, Any]:
+    """60회 평균 통계 메시지 생성"""
+    return {
+        "type": "summary",
+        "serverId": server_id,
+        "timestamp": int(time.time() * 1000),
+        "sequence": sequence,
+        "interval": interval,
+        "data": summary_data
+    }
+
+
+def build_command_error_response(command_id: str, error: str) -> Dict[str, Any]:
+    """명령 처리 실패 응답 생성"""
+    return {
+        'type': 'command_response',
+        'data': {
+            'command_id': command_id,
+            'status': 'failed',
+            'error': error,
+            'timestamp': int(time.time())
+        }
+    }
+
+
 class WebSocketClient:
     """WebSocket 클라이언트 클래스"""
     
@@ -44,7 +105,8 @@ class WebSocketClient:
         self.last_success_time = 0
         self.sequence_number = 0
         self.reconnecting = False  # 재연결 진행 중 플래그
-        self.pending_ack = {}  # {sequence: future} 대기 중인 ACK
+        self.pending_ack = {}  # {sequence: 전송 시각(monotonic)} 대기 중인 ACK
+        self.max_pending_ack = 1000  # ACK 를 받지 못한 항목 보관 한도
         self.max_retry_count = 5
         self.message_queue = []
         self.max_queue_size = 100
@@ -130,12 +192,7 @@ class WebSocketClient:
                 )
             
             # 연결 성공 - 서버 ID 전송
-            register_message = {
-                "type": "register",
-                "serverId": self.server_id,
-                "version": "1.1.0",
-                "timestamp": int(time.time() * 1000)
-            }
+            register_message = build_register_message(self.server_id)
             
             await self.ws.send(json.dumps(register_message))
             
@@ -148,6 +205,7 @@ class WebSocketClient:
                     logger.info(f"WebSocket 연결 및 등록 성공: {url}")
                     self.connected = True
                     self.last_success_time = time.time()
+                    self._apply_register_ack(response_data)
                     
                     # 심비트 및 핑 태스크 시작
                     self._start_ping_task()
@@ -178,6 +236,14 @@ class WebSocketClient:
             logger.error(f"WebSocket 연결 실패 ({url}): {str(e)}")
             return False
     
+    def _apply_register_ack(self, data: Dict[str, Any]):
+        """register_ack 의 last_era_info 를 EraMonitor 에 병합 (로컬에 저장된 값과 병합)"""
+        last_era_info = data.get('last_era_info', {})
+        if last_era_info and self.era_monitor:
+            logger.info(f"서버로부터 Era 정보 수신: {last_era_info}")
+            self.era_monitor.merge_previous_era(last_era_info)
+            logger.info("Era 정보로 EraMonitor 초기화 완료")
+
     def _start_ping_task(self):
         """정기적인 핑 메시지 전송 태스크 시작"""
         if self.ping_task:
@@ -225,11 +291,7 @@ class WebSocketClient:
                 
                 if self.ws and not self.ws.closed:
                     try:
-                        heartbeat_message = {
-                            "type": "heartbeat",
-                            "serverId": self.server_id,
-                            "timestamp": int(time.time() * 1000)
-                        }
+                        heartbeat_message = build_heartbeat_message(self.server_id)
                         
                         await self.ws.send(json.dumps(heartbeat_message))
                         logger.debug("하트비트 메시지 전송 성공")
@@ -340,14 +402,7 @@ class WebSocketClient:
             
             # 메시지 생성
             logger.debug(f"send_stats: monitor_interval = {self.monitor_interval}")
-            message = {
-                "type": "stats",
-                "serverId": self.server_id,
-                "timestamp": int(time.time() * 1000),
-                "sequence": self.sequence_number,
-                "interval": self.monitor_interval,
-                "data": stats
-            }
+            message = build_stats_message(self.server_id, self.sequence_number, self.monitor_interval, stats)
             
             # 큐 크기 제한
             if len(self.message_queue) < self.max_queue_size:
@@ -366,18 +421,10 @@ class WebSocketClient:
             # 시퀀스 번호 증가
             self.sequence_number += 1
             
-            # 메시지 생성
-            message = {
-                "type": "stats",
-                "serverId": self.server_id,
-                "timestamp": int(time.time() * 1000),
-                "sequence": self.sequence_number,
-                "interval": self.monitor_interval,
-                "data": stats
-            }
-            
-            # 메시지 전송
-            message_json = json.dumps(message)
+            # 메시지 생성 및 직렬화
+            with stage_metrics.timer(STAGE_SERIALIZE):
+                message = build_stats_message(self.server_id, self.sequence_number, self.monitor_interval, stats)
+                message_json = json.dumps(message)
             
             # 디버그: 전송 데이터 로깅
             if logger.isEnabledFor(logging.DEBUG):
@@ -386,21 +433,21 @@ class WebSocketClient:
                 configured = stats.get('configured_nodes', [])
                 logger.debug(f"전송 데이터: configured_nodes={configured}, running_containers={container_names}")
             
-            # 디버그 파일에 전송 데이터 기록 (mtick 용)
-            try:
-                with open('/tmp/mclient_last_send.json', 'w') as f:
-                    json.dump(message, f, indent=2)
-            except Exception as e:
-                logger.debug(f"디버그 파일 쓰기 실패: {e}")
+            # 마지막 전송 메시지 보관 (mtick 은 /debug/last_send 로 조회)
+            metrics_state.set_last_send(message_json)
             
-            await self.ws.send(message_json)
+            with stage_metrics.timer(STAGE_SEND):
+                await self.ws.send(message_json)
             
             # 전송 자체는 성공으로 간주 (recv 충돌 방지를 위해)
             logger.debug(f"통계 데이터 전송 완료 (시퀀스: {self.sequence_number})")
             self.last_success_time = time.time()
             
-            # 나중에 _receive_messages에서 stats_ack를 받으면 로그 출력
-            self.pending_ack[self.sequence_number] = True
+            # 나중에 _receive_messages에서 stats_ack를 받으면 RTT 기록
+            self.pending_ack[self.sequence_number] = time.monotonic()
+            if len(self.pending_ack) > self.max_pending_ack:
+                # 가장 오래된 항목 제거 (dict 는 삽입 순서 유지)
+                self.pending_ack.pop(next(iter(self.pending_ack)))
             
             return True
                 
@@ -410,14 +457,7 @@ class WebSocketClient:
             
             # 메시지를 큐에 추가
             if len(self.message_queue) < self.max_queue_size:
-                message = {
-                    "type": "stats",
-                    "serverId": self.server_id,
-                    "timestamp": int(time.time() * 1000),
-                    "sequence": self.sequence_number,
-                    "interval": self.monitor_interval,
-                    "data": stats
-                }
+                message = build_stats_message(self.server_id, self.sequence_number, self.monitor_interval, stats)
                 self.message_queue.append(message)
             
             # 재연결 시도
@@ -430,13 +470,7 @@ class WebSocketClient:
             
             # 메시지를 큐에 추가
             if len(self.message_queue) < self.max_queue_size:
-                message = {
-                    "type": "stats",
-                    "serverId": self.server_id,
-                    "timestamp": int(time.time() * 1000),
-                    "sequence": self.sequence_number,
-                    "data": stats
-                }
+                message = build_stats_message(self.server_id, self.sequence_number, self.monitor_interval, stats)
                 self.message_queue.append(message)
             
             # 재연결 시도
@@ -590,12 +624,7 @@ class WebSocketClient:
                 logger.info(f"Summary 전송 ACK 수신: 시퀀스 {seq}")
             elif msg_type == 'register_ack':
                 # 등록 확인 메시지 처리 및 Era 정보 추출
-                last_era_info = data.get('last_era_info', {})
-                if last_era_info and self.era_monitor:
-                    logger.info(f"서버로부터 Era 정보 수신: {last_era_info}")
-                    # EraMonitor에 이전 Era 정보 설정
-                    self.era_monitor.previous_era = last_era_info
-                    logger.info("Era 정보로 EraMonitor 초기화 완료")
+                self._apply_register_ack(data)
             elif msg_type == 'error':
                 # 에러 메시지 처리
                 error_msg = data.get('message', '알 수 없는 에러')
@@ -625,15 +654,7 @@ class WebSocketClient:
         except Exception as e:
             logger.error(f"명령어 처리 오류: {e}")
             # 오류 응답 전송
-            error_response = {
-                'type': 'command_response',
-                'data': {
-                    'command_id': command_data.get('id', 'unknown'),
-                    'status': 'failed',
-                    'error': str(e),
-                    'timestamp': int(time.time())
-                }
-            }
+            error_response = build_command_error_response(command_data.get('id', 'unknown'), str(e))
             await self.send_message(error_response)
     
     def _handle_stats_ack(self, data: Dict[str, Any]):
@@ -650,7 +671,8 @@ class WebSocketClient:
             seq = data.get('sequence')
             
         if seq in self.pending_ack:
-            del self.pending_ack[seq]
+            sent_at = self.pending_ack.pop(seq)
+            stage_metrics.observe(STAGE_ACK_RTT, time.monotonic() - sent_at)
             logger.debug(f"통계 전송 ACK 수신 확인: 시퀀스 {seq}")
         else:
             logger.debug(f"이미 처리되었거나 알 수 없는 시퀀스: {seq}")
@@ -687,14 +709,7 @@ class WebSocketClient:
             self.sequence_number += 1
             
             # Summary 메시지 생성
-            message = {
-                "type": "summary",
-                "serverId": self.server_id,
-                "timestamp": int(time.time() * 1000),
-                "sequence": self.sequence_number,
-                "interval": self.monitor_interval,
-                "data": summary_data
-            }
+            message = build_summary_message(self.server_id, self.sequence_number, self.monitor_interval, summary_data)
             
             # 메시지 전송
             message_json = json.dumps(message)
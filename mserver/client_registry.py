@@ -0,0 +1,164 @@
+# client_registry.py
+import logging
+import sys
+import time
+from collections import deque
+from typing import Dict, Any, Optional, Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 연결 해제 후 세션 정보를 유지하는 시간 (초)
+DISCONNECT_GRACE_PERIOD = 300
+
+STATE_CONNECTED = "connected"
+STATE_DISCONNECTED = "disconnected"
+
+
+class ClientSession:
+    """mclient 연결 하나의 상태"""
+
+    __slots__ = ("client_id", "websocket", "ip", "user_agent", "host_name", "state",
+                 "connected_at", "disconnected_at", "last_activity", "data_count")
+
+    def __init__(self, client_id: str, websocket, ip: str, user_agent: str):
+        now = time.time()
+        self.client_id = client_id
+        self.websocket = websocket
+        self.ip = ip
+        self.user_agent = user_agent
+        self.host_name = "unknown_host"   # 첫 stats 메시지에서 갱신
+        self.state = STATE_CONNECTED
+        self.connected_at = now
+        self.disconnected_at = 0.0
+        self.last_activity = now
+        self.data_count = 0
+
+    @property
+    def connected(self) -> bool:
+        return self.state == STATE_CONNECTED
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "client_id": self.client_id,
+            "host_name": self.host_name,
+            "ip": self.ip,
+            "user_agent": self.user_agent,
+            "state": self.state,
+            "connected_at": self.connected_at,
+            "disconnected_at": self.disconnected_at,
+            "last_activity": self.last_activity,
+            "data_count": self.data_count,
+        }
+
+
+class ClientRegistry:
+    """클라이언트 세션 레지스트리
+
+    - 등록/해제 수명주기를 명시적으로 관리하며 연결 수는 카운터로 O(1) 조회
+    - 해제된 세션은 유예 기간 동안 유지한 뒤 제거 (재접속 시 같은 ID면 재사용)
+    - 해제 순서대로 큐에 넣어 두므로 만료 정리는 만료된 항목 수에 비례
+    """
+
+    def __init__(self, grace_period: float = DISCONNECT_GRACE_PERIOD):
+        self.grace_period = grace_period
+        self.sessions: Dict[str, ClientSession] = {}
+        self.disconnected = deque()     # (disconnected_at, client_id)
+        self.connected_count = 0
+        self.stats = {
+            "registered": 0,
+            "replaced": 0,
+            "disconnects": 0,
+            "evicted": 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def get(self, client_id: str) -> Optional[ClientSession]:
+        return self.sessions.get(client_id)
+
+    def get_connected(self, client_id: str) -> Optional[ClientSession]:
+        session = self.sessions.get(client_id)
+        if session is not None and session.connected:
+            return session
+        return None
+
+    def register(self, client_id: str, websocket, ip: str, user_agent: str) -> Tuple[ClientSession, Any]:
+        """세션 등록
+
+        Returns:
+            (세션, 같은 ID로 연결되어 있던 기존 websocket 또는 None)
+        """
+        old_websocket = None
+        session = self.sessions.get(client_id)
+        if session is not None and session.connected:
+            old_websocket = session.websocket
+            self.connected_count -= 1
+            self.stats["replaced"] += 1
+
+        session = ClientSession(client_id, websocket, ip, user_agent)
+        self.sessions[client_id] = session
+        self.connected_count += 1
+        self.stats["registered"] += 1
+        return session, old_websocket
+
+    def disconnect(self, client_id: str, websocket) -> Optional[ClientSession]:
+        """연결 해제 처리 (해당 websocket 이 현재 세션일 때만)
+
+        Returns:
+            해제된 세션, 이미 해제되었거나 다른 연결로 교체된 경우 None
+        """
+        session = self.sessions.get(client_id)
+        if session is None or not session.connected or session.websocket is not websocket:
+            return None
+        session.state = STATE_DISCONNECTED
+        session.disconnected_at = time.time()
+        session.websocket = None
+        self.connected_count -= 1
+        self.stats["disconnects"] += 1
+        self.disconnected.append((session.disconnected_at, client_id))
+        return session
+
+    def evict_expired(self, now: Optional[float] = None) -> int:
+        """유예 기간이 지난 해제 세션 제거"""
+        if now is None:
+            now = time.time()
+        evicted = 0
+        cutoff = now - self.grace_period
+        while self.disconnected and self.disconnected[0][0] <= cutoff:
+            disconnected_at, client_id = self.disconnected.popleft()
+            session = self.sessions.get(client_id)
+            # 그 사이 재접속했거나 다시 해제된 경우는 건너뜀
+            if session is None or session.connected or session.disconnected_at != disconnected_at:
+                continue
+            del self.sessions[client_id]
+            evicted += 1
+        self.stats["evicted"] += evicted
+        return evicted
+
+    def connected_sessions(self) -> Iterator[ClientSession]:
+        return (session for session in self.sessions.values() if session.connected)
+
+    def memory_usage(self) -> Dict[str, int]:
+        """레지스트리가 사용하는 대략적인 메모리 (바이트)"""
+        session_bytes = 0
+        for session in self.sessions.values():
+            session_bytes += sys.getsizeof(session)
+            session_bytes += sys.getsizeof(session.client_id) + sys.getsizeof(session.host_name)
+            session_bytes += sys.getsizeof(session.ip) + sys.getsizeof(session.user_agent)
+        index_bytes = sys.getsizeof(self.sessions) + sys.getsizeof(self.disconnected)
+        total = session_bytes + index_bytes
+        return {
+            "sessions": len(self.sessions),
+            "session_bytes": session_bytes,
+            "index_bytes": index_bytes,
+            "total_bytes": total,
+            "bytes_per_session": total // len(self.sessions) if self.sessions else 0,
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "connected": self.connected_count,
+            "disconnected": len(self.sessions) - self.connected_count,
+            **self.stats,
+        }
@@ -0,0 +1,410 @@
+# cluster.py
+import asyncio
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import tempfile
+import time
+from typing import Dict, List, Any, Optional, Callable, Awaitable
+
+logger = logging.getLogger(__name__)
+
+# 워커 -> 코디네이터 스냅샷 전달 주기 (초)
+SNAPSHOT_RELAY_INTERVAL = 1.0
+# IPC 요청 응답 대기 시간 (초)
+IPC_REQUEST_TIMEOUT = 10
+# 워커가 코디네이터 소켓 연결을 재시도하는 횟수
+IPC_CONNECT_RETRIES = 50
+# IPC 한 줄 최대 크기 (스냅샷 blob 포함)
+IPC_LINE_LIMIT = 64 * 1024 * 1024
+
+
+def reuse_port_supported() -> bool:
+    return hasattr(socket, "SO_REUSEPORT")
+
+
+def default_ipc_path() -> str:
+    return os.path.join(tempfile.gettempdir(), f"mserver-{os.getpid()}.sock")
+
+
+class IpcChannel:
+    """JSON Lines 기반 양방향 IPC 채널
+
+    - send: 응답이 필요 없는 메시지 (쓰기 버퍼에 넣고 바로 반환)
+    - request: req 번호를 붙여 보내고 reply_to 가 같은 응답을 기다림
+    - 수신한 요청은 op 별 핸들러로 전달되며, 핸들러 반환값이 응답으로 전송됨
+    - 핸들러는 일반 함수(수신 루프에서 바로 실행) 또는 코루틴 함수(별도 태스크로 실행)
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                 handlers: Dict[str, Callable[[Dict[str, Any]], Any]], name: str):
+        self.reader = reader
+        self.writer = writer
+        self.handlers = handlers
+        self.name = name
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.request_ids = itertools.count(1)
+        self.tasks = set()
+
+    def send(self, op: str, **fields):
+        fields["op"] = op
+        if self.writer.is_closing():
+            return
+        self.writer.write(json.dumps(fields, ensure_ascii=False).encode("utf-8") + b"\n")
+
+    async def request(self, op: str, timeout: float = IPC_REQUEST_TIMEOUT, **fields) -> Any:
+        req = next(self.request_ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[req] = future
+        try:
+            self.send(op, req=req, **fields)
+            await self.writer.drain()
+            return await asyncio.wait_for(future, timeout=timeout)
+        finally:
+            self.pending.pop(req, None)
+
+    def _reply(self, message: Dict[str, Any], result: Any = None, error: Optional[str] = None):
+        if "req" not in message:
+            return
+        if error is not None:
+            self.send("reply", reply_to=message["req"], error=error)
+        else:
+            self.send("reply", reply_to=message["req"], result=result)
+
+    async def _dispatch_async(self, pending: Awaitable[Any], message: Dict[str, Any]):
+        try:
+            self._reply(message, await pending)
+        except Exception as e:
+            logger.error(f"IPC 요청 처리 중 오류 발생 ({self.name}, {message.get('op')}): {e}")
+            self._reply(message, error=str(e))
+
+    def _dispatch(self, handler, message: Dict[str, Any]):
+        try:
+            result = handler(message)
+        except Exception as e:
+            logger.error(f"IPC 요청 처리 중 오류 발생 ({self.name}, {message.get('op')}): {e}")
+            self._reply(message, error=str(e))
+            return
+        if asyncio.iscoroutine(result):
+            task = asyncio.create_task(self._dispatch_async(result, message))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+        else:
+            self._reply(message, result)
+
+    async def run(self):
+        """수신 루프 (연결이 끊기면 반환)"""
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.error(f"IPC 메시지 JSON 파싱 실패 ({self.name})")
+                    continue
+                op = message.get("op")
+                if op == "reply":
+                    future = self.pending.get(message.get("reply_to"))
+                    if future and not future.done():
+                        if "error" in message:
+                            future.set_exception(RuntimeError(message["error"]))
+                        else:
+                            future.set_result(message.get("result"))
+                    continue
+                handler = self.handlers.get(op)
+                if handler is None:
+                    logger.warning(f"알 수 없는 IPC 메시지: {op} ({self.name})")
+                    continue
+                self._dispatch(handler, message)
+        except (ConnectionResetError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("IPC 연결 종료"))
+
+    def close(self):
+        for task in list(self.tasks):
+            task.cancel()
+        self.writer.close()
+
+
+class WorkerLink:
+    """워커 프로세스 쪽 코디네이터 연결
+
+    워커는 자신이 받은 클라이언트만 처리하고, 전역이어야 하는 상태만 코디네이터와 주고받는다.
+    - register/unregister: 클라이언트 소유 워커 등록 (중복 ID 는 코디네이터가 기존 워커에 kick 요청)
+    - snapshot: 변경된 클라이언트의 직렬화된 스냅샷 조각을 주기적으로 전달 (프레임마다 보내지 않음)
+    - publish: 다른 워커에 대시보드 구독자가 있을 때만 샘플 전달
+    """
+
+    def __init__(self, worker_id: int, ipc_path: str, snapshot_index,
+                 handlers: Dict[str, Callable[[Dict[str, Any]], Any]]):
+        self.worker_id = worker_id
+        self.ipc_path = ipc_path
+        self.snapshot_index = snapshot_index
+        self.handlers = dict(handlers)
+        self.handlers["fanout"] = self._handle_fanout
+        self.channel: Optional[IpcChannel] = None
+        self.fanout_enabled = False     # 어느 워커에든 대시보드 구독자가 있는지
+        self.dirty = set()              # 코디네이터에 보낼 스냅샷이 바뀐 client_id
+        self.tasks = []
+
+    def _handle_fanout(self, message: Dict[str, Any]):
+        self.fanout_enabled = bool(message.get("enabled"))
+
+    async def connect(self):
+        for attempt in range(IPC_CONNECT_RETRIES):
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.ipc_path, limit=IPC_LINE_LIMIT)
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                await asyncio.sleep(0.1 * (attempt + 1))
+        else:
+            raise ConnectionError(f"코디네이터 연결 실패: {self.ipc_path}")
+        self.channel = IpcChannel(reader, writer, self.handlers, f"worker-{self.worker_id}")
+        self.channel.send("hello", worker_id=self.worker_id, pid=os.getpid())
+        self.tasks.append(asyncio.create_task(self._run_channel()))
+        self.tasks.append(asyncio.create_task(self._relay_snapshots()))
+        logger.info(f"코디네이터 연결됨 (워커 {self.worker_id})")
+
+    async def _run_channel(self):
+        await self.channel.run()
+        # 코디네이터가 없으면 전역 상태를 유지할 수 없으므로 워커 종료
+        logger.error(f"코디네이터 연결 끊김, 워커 {self.worker_id} 종료")
+        os.kill(os.getpid(), signal.SIGTERM)
+
+    def register(self, client_id: str):
+        self.channel.send("register", client_id=client_id)
+
+    def unregister(self, client_id: str):
+        self.channel.send("unregister", client_id=client_id)
+        self.dirty.add(client_id)
+
+    def mark_dirty(self, client_id: str):
+        self.dirty.add(client_id)
+
+    def publish(self, host: str, samples: List[tuple], ts: float):
+        if self.fanout_enabled:
+            self.channel.send("publish", host=host, samples=samples, ts=ts)
+
+    def subscribers_changed(self, count: int):
+        self.channel.send("subscribers", count=count)
+
+    async def fetch_snapshot(self) -> bytes:
+        result = await self.channel.request("get_snapshot")
+        return result.encode("utf-8")
+
+    async def _relay_snapshots(self):
+        """변경된 클라이언트 스냅샷 조각을 모아서 전달"""
+        while True:
+            try:
+                await asyncio.sleep(SNAPSHOT_RELAY_INTERVAL)
+                if not self.dirty:
+                    continue
+                dirty, self.dirty = self.dirty, set()
+                for client_id in dirty:
+                    entry = self.snapshot_index.entries.get(client_id)
+                    if entry is None:
+                        continue
+                    fragment = self.snapshot_index.fragment(client_id)
+                    self.channel.send("snapshot", client_id=client_id, host_name=entry.host_name,
+                                      connected=entry.connected, fragment=fragment.decode("utf-8"))
+                    if not entry.connected:
+                        # 코디네이터에 마지막 상태를 넘겼으므로 워커 쪽 사본은 제거
+                        self.snapshot_index.remove(client_id)
+                await self.channel.writer.drain()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"스냅샷 전달 중 오류 발생: {e}")
+
+    def close(self):
+        for task in self.tasks:
+            task.cancel()
+        if self.channel:
+            self.channel.close()
+
+
+class Coordinator:
+    """워커 모드의 부모 프로세스
+
+    - 클라이언트 ID -> 워커 소유 관계 (중복 ID 접속 시 기존 워커에 kick)
+    - 워커가 보낸 스냅샷 조각으로 전역 스냅샷 유지 (조각은 디코딩하지 않고 그대로 이어 붙임)
+    - 대시보드 샘플을 구독자가 있는 워커에만 전달
+    - 명령을 대상 클라이언트를 가진 워커로 전달
+    """
+
+    def __init__(self, snapshot_index):
+        self.snapshot_index = snapshot_index
+        self.channels: Dict[int, IpcChannel] = {}
+        self.worker_pids: Dict[int, int] = {}
+        self.subscriber_counts: Dict[int, int] = {}
+        self.owners: Dict[str, int] = {}
+        self.server = None
+        self.stats = {
+            "kicks": 0,
+            "relayed_publishes": 0,
+            "commands": 0,
+        }
+
+    async def start(self, path: str):
+        if os.path.exists(path):
+            os.unlink(path)
+        self.server = await asyncio.start_unix_server(self._handle_worker, path, limit=IPC_LINE_LIMIT)
+        logger.info(f"코디네이터 IPC 시작: {path}")
+
+    def close(self):
+        if self.server:
+            self.server.close()
+        for channel in self.channels.values():
+            channel.close()
+
+    async def _handle_worker(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        state = {"worker_id": None}
+
+        def hello(message):
+            worker_id = message["worker_id"]
+            state["worker_id"] = worker_id
+            self.channels[worker_id] = channel
+            self.worker_pids[worker_id] = message.get("pid")
+            self.subscriber_counts[worker_id] = 0
+            channel.send("fanout", enabled=self._fanout_enabled())
+            logger.info(f"워커 {worker_id} 연결됨 (PID: {message.get('pid')})")
+
+        def register(message):
+            client_id = message["client_id"]
+            worker_id = state["worker_id"]
+            previous = self.owners.get(client_id)
+            if previous is not None and previous != worker_id and previous in self.channels:
+                # 같은 ID가 다른 워커에 연결되어 있으면 기존 연결 종료 요청
+                self.channels[previous].send("kick", client_id=client_id)
+                self.stats["kicks"] += 1
+                logger.warning(f"동일 ID의 기존 연결 발견: {client_id}, 워커 {previous}에 종료 요청")
+            self.owners[client_id] = worker_id
+
+        def unregister(message):
+            client_id = message["client_id"]
+            if self.owners.get(client_id) == state["worker_id"]:
+                del self.owners[client_id]
+
+        def snapshot(message):
+            self.snapshot_index.put_fragment(
+                message["client_id"], message.get("host_name", "unknown_host"),
+                message.get("connected", True), message["fragment"].encode("utf-8")
+            )
+
+        def publish(message):
+            origin = state["worker_id"]
+            for worker_id, count in self.subscriber_counts.items():
+                if count and worker_id != origin and worker_id in self.channels:
+                    self.channels[worker_id].send("publish", host=message["host"],
+                                                  samples=message["samples"], ts=message["ts"])
+                    self.stats["relayed_publishes"] += 1
+
+        def subscribers(message):
+            before = self._fanout_enabled()
+            self.subscriber_counts[state["worker_id"]] = message.get("count", 0)
+            after = self._fanout_enabled()
+            if before != after:
+                self._broadcast("fanout", enabled=after)
+
+        def get_snapshot(message):
+            return self.snapshot_index.get_blob().decode("utf-8")
+
+        channel = IpcChannel(reader, writer, {
+            "hello": hello,
+            "register": register,
+            "unregister": unregister,
+            "snapshot": snapshot,
+            "publish": publish,
+            "subscribers": subscribers,
+            "get_snapshot": get_snapshot,
+        }, "coordinator")
+        try:
+            await channel.run()
+        finally:
+            worker_id = state["worker_id"]
+            if worker_id is not None:
+                logger.error(f"워커 {worker_id} 연결 끊김")
+                self.channels.pop(worker_id, None)
+                self.subscriber_counts.pop(worker_id, None)
+                for client_id in [cid for cid, owner in self.owners.items() if owner == worker_id]:
+                    del self.owners[client_id]
+            writer.close()
+
+    def _fanout_enabled(self) -> bool:
+        return any(self.subscriber_counts.values())
+
+    def _broadcast(self, op: str, **fields):
+        for channel in self.channels.values():
+            channel.send(op, **fields)
+
+    async def route_command(self, client_id: str, command: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """명령을 클라이언트를 가진 워커로 전달하고 결과 반환"""
+        worker_id = self.owners.get(client_id)
+        channel = self.channels.get(worker_id) if worker_id is not None else None
+        if channel is None:
+            return {"status": "failed", "error": f"클라이언트 {client_id}가 연결되어 있지 않습니다"}
+        self.stats["commands"] += 1
+        return await channel.request("command", timeout=timeout + IPC_REQUEST_TIMEOUT,
+                                     client_id=client_id, command=command, timeout_seconds=timeout)
+
+    def summary(self) -> Dict[str, Any]:
+        per_worker = {}
+        for owner in self.owners.values():
+            per_worker[owner] = per_worker.get(owner, 0) + 1
+        return {
+            "workers": {
+                worker_id: {
+                    "pid": self.worker_pids.get(worker_id),
+                    "clients": per_worker.get(worker_id, 0),
+                    "subscribers": self.subscriber_counts.get(worker_id, 0),
+                }
+                for worker_id in sorted(self.channels)
+            },
+            "clients": len(self.owners),
+            **self.stats,
+        }
+
+
+def start_workers(count: int, target: Callable[[int, str], None], ipc_path: str) -> List[multiprocessing.Process]:
+    """워커 프로세스 생성 (이벤트 루프를 만들기 전에 호출해야 함)"""
+    context = multiprocessing.get_context("fork")
+    processes = []
+    for worker_id in range(count):
+        process = context.Process(target=target, args=(worker_id, ipc_path),
+                                  name=f"mserver-worker-{worker_id}", daemon=False)
+        process.start()
+        processes.append(process)
+    return processes
+
+
+def stop_workers(processes: List[multiprocessing.Process], timeout: float = 10):
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    deadline = time.time() + timeout
+    for process in processes:
+        process.join(max(0.0, deadline - time.time()))
+        if process.is_alive():
+            process.kill()
+
+
+async def watch_workers(processes: List[multiprocessing.Process], interval: float = 5):
+    """워커 종료 감시 (모든 워커가 종료되면 반환)"""
+    reported = set()
+    while True:
+        await asyncio.sleep(interval)
+        for process in processes:
+            if not process.is_alive() and process.pid not in reported:
+                reported.add(process.pid)
+                logger.error(f"워커 프로세스 종료됨: {process.name} (PID: {process.pid}, 종료 코드: {process.exitcode})")
+        if len(reported) == len(processes):
+            return
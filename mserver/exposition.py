@@ -0,0 +1,210 @@
+# exposition.py
+import json
+import logging
+import time
+from typing import Dict, List, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# (메트릭 이름, 타입, 설명, system 키) - mclient /metrics 와 같은 이름 사용
+HOST_METRICS = (
+    ("mclient_host_cpu_usage_percent", "gauge", "호스트 CPU 사용률", "cpu_usage"),
+    ("mclient_host_cpu_user_percent", "gauge", "호스트 CPU user 비율", "cpu_user"),
+    ("mclient_host_cpu_system_percent", "gauge", "호스트 CPU system 비율", "cpu_system"),
+    ("mclient_host_cpu_idle_percent", "gauge", "호스트 CPU idle 비율", "cpu_idle"),
+    ("mclient_host_cpu_cores", "gauge", "호스트 CPU 코어 수", "cpu_cores"),
+    ("mclient_host_memory_total_bytes", "gauge", "호스트 전체 메모리", "host_memory_total"),
+    ("mclient_host_docker_memory_total_bytes", "gauge", "Docker 전체 메모리", "docker_memory_total"),
+    ("mclient_host_docker_memory_used_bytes", "gauge", "Docker 사용 메모리", "docker_memory_used"),
+    ("mclient_host_docker_memory_percent", "gauge", "Docker 메모리 사용률", "docker_memory_percent"),
+    ("mclient_host_swap_total_bytes", "gauge", "스왑 전체", "swap_total"),
+    ("mclient_host_swap_used_bytes", "gauge", "스왑 사용량", "swap_used"),
+    ("mclient_host_uptime_seconds", "gauge", "호스트 가동 시간", "uptime"),
+    ("mclient_host_disk_total_bytes", "gauge", "디스크 전체", "disk_total"),
+    ("mclient_host_disk_used_bytes", "gauge", "디스크 사용량", "disk_used"),
+    ("mclient_host_disk_available_bytes", "gauge", "디스크 여유 공간", "disk_available"),
+    ("mclient_host_disk_percent", "gauge", "디스크 사용률", "disk_percent"),
+)
+
+# (메트릭 이름, 타입, 설명, 컨테이너 dict 경로)
+CONTAINER_METRICS = (
+    ("mclient_container_cpu_percent", "gauge", "컨테이너 CPU 사용률", ("cpu", "percent")),
+    ("mclient_container_memory_usage_bytes", "gauge", "컨테이너 메모리 사용량", ("memory", "usage")),
+    ("mclient_container_memory_limit_bytes", "gauge", "컨테이너 메모리 한도", ("memory", "limit")),
+    ("mclient_container_memory_percent", "gauge", "컨테이너 메모리 사용률", ("memory", "percent")),
+    ("mclient_container_network_rx_bytes_total", "counter", "컨테이너 네트워크 수신량", ("network", "rx")),
+    ("mclient_container_network_tx_bytes_total", "counter", "컨테이너 네트워크 송신량", ("network", "tx")),
+    ("mclient_container_disk_read_bytes_total", "counter", "컨테이너 디스크 읽기량", ("disk", "read")),
+    ("mclient_container_disk_write_bytes_total", "counter", "컨테이너 디스크 쓰기량", ("disk", "write")),
+    ("mclient_container_data_size_bytes", "gauge", "노드 데이터 볼륨 크기", ("data_size",)),
+    ("mclient_node_current_block", "gauge", "현재(best) 블록 높이", ("blockchain", "current_block")),
+    ("mclient_node_finalized_block", "gauge", "Finalized 블록 높이", ("blockchain", "finalized_block")),
+    ("mclient_node_target_block", "gauge", "동기화 목표 블록 높이", ("blockchain", "target_block")),
+    ("mclient_node_peers", "gauge", "연결된 피어 수", ("blockchain", "peers")),
+)
+
+SYNC_STATE_METRIC = ("mclient_node_sync_state", "gauge", "노드 동기화 상태 (해당 상태면 1)")
+SYNC_STATES = ("synced", "syncing", "catching_up", "no_peers", "initializing", "checking", "offline", "unknown")
+
+# 클라이언트 연결 상태 (끊긴 클라이언트는 이 두 메트릭만 노출)
+CLIENT_METRICS = (
+    ("mserver_client_connected", "gauge", "클라이언트 연결 여부"),
+    ("mserver_client_last_update_timestamp_seconds", "gauge", "클라이언트 마지막 stats 수신 시각"),
+)
+
+# 메트릭 패밀리 출력 순서 (이름, 타입, 설명)
+FAMILIES: Tuple[Tuple[str, str, str], ...] = (
+    tuple(CLIENT_METRICS)
+    + tuple((name, metric_type, help_text) for name, metric_type, help_text, _ in HOST_METRICS)
+    + tuple((name, metric_type, help_text) for name, metric_type, help_text, _ in CONTAINER_METRICS)
+    + (SYNC_STATE_METRIC,)
+)
+
+HOST_OFFSET = len(CLIENT_METRICS)
+CONTAINER_OFFSET = HOST_OFFSET + len(HOST_METRICS)
+SYNC_STATE_INDEX = CONTAINER_OFFSET + len(CONTAINER_METRICS)
+
+# 컨테이너 메트릭 조회 순서 (패밀리 인덱스, 이름, 1단계 키, 2단계 키)
+CONTAINER_ACCESSORS = tuple(
+    (index, name, path[0], path[1] if len(path) > 1 else None)
+    for index, (name, _, _, path) in enumerate(CONTAINER_METRICS, CONTAINER_OFFSET)
+)
+
+# 패밀리별 HELP/TYPE 헤더 (미리 인코딩)
+FAMILY_HEADERS: Tuple[bytes, ...] = tuple(
+    f"# HELP {name} {help_text}\n# TYPE {name} {metric_type}\n".encode("utf-8")
+    for name, metric_type, help_text in FAMILIES
+)
+
+
+def escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels: Dict[str, Any]) -> str:
+    return "{" + ",".join(f'{key}="{escape_label(value)}"' for key, value in labels.items()) + "}"
+
+
+def format_value(value: Any) -> str:
+    value_type = type(value)
+    if value_type is float:
+        return repr(value)
+    if value_type is bool:
+        return "1" if value else "0"
+    if value_type is int:
+        return str(value)
+    try:
+        return repr(float(value))
+    except (TypeError, ValueError):
+        return "0"
+
+
+def render_client(client_id: str, host_name: str, connected: bool, updated_at: float,
+                  data: Dict[str, Any]) -> Tuple[bytes, ...]:
+    """클라이언트 하나의 샘플 줄을 FAMILIES 순서대로 생성 (패밀리별 인코딩된 줄, 없으면 b"")"""
+    samples: List[List[str]] = [[] for _ in FAMILIES]
+
+    client_labels = format_labels({"host": host_name, "client_id": client_id})
+    samples[0].append(f"{FAMILIES[0][0]}{client_labels} {format_value(connected)}")
+    samples[1].append(f"{FAMILIES[1][0]}{client_labels} {format_value(round(updated_at, 3))}")
+
+    # 끊긴 클라이언트의 마지막 값은 노출하지 않음 (오래된 값이 현재 값처럼 보이지 않도록)
+    # 같은 host_name 을 보고하는 클라이언트가 여럿이어도 시리즈가 겹치지 않도록 client_id 라벨 포함
+    if connected:
+        system = data.get("system") or {}
+        for index, (name, _, _, key) in enumerate(HOST_METRICS, HOST_OFFSET):
+            value = system.get(key)
+            if value is not None:
+                samples[index].append(f"{name}{client_labels} {format_value(value)}")
+
+        for container in data.get("containers") or []:
+            # 라벨 문자열은 컨테이너당 한 번만 생성
+            label_body = (f'host="{escape_label(host_name)}",client_id="{escape_label(client_id)}",'
+                          f'container="{escape_label(container.get("name", ""))}",'
+                          f'node_type="{escape_label(container.get("node_type", "unknown"))}"')
+            labels = "{" + label_body + "}"
+            for index, name, section, key in CONTAINER_ACCESSORS:
+                value = container.get(section)
+                if key is not None:
+                    value = value.get(key) if isinstance(value, dict) else None
+                if value is not None:
+                    samples[index].append(f"{name}{labels} {format_value(value)}")
+            if "sync_state" in container:
+                current = container.get("sync_state", "unknown")
+                lines = samples[SYNC_STATE_INDEX]
+                for state in SYNC_STATES:
+                    lines.append(f'{SYNC_STATE_METRIC[0]}{{{label_body},state="{state}"}} {1 if current == state else 0}')
+
+    return tuple(("\n".join(lines) + "\n").encode("utf-8") if lines else b"" for lines in samples)
+
+
+class FleetExporter:
+    """SnapshotIndex 기반 전체 클라이언트 Prometheus 익스포터
+
+    - 클라이언트별 샘플 텍스트(패밀리별 bytes 튜플)를 스냅샷 항목에 캐시하고
+      변경된 클라이언트만 다시 생성
+    - 스냅샷 버전이 그대로면 마지막으로 조립한 본문을 그대로 반환
+    - 워커 모드 코디네이터처럼 항목에 JSON 조각만 있는 경우 변경된 조각만 디코딩
+    """
+
+    def __init__(self, snapshot_index):
+        self.snapshot_index = snapshot_index
+        self.body: Optional[bytes] = None
+        self.body_version = -1
+        self.stats = {
+            "scrapes": 0,
+            "assembles": 0,
+            "clients_rendered": 0,
+        }
+
+    def _client_data(self, entry) -> Dict[str, Any]:
+        if entry.fields or entry.containers:
+            return entry.data()
+        if entry.fragment:
+            try:
+                return json.loads(entry.fragment).get("data") or {}
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                logger.warning(f"스냅샷 조각 디코딩 실패: {entry.client_id}")
+        return {}
+
+    def render(self) -> bytes:
+        self.stats["scrapes"] += 1
+        index = self.snapshot_index
+        index.prune()
+        if self.body is not None and self.body_version == index.version:
+            return self.body
+
+        started = time.perf_counter()
+        entries = list(index.entries.values())
+        for entry in entries:
+            if entry.exposition is None:
+                entry.exposition = render_client(entry.client_id, entry.host_name, entry.connected,
+                                                 entry.updated_at, self._client_data(entry))
+                self.stats["clients_rendered"] += 1
+
+        # 클라이언트별 튜플을 패밀리별 열로 전치해 이어 붙임
+        parts: List[bytes] = []
+        for header, column in zip(FAMILY_HEADERS, zip(*[entry.exposition for entry in entries])):
+            body = b"".join(column)
+            if body:
+                parts.append(header)
+                parts.append(body)
+
+        connected = sum(1 for entry in entries if entry.connected)
+        parts.append((
+            "# HELP mserver_clients 스냅샷에 있는 클라이언트 수\n# TYPE mserver_clients gauge\n"
+            f'mserver_clients{{state="connected"}} {connected}\n'
+            f'mserver_clients{{state="disconnected"}} {len(entries) - connected}\n'
+            "# HELP mserver_exposition_clients_rendered_total 다시 생성한 클라이언트 텍스트 수\n"
+            "# TYPE mserver_exposition_clients_rendered_total counter\n"
+            f"mserver_exposition_clients_rendered_total {self.stats['clients_rendered']}\n"
+        ).encode("utf-8"))
+
+        self.body = b"".join(parts)
+        self.body_version = index.version
+        self.stats["assembles"] += 1
+        logger.debug(f"메트릭 조립: 클라이언트 {len(entries)}개, {len(self.body)} 바이트, "
+                     f"{(time.perf_counter() - started) * 1000:.2f}ms")
+        return self.body
@@ -0,0 +1,227 @@
+# fanout.py
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple, Set, Callable, Awaitable
+
+logger = logging.getLogger(__name__)
+
+# 대시보드 구독 경로
+DASHBOARD_PATH = "/ws/dashboard"
+
+# 구독자별 대기열에 보관할 최대 키 수 ((host, container) 단위)
+MAX_PENDING_KEYS = 512
+# 한 프레임에 담을 최대 항목 수
+MAX_BATCH_ENTRIES = 64
+# 전송이 이 시간 이상 막히면 느린 구독자로 보고 연결 종료 (초)
+SEND_TIMEOUT = 30
+# 구독 메시지 대기 시간 (초)
+SUBSCRIBE_TIMEOUT = 30
+
+
+class Subscriber:
+    """대시보드 구독자
+
+    갱신은 (host, container) 키의 OrderedDict 에 쌓이며, 전송이 밀리면 같은 키의
+    이전 값은 최신 값으로 덮어써진다(coalescing). 키 수가 한도를 넘으면 가장
+    오래된 키를 버리므로 느린 브라우저가 있어도 메모리는 한도 내로 유지된다.
+    """
+
+    def __init__(self, websocket, max_pending: int = MAX_PENDING_KEYS):
+        self.websocket = websocket
+        self.max_pending = max_pending
+        self.pending = OrderedDict()   # (host, container) -> (ts, {metric: value})
+        self.wakeup = asyncio.Event()
+        self.hosts = None              # None 이면 전체 호스트
+        self.metrics = None            # None 이면 전체 메트릭
+        self.sent_frames = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+    def subscribe(self, hosts: Optional[List[str]], metrics: Optional[List[str]]):
+        """구독 대상 변경 (빈 목록/None 은 전체)"""
+        self.hosts = set(hosts) if hosts else None
+        self.metrics = set(metrics) if metrics else None
+        self.pending.clear()
+
+    def wants_host(self, host: str) -> bool:
+        return self.hosts is None or host in self.hosts
+
+    def offer(self, key: Tuple[str, str], ts: float, values: Dict[str, float]):
+        """갱신 추가 (동기, 블로킹 없음)"""
+        if self.metrics is not None:
+            values = {metric: value for metric, value in values.items() if metric in self.metrics}
+            if not values:
+                return
+        if key in self.pending:
+            # 아직 전송되지 않은 이전 값은 최신 값으로 대체 (대기열 순서는 유지)
+            self.pending[key] = (ts, values)
+            self.coalesced += 1
+        else:
+            if len(self.pending) >= self.max_pending:
+                self.pending.popitem(last=False)
+                self.dropped += 1
+            self.pending[key] = (ts, values)
+        self.wakeup.set()
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        entries = []
+        while self.pending and len(entries) < MAX_BATCH_ENTRIES:
+            (host, container), (ts, values) = self.pending.popitem(last=False)
+            entries.append({"host": host, "container": container, "ts": ts, "values": values})
+        return entries
+
+    async def run(self):
+        """대기열을 비우며 전송 (구독자마다 별도 태스크로 실행)"""
+        try:
+            while True:
+                await self.wakeup.wait()
+                self.wakeup.clear()
+                while self.pending:
+                    entries = self._take_batch()
+                    message = json.dumps({"type": "update", "entries": entries}, ensure_ascii=False)
+                    await asyncio.wait_for(self.websocket.send(message), timeout=SEND_TIMEOUT)
+                    self.sent_frames += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # 전송이 막히거나 실패한 구독자는 연결을 닫아 수신 루프도 종료되게 함
+            logger.warning(f"대시보드 전송 실패, 연결 종료: {e!r}")
+            try:
+                await self.websocket.close()
+            except Exception:
+                pass
+
+
+class FanoutHub:
+    """mclient stats 를 대시보드 구독자에게 전달하는 허브
+
+    publish 는 수신 경로에서 호출되며 구독자 대기열에 넣기만 하고 바로 반환한다.
+    실제 전송은 구독자별 태스크에서 수행되므로 느린 구독자가 수집을 지연시키지 않는다.
+    """
+
+    def __init__(self, max_pending: int = MAX_PENDING_KEYS, snapshot_index=None):
+        self.max_pending = max_pending
+        self.snapshot_index = snapshot_index   # 구독 직후 보낼 최신 상태
+        # 워커 모드에서는 코디네이터의 전체 스냅샷을 가져오는 코루틴으로 대체
+        self.snapshot_provider: Optional[Callable[[], Awaitable[bytes]]] = None
+        # 구독자 수가 바뀔 때 호출 (워커 모드에서 코디네이터에 알림)
+        self.on_subscribers_changed: Optional[Callable[[int], None]] = None
+        self.subscribers: Set[Subscriber] = set()
+        self.known_hosts: Dict[str, float] = {}   # host -> 마지막 갱신 시각
+        self.stats = {
+            "published": 0,
+            "subscribers_total": 0,
+        }
+
+    def publish(self, host: str, samples: List[Tuple[str, str, float]], ts: Optional[float] = None):
+        """호스트의 샘플 묶음을 구독자들에게 전달"""
+        if ts is None:
+            ts = time.time()
+        self.known_hosts[host] = ts
+        self.stats["published"] += 1
+        if not self.subscribers or not samples:
+            return
+
+        grouped: Dict[str, Dict[str, float]] = {}
+        for container, metric, value in samples:
+            grouped.setdefault(container, {})[metric] = value
+
+        for subscriber in self.subscribers:
+            if not subscriber.wants_host(host):
+                continue
+            for container, values in grouped.items():
+                subscriber.offer((host, container), ts, values)
+
+    def _notify_subscribers_changed(self):
+        if self.on_subscribers_changed:
+            self.on_subscribers_changed(len(self.subscribers))
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self.subscribers),
+            "published": self.stats["published"],
+            "subscribers_total": self.stats["subscribers_total"],
+            "coalesced": sum(s.coalesced for s in self.subscribers),
+            "dropped": sum(s.dropped for s in self.subscribers),
+            "pending": sum(len(s.pending) for s in self.subscribers),
+        }
+
+    def _handle_control(self, subscriber: Subscriber, message: str) -> Optional[Dict[str, Any]]:
+        """구독자 제어 메시지 처리, 응답 메시지 반환"""
+        data = json.loads(message)
+        message_type = data.get("type")
+        if message_type == "subscribe":
+            subscriber.subscribe(data.get("hosts"), data.get("metrics"))
+            hosts = self.snapshot_index.hosts() if self.snapshot_index else sorted(self.known_hosts)
+            return {
+                "type": "subscribe_ack",
+                "hosts": hosts,
+                "timestamp": int(time.time() * 1000),
+            }
+        if message_type == "ping":
+            return {"type": "pong", "timestamp": int(time.time() * 1000)}
+        logger.warning(f"알 수 없는 대시보드 메시지 유형: {message_type}")
+        return None
+
+    async def _send_reply(self, websocket, reply: Dict[str, Any]):
+        """제어 응답 전송, 구독 응답 뒤에는 최신 스냅샷을 함께 전송"""
+        await websocket.send(json.dumps(reply, ensure_ascii=False))
+        if reply["type"] != "subscribe_ack":
+            return
+        # 미리 직렬화된 blob 을 그대로 감싸서 전송 (다음 tick 을 기다리지 않음)
+        if self.snapshot_provider is not None:
+            blob = await self.snapshot_provider()
+        elif self.snapshot_index is not None:
+            blob = self.snapshot_index.get_blob()
+        else:
+            blob = None
+        if blob:
+            await websocket.send('{"type": "snapshot", "snapshot": ' + blob.decode("utf-8") + "}")
+
+    async def handle_subscriber(self, websocket):
+        """대시보드 WebSocket 연결 처리"""
+        peer = websocket.remote_address[0] if websocket.remote_address else "unknown"
+        subscriber = Subscriber(websocket, self.max_pending)
+        sender_task = None
+        try:
+            # 첫 메시지는 구독 요청이어야 함
+            first = await asyncio.wait_for(websocket.recv(), timeout=SUBSCRIBE_TIMEOUT)
+            reply = self._handle_control(subscriber, first)
+            if not reply or reply["type"] != "subscribe_ack":
+                await websocket.close(code=1008, reason="subscribe required")
+                return
+            await self._send_reply(websocket, reply)
+
+            self.subscribers.add(subscriber)
+            self.stats["subscribers_total"] += 1
+            self._notify_subscribers_changed()
+            logger.info(f"대시보드 구독 시작 (IP: {peer}, 구독자 {len(self.subscribers)}명)")
+            sender_task = asyncio.create_task(subscriber.run())
+
+            async for message in websocket:
+                try:
+                    reply = self._handle_control(subscriber, message)
+                    if reply:
+                        await self._send_reply(websocket, reply)
+                except json.JSONDecodeError:
+                    logger.error("대시보드 메시지 JSON 파싱 실패")
+        except asyncio.TimeoutError:
+            logger.warning(f"대시보드 구독 메시지 타임아웃 (IP: {peer})")
+        except json.JSONDecodeError:
+            logger.error(f"대시보드 구독 메시지 JSON 파싱 실패 (IP: {peer})")
+        except Exception as e:
+            logger.debug(f"대시보드 연결 종료 (IP: {peer}): {e}")
+        finally:
+            if subscriber in self.subscribers:
+                self.subscribers.discard(subscriber)
+                self._notify_subscribers_changed()
+            if sender_task:
+                sender_task.cancel()
+            try:
+                await websocket.close()
+            except Exception:
+                pass
+            logger.info(f"대시보드 구독 종료 (IP: {peer}, 병합 {subscriber.coalesced}건, 버림 {subscriber.dropped}건)")
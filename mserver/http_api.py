@@ -0,0 +1,380 @@
+# http_api.py
+import asyncio
+import json
+import logging
+import mimetypes
+import os
+import re
+import time
+from typing import Dict, Any, Optional, Callable, Awaitable, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+from exposition import FleetExporter, CONTENT_TYPE as EXPOSITION_CONTENT_TYPE
+
+logger = logging.getLogger(__name__)
+
+# 요청 한도
+MAX_HEADER_BYTES = 16384
+MAX_BODY_BYTES = 1048576
+REQUEST_TIMEOUT = 10
+DEFAULT_PAGE_ROWS = 1000     # limit 미지정 시 페이지 크기
+MAX_PAGE_ROWS = 10000        # 요청당 최대 행 수
+STREAM_CHUNK_ROWS = 500      # 청크당 행 수 (청크 사이에 이벤트 루프 양보)
+MAX_CONCURRENT_QUERIES = 4   # 동시에 실행할 조회 수
+
+HTTP_REASONS = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+_DURATION_RE = re.compile(r'^(\d+(?:\.\d+)?)\s*([smhd]?)$')
+_DURATION_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+class HttpError(Exception):
+    """HTTP 오류 응답으로 변환되는 예외"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def parse_duration(value: str) -> float:
+    """'90', '5m', '6h', '1d' 형식의 기간을 초 단위로 변환"""
+    match = _DURATION_RE.match(value.strip())
+    if not match:
+        raise HttpError(400, f"잘못된 기간 형식: {value}")
+    return float(match.group(1)) * _DURATION_UNITS[match.group(2)]
+
+
+def parse_time(value: Optional[str], now: float, default: float) -> float:
+    """절대 시각(epoch 초), 'now', 상대 시각('-6h') 파싱"""
+    if value is None or value == "":
+        return default
+    value = value.strip()
+    if value == "now":
+        return now
+    if value.startswith("-"):
+        return now - parse_duration(value[1:])
+    try:
+        return float(value)
+    except ValueError:
+        raise HttpError(400, f"잘못된 시각 형식: {value}")
+
+
+class HttpRequest:
+    """파싱된 HTTP 요청"""
+
+    def __init__(self, method: str, target: str, headers: Dict[str, str], peer: str):
+        self.method = method
+        self.target = target
+        self.headers = headers
+        self.peer = peer
+        self.body = b""
+        parts = urlsplit(target)
+        self.path = parts.path
+        self.query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+
+    def param(self, name: str, default: Optional[str] = None, required: bool = False) -> Optional[str]:
+        value = self.query.get(name, default)
+        if required and not value:
+            raise HttpError(400, f"필수 파라미터 누락: {name}")
+        return value
+
+    def json(self) -> Any:
+        """요청 본문을 JSON 으로 파싱"""
+        try:
+            return json.loads(self.body or b"{}")
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise HttpError(400, "요청 본문이 올바른 JSON 이 아닙니다")
+
+
+class HttpResponse:
+    """HTTP 응답 작성기 (일반 응답 및 chunked 스트리밍)
+
+    head_only 이면 (HEAD 요청) 헤더와 Content-Length 만 보내고 본문은 쓰지 않는다.
+    """
+
+    def __init__(self, writer: asyncio.StreamWriter, head_only: bool = False):
+        self.writer = writer
+        self.head_only = head_only
+        self.started = False
+        self.chunked = False
+
+    def _write_head(self, status: int, headers: Dict[str, str]):
+        lines = [f"HTTP/1.1 {status} {HTTP_REASONS.get(status, 'OK')}"]
+        headers.setdefault("Connection", "close")
+        headers.setdefault("Cache-Control", "no-store")
+        for name, value in headers.items():
+            lines.append(f"{name}: {value}")
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        self.started = True
+
+    async def send(self, status: int, body: bytes, content_type: str = "application/json",
+                   headers: Optional[Dict[str, str]] = None):
+        head = {"Content-Type": content_type, "Content-Length": str(len(body))}
+        if headers:
+            head.update(headers)
+        self._write_head(status, head)
+        if not self.head_only:
+            self.writer.write(body)
+        await self.writer.drain()
+
+    async def send_json(self, status: int, obj: Any):
+        await self.send(status, json.dumps(obj, ensure_ascii=False).encode("utf-8"))
+
+    async def start_chunked(self, status: int = 200, content_type: str = "application/json"):
+        self._write_head(status, {"Content-Type": content_type, "Transfer-Encoding": "chunked"})
+        self.chunked = True
+
+    async def write_chunk(self, data: bytes):
+        if not data or self.head_only:
+            return
+        self.writer.write(f"{len(data):x}\r\n".encode("latin-1") + data + b"\r\n")
+        await self.writer.drain()
+
+    async def end(self):
+        if self.chunked and not self.head_only:
+            self.writer.write(b"0\r\n\r\n")
+            await self.writer.drain()
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+Handler = Callable[[HttpRequest, HttpResponse], Awaitable[None]]
+
+
+class HttpApiServer:
+    """mserver 조회용 경량 HTTP 서버 (WebSocket 수신과 같은 이벤트 루프에서 실행)"""
+
+    def __init__(self, metric_store, snapshot_index=None, max_rows: int = MAX_PAGE_ROWS):
+        self.metric_store = metric_store
+        self.snapshot_index = snapshot_index
+        self.max_rows = max_rows
+        self.routes = {}          # 경로 -> (핸들러, 허용 메서드)
+        self.prefix_routes = []   # (접두사, 핸들러, 허용 메서드)
+        self.query_semaphore = asyncio.Semaphore(MAX_CONCURRENT_QUERIES)
+        self.server = None
+
+        self.add_route("/api/query", self.handle_query)
+        self.add_route("/api/series", self.handle_series)
+        self.exporter = None
+        if snapshot_index is not None:
+            self.exporter = FleetExporter(snapshot_index)
+            self.add_route("/api/snapshot", self.handle_snapshot)
+            self.add_route("/metrics", self.handle_metrics)
+
+    def add_route(self, path: str, handler: Handler, methods: Tuple[str, ...] = ("GET", "HEAD")):
+        self.routes[path] = (handler, methods)
+
+    def add_prefix_route(self, prefix: str, handler: Handler, methods: Tuple[str, ...] = ("GET", "HEAD")):
+        self.prefix_routes.append((prefix, handler, methods))
+
+    def add_static(self, prefix: str, directory: str, index: str = "index.html"):
+        """prefix 아래 경로를 directory 의 정적 파일로 제공"""
+        root = os.path.realpath(directory)
+
+        async def handle_static(request: HttpRequest, response: HttpResponse):
+            relative = request.path[len(prefix):].lstrip("/") or index
+            file_path = os.path.realpath(os.path.join(root, relative))
+            if file_path != root and not file_path.startswith(root + os.sep):
+                raise HttpError(403, "허용되지 않은 경로")
+            if os.path.isdir(file_path):
+                file_path = os.path.join(file_path, index)
+            if not os.path.isfile(file_path):
+                raise HttpError(404, f"파일 없음: {request.path}")
+            body = await asyncio.to_thread(_read_file, file_path)
+            content_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+            if content_type.startswith("text/") or content_type == "application/javascript":
+                content_type += "; charset=utf-8"
+            await response.send(200, body, content_type)
+
+        self.add_prefix_route(prefix, handle_static)
+
+    async def start(self, host: str, port: int, ssl_context=None):
+        self.server = await asyncio.start_server(self._handle_connection, host, port, ssl=ssl_context)
+        return self.server
+
+    def close(self):
+        if self.server:
+            self.server.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader, peer: str) -> Optional[HttpRequest]:
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=REQUEST_TIMEOUT)
+        if len(head) > MAX_HEADER_BYTES:
+            raise HttpError(400, "요청 헤더가 너무 큽니다")
+        lines = head.decode("latin-1").split("\r\n")
+        parts = lines[0].split(" ")
+        if len(parts) != 3:
+            raise HttpError(400, "잘못된 요청 라인")
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        request = HttpRequest(parts[0].upper(), parts[1], headers, peer)
+        length = headers.get("content-length")
+        if length:
+            try:
+                length = int(length)
+            except ValueError:
+                raise HttpError(400, "잘못된 Content-Length")
+            if length > MAX_BODY_BYTES:
+                raise HttpError(413, "요청 본문이 너무 큽니다")
+            request.body = await asyncio.wait_for(reader.readexactly(length), timeout=REQUEST_TIMEOUT)
+        return request
+
+    def _find_route(self, path: str) -> Optional[Tuple[Handler, Tuple[str, ...]]]:
+        route = self.routes.get(path)
+        if route:
+            return route
+        for prefix, handler, methods in self.prefix_routes:
+            if path.startswith(prefix):
+                return handler, methods
+        return None
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        peer = writer.get_extra_info("peername")
+        peer = peer[0] if peer else "unknown"
+        response = HttpResponse(writer)
+        try:
+            request = await self._read_request(reader, peer)
+            response.head_only = request.method == "HEAD"
+            route = self._find_route(request.path)
+            if route is None:
+                raise HttpError(404, f"알 수 없는 경로: {request.path}")
+            handler, methods = route
+            if request.method not in methods:
+                raise HttpError(405, f"지원하지 않는 메서드: {request.method}")
+            await handler(request, response)
+            await response.end()
+        except HttpError as e:
+            if not response.started:
+                await response.send_json(e.status, {"error": e.message})
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        except (ConnectionResetError, BrokenPipeError):
+            logger.debug(f"HTTP 클라이언트 연결 끊김 ({peer})")
+        except Exception as e:
+            logger.error(f"HTTP 요청 처리 중 오류 발생 ({peer}): {e}")
+            if not response.started:
+                try:
+                    await response.send_json(500, {"error": str(e)})
+                except Exception:
+                    pass
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    #################################################
+    # 히스토리 조회 API
+    #################################################
+
+    async def handle_query(self, request: HttpRequest, response: HttpResponse):
+        """GET /api/query?host=&container=&metric=&start=&end=&step=&limit=&cursor=&format=
+
+        - start/end: epoch 초, 'now', 또는 '-6h' 같은 상대 시각 (기본: 최근 1시간)
+        - step: 요청 해상도 ('60', '5m', '1h'); 이를 만족하는 가장 거친 티어를 사용
+        - limit: 페이지당 행 수 (최대 MAX_PAGE_ROWS)
+        - cursor: 이전 응답의 next_cursor (지정 시 start 대신 사용)
+        - format: json (행 배열) 또는 columnar (열 배열)
+        """
+        now = time.time()
+        host = request.param("host", required=True)
+        metric = request.param("metric", required=True)
+        container = request.param("container", "")
+        end = parse_time(request.param("end"), now, now)
+        start = parse_time(request.param("start"), now, end - 3600)
+        cursor = request.param("cursor")
+        if cursor:
+            start = parse_time(cursor, now, start)
+        step_param = request.param("step")
+        step = parse_duration(step_param) if step_param else None
+        output_format = request.param("format", "json")
+        if output_format not in ("json", "columnar"):
+            raise HttpError(400, f"지원하지 않는 형식: {output_format}")
+        try:
+            limit = int(request.param("limit", str(DEFAULT_PAGE_ROWS)))
+        except ValueError:
+            raise HttpError(400, "limit 은 정수여야 합니다")
+        limit = max(1, min(limit, self.max_rows))
+        if end <= start:
+            raise HttpError(400, "end 는 start 보다 커야 합니다")
+
+        async with self.query_semaphore:
+            result = await self.metric_store.query(host, container, metric, start, end, step=step, limit=limit)
+
+        header = {
+            "host": host,
+            "container": container,
+            "metric": metric,
+            "start": start,
+            "end": end,
+            "tier": result["tier"],
+            "step": result["step"],
+            "next_cursor": result["next_start"],
+        }
+        rows = result["rows"]
+
+        await response.start_chunked()
+        if request.method == "HEAD":
+            return
+
+        if output_format == "columnar":
+            header["columns"] = ["ts", "min", "max", "avg", "count"]
+            prefix = json.dumps(header)[:-1]
+            await response.write_chunk(prefix.encode("utf-8") + b', "data": {')
+            for index, column in enumerate(header["columns"]):
+                separator = b", " if index else b""
+                values = [row[index] for row in rows]
+                await response.write_chunk(separator + json.dumps(column).encode("utf-8") + b": " + json.dumps(values).encode("utf-8"))
+                await asyncio.sleep(0)
+            await response.write_chunk(b"}}")
+            return
+
+        # 행 배열을 청크 단위로 스트리밍 (청크 사이에 수신 처리에 양보)
+        prefix = json.dumps(header)[:-1]
+        await response.write_chunk(prefix.encode("utf-8") + b', "rows": [')
+        for offset in range(0, len(rows), STREAM_CHUNK_ROWS):
+            chunk = rows[offset:offset + STREAM_CHUNK_ROWS]
+            body = ", ".join(json.dumps(row) for row in chunk)
+            if offset:
+                body = ", " + body
+            await response.write_chunk(body.encode("utf-8"))
+            await asyncio.sleep(0)
+        await response.write_chunk(b"]}")
+
+    async def handle_series(self, request: HttpRequest, response: HttpResponse):
+        """GET /api/series?host= - 메모리에 있는 시리즈 목록"""
+        host = request.param("host")
+        keys = self.metric_store.series_keys(host)
+        await response.send_json(200, {
+            "series": [{"host": h, "container": c, "metric": m} for h, c, m in keys]
+        })
+
+    async def handle_snapshot(self, request: HttpRequest, response: HttpResponse):
+        """GET /api/snapshot - 전체 호스트 최신 상태 (변경이 없으면 304)"""
+        blob = self.snapshot_index.get_blob()
+        etag = f'"{self.snapshot_index.blob_version}"'
+        if request.headers.get("if-none-match") == etag:
+            await response.send(304, b"", headers={"ETag": etag})
+            return
+        await response.send(200, blob, headers={"ETag": etag})
+
+    async def handle_metrics(self, request: HttpRequest, response: HttpResponse):
+        """GET /metrics - 전체 클라이언트 최신 상태 (Prometheus 텍스트)"""
+        await response.send(200, self.exporter.render(), EXPOSITION_CONTENT_TYPE)
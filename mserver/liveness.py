@@ -0,0 +1,169 @@
+# liveness.py
+import asyncio
+import heapq
+import logging
+import time
+from typing import Dict, Any, Optional, Callable, Awaitable, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 마지막 활동 후 핑을 보낼 때까지의 시간 (초)
+PING_INTERVAL = 30
+# 퐁 대기 시간 (초)
+PONG_TIMEOUT = 5
+# 동시에 진행할 최대 핑 수
+MAX_CONCURRENT_PINGS = 64
+# 예정된 작업이 없을 때 최대 대기 시간 (초)
+MAX_SLEEP = 5
+
+
+class LivenessSweeper:
+    """데드라인 힙 기반 연결 상태 확인
+
+    - 클라이언트마다 (마지막 활동 + PING_INTERVAL) 시각을 힙에 넣고, 만료된 항목만 꺼내 처리
+    - 꺼낸 시점에 last_activity 가 갱신되어 있으면 새 데드라인으로 다시 넣음 (lazy 재스케줄)
+    - 실제로 조용한 클라이언트만 핑을 보내며, 핑은 세마포어 한도 내에서 동시에 진행
+    - 스윕 비용은 전체 클라이언트 수가 아니라 만료된 항목 수에 비례
+    """
+
+    def __init__(self,
+                 lookup: Callable[[str], Optional[Tuple[Any, float]]],
+                 touch: Callable[[str, float], None],
+                 on_dead: Callable[[str, Any], Awaitable[None]],
+                 ping_interval: float = PING_INTERVAL,
+                 pong_timeout: float = PONG_TIMEOUT,
+                 max_concurrent: int = MAX_CONCURRENT_PINGS):
+        """
+        Args:
+            lookup: client_id -> (websocket, last_activity), 없으면 None
+            touch: 퐁 수신 시 last_activity 갱신
+            on_dead: 응답 없는 클라이언트 정리 코루틴
+        """
+        self.lookup = lookup
+        self.touch = touch
+        self.on_dead = on_dead
+        self.ping_interval = ping_interval
+        self.pong_timeout = pong_timeout
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.heap = []              # (deadline, client_id)
+        self.scheduled = {}         # client_id -> 현재 유효한 deadline
+        self.in_flight = set()      # 핑 진행 중인 client_id
+        self.probe_tasks = set()
+        self.wakeup = asyncio.Event()
+        self.stats = {
+            "sweeps": 0,
+            "expired": 0,
+            "rescheduled": 0,
+            "pings_sent": 0,
+            "pongs": 0,
+            "timeouts": 0,
+            "last_sweep_ms": 0.0,
+        }
+
+    def _schedule(self, client_id: str, deadline: float):
+        self.scheduled[client_id] = deadline
+        heapq.heappush(self.heap, (deadline, client_id))
+        if self.heap[0][1] == client_id:
+            # 가장 이른 데드라인이 바뀌었으면 대기 중인 루프를 깨움
+            self.wakeup.set()
+
+    def track(self, client_id: str, last_activity: Optional[float] = None):
+        """클라이언트 감시 시작 (등록 시 호출)"""
+        if last_activity is None:
+            last_activity = time.time()
+        self._schedule(client_id, last_activity + self.ping_interval)
+
+    def untrack(self, client_id: str):
+        """감시 중단 (힙의 항목은 꺼낼 때 무시됨)"""
+        self.scheduled.pop(client_id, None)
+
+    def _sweep(self, now: float):
+        """만료된 데드라인 처리"""
+        while self.heap and self.heap[0][0] <= now:
+            deadline, client_id = heapq.heappop(self.heap)
+            if self.scheduled.get(client_id) != deadline:
+                continue   # 재스케줄되었거나 감시 중단된 항목
+            self.stats["expired"] += 1
+            entry = self.lookup(client_id)
+            if entry is None:
+                self.scheduled.pop(client_id, None)
+                continue
+            websocket, last_activity = entry
+            next_deadline = last_activity + self.ping_interval
+            if next_deadline > now:
+                # 그 사이 메시지를 받았으면 핑 없이 다시 예약
+                self._schedule(client_id, next_deadline)
+                self.stats["rescheduled"] += 1
+                continue
+            self.scheduled.pop(client_id, None)
+            if client_id in self.in_flight:
+                continue
+            self.in_flight.add(client_id)
+            task = asyncio.create_task(self._probe(client_id, websocket))
+            self.probe_tasks.add(task)
+            task.add_done_callback(self.probe_tasks.discard)
+
+    async def _probe(self, client_id: str, websocket):
+        """핑 전송 및 퐁 대기 (세마포어로 동시 진행 수 제한)"""
+        try:
+            async with self.semaphore:
+                if not websocket.open:
+                    await self.on_dead(client_id, websocket)
+                    return
+                logger.debug(f"클라이언트 {client_id}에 핑 전송")
+                self.stats["pings_sent"] += 1
+                pong_waiter = await websocket.ping()
+                await asyncio.wait_for(pong_waiter, timeout=self.pong_timeout)
+            now = time.time()
+            self.stats["pongs"] += 1
+            logger.debug(f"클라이언트 {client_id}로부터 퐁 수신")
+            self.touch(client_id, now)
+            if self.lookup(client_id) is not None:
+                self._schedule(client_id, now + self.ping_interval)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            logger.warning(f"클라이언트 {client_id}로부터 퐁 타임아웃, 연결 종료")
+            await self.on_dead(client_id, websocket)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"핑 전송 중 오류 발생 ({client_id}): {e}")
+            await self.on_dead(client_id, websocket)
+        finally:
+            self.in_flight.discard(client_id)
+
+    async def run(self):
+        """스윕 루프"""
+        try:
+            while True:
+                try:
+                    now = time.time()
+                    started = time.perf_counter()
+                    self._sweep(now)
+                    self.stats["sweeps"] += 1
+                    self.stats["last_sweep_ms"] = (time.perf_counter() - started) * 1000
+
+                    timeout = MAX_SLEEP
+                    if self.heap:
+                        timeout = min(MAX_SLEEP, max(0.0, self.heap[0][0] - time.time()))
+                    self.wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self.wakeup.wait(), timeout=timeout)
+                    except asyncio.TimeoutError:
+                        pass
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"연결 상태 확인 루프 중 오류 발생: {e}")
+                    await asyncio.sleep(1)
+        finally:
+            for task in list(self.probe_tasks):
+                task.cancel()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "tracked": len(self.scheduled),
+            "in_flight": len(self.in_flight),
+            "heap_size": len(self.heap),
+            **self.stats,
+        }
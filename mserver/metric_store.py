@@ -0,0 +1,496 @@
+# metric_store.py
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Dict, List, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 티어 이름 및 해상도 (초)
+TIER_RAW = "raw"
+TIER_1M = "1m"
+TIER_1H = "1h"
+TIER_RESOLUTION = {TIER_RAW: 1, TIER_1M: 60, TIER_1H: 3600}
+
+# 기본 보관 기간 (초)
+DEFAULT_RAW_RETENTION = 15 * 60         # 원본 샘플 15분
+DEFAULT_1M_RETENTION = 7 * 86400        # 1분 티어 7일
+DEFAULT_1H_RETENTION = 400 * 86400      # 1시간 티어 400일
+
+# 압축 주기 (초) 및 한 번에 처리할 시리즈 수
+COMPACTION_INTERVAL = 10
+COMPACTION_BATCH = 500
+
+# stats 메시지에서 추출할 메트릭 (메트릭 이름 -> 데이터 경로)
+SYSTEM_METRICS = {
+    "cpu_usage": ("cpu_usage",),
+    "cpu_user": ("cpu_user",),
+    "cpu_system": ("cpu_system",),
+    "memory_percent": ("docker_memory_percent",),
+    "memory_used": ("docker_memory_used",),
+    "disk_percent": ("disk_percent",),
+    "disk_used": ("disk_used",),
+    "swap_used": ("swap_used",),
+}
+
+CONTAINER_METRICS = {
+    "cpu_percent": ("cpu", "percent"),
+    "memory_usage": ("memory", "usage"),
+    "memory_percent": ("memory", "percent"),
+    "network_rx": ("network", "rx"),
+    "network_tx": ("network", "tx"),
+    "disk_read": ("disk", "read"),
+    "disk_write": ("disk", "write"),
+    "block_height": ("blockchain", "current_block"),
+    "finalized_block": ("blockchain", "finalized_block"),
+    "peers": ("blockchain", "peers"),
+}
+
+
+def _lookup(data: Dict[str, Any], path: Tuple[str, ...]) -> Optional[float]:
+    """중첩 딕셔너리에서 숫자 값 조회"""
+    value = data
+    for part in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+def extract_samples(data: Dict[str, Any]) -> List[Tuple[str, str, float]]:
+    """stats 데이터에서 (컨테이너, 메트릭, 값) 샘플 목록 추출
+
+    시스템 메트릭은 컨테이너 이름을 빈 문자열로 기록한다.
+    """
+    samples = []
+
+    system_info = data.get("system") or {}
+    for metric, path in SYSTEM_METRICS.items():
+        value = _lookup(system_info, path)
+        if value is not None:
+            samples.append(("", metric, value))
+
+    for container in data.get("containers") or []:
+        name = container.get("name")
+        if not name:
+            continue
+        for metric, path in CONTAINER_METRICS.items():
+            value = _lookup(container, path)
+            if value is not None:
+                samples.append((name, metric, value))
+
+    return samples
+
+
+class _RingBuffer:
+    """고정 크기 원본 샘플 링 버퍼 (타임스탬프/값을 array로 저장)"""
+
+    __slots__ = ("capacity", "ts", "values", "total")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.ts = array("d", bytes(8 * capacity))
+        self.values = array("d", bytes(8 * capacity))
+        self.total = 0  # 지금까지 추가된 샘플 수 (전역 인덱스)
+
+    def append(self, ts: float, value: float):
+        pos = self.total % self.capacity
+        self.ts[pos] = ts
+        self.values[pos] = value
+        self.total += 1
+
+    def first_index(self) -> int:
+        """버퍼에 남아 있는 가장 오래된 샘플의 전역 인덱스"""
+        return max(0, self.total - self.capacity)
+
+    def at(self, index: int) -> Tuple[float, float]:
+        pos = index % self.capacity
+        return self.ts[pos], self.values[pos]
+
+    def last_ts(self) -> float:
+        if self.total == 0:
+            return 0.0
+        return self.ts[(self.total - 1) % self.capacity]
+
+    def range(self, start: float, end: float) -> List[Tuple[float, float]]:
+        """[start, end) 구간의 샘플 반환 (시간순)"""
+        result = []
+        for index in range(self.first_index(), self.total):
+            ts, value = self.at(index)
+            if ts < start:
+                continue
+            if ts >= end:
+                break
+            result.append((ts, value))
+        return result
+
+
+class _Series:
+    """시리즈별 원본 버퍼와 압축 진행 상태"""
+
+    __slots__ = ("raw", "folded", "minute", "hour")
+
+    def __init__(self, capacity: int):
+        self.raw = _RingBuffer(capacity)
+        self.folded = 0      # 압축에 반영된 원본 샘플의 전역 인덱스
+        self.minute = None   # 진행 중인 1분 버킷 [start, min, max, sum, count]
+        self.hour = None     # 진행 중인 1시간 버킷 [start, min, max, sum, count]
+
+
+def _merge_bucket(bucket: List[float], low: float, high: float, total: float, count: int):
+    """버킷에 집계값 병합"""
+    if low < bucket[1]:
+        bucket[1] = low
+    if high > bucket[2]:
+        bucket[2] = high
+    bucket[3] += total
+    bucket[4] += count
+
+
+class MetricStore:
+    """원본 샘플 + 1분/1시간 다운샘플링 티어 저장소
+
+    - 원본 샘플은 시리즈별 링 버퍼에 짧은 기간만 보관
+    - 백그라운드 압축 태스크가 새 샘플만 1분 버킷으로 접고, 닫힌 1분 버킷을 1시간 버킷으로 접음
+    - 닫힌 버킷은 SQLite에 min/max/sum/count 로 저장
+    - 조회 시 요청 해상도를 만족하는 가장 거친 티어를 선택
+    """
+
+    def __init__(self, db_path: str = ":memory:",
+                 raw_retention: int = DEFAULT_RAW_RETENTION,
+                 minute_retention: int = DEFAULT_1M_RETENTION,
+                 hour_retention: int = DEFAULT_1H_RETENTION):
+        self.db_path = db_path
+        self.retention = {
+            TIER_RAW: raw_retention,
+            TIER_1M: minute_retention,
+            TIER_1H: hour_retention,
+        }
+        # 최소 1초 간격 기준으로 원본 보관 기간을 채울 수 있는 크기
+        self.raw_capacity = max(60, raw_retention)
+
+        self.series = {}          # (host, container, metric) -> _Series
+        self.dirty = set()        # 압축이 필요한 시리즈 키
+        self.pending_rows = {TIER_1M: [], TIER_1H: []}
+        self.last_retention_time = 0.0
+        self.stats = {
+            "samples_added": 0,
+            "minute_rows": 0,
+            "hour_rows": 0,
+            "compaction_runs": 0,
+            "last_compaction_ms": 0.0,
+        }
+
+        if db_path != ":memory:":
+            db_dir = os.path.dirname(db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+        self.db_lock = threading.Lock()
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        # 워커 모드에서는 여러 프로세스가 같은 DB에 기록하므로 잠금 대기
+        self.db.execute("PRAGMA busy_timeout=5000")
+        for tier in (TIER_1M, TIER_1H):
+            self.db.execute(
+                f"CREATE TABLE IF NOT EXISTS samples_{tier} ("
+                "host TEXT NOT NULL, container TEXT NOT NULL, metric TEXT NOT NULL, "
+                "ts INTEGER NOT NULL, min REAL, max REAL, sum REAL, count INTEGER, "
+                "PRIMARY KEY (host, container, metric, ts)) WITHOUT ROWID"
+            )
+        self.db.commit()
+
+    #################################################
+    # 수집
+    #################################################
+
+    def record(self, host: str, data: Dict[str, Any], ts: Optional[float] = None) -> int:
+        """stats 데이터의 샘플을 원본 버퍼에 추가 (O(샘플 수), 압축은 하지 않음)"""
+        return self.record_samples(host, extract_samples(data), ts)
+
+    def record_samples(self, host: str, samples: List[Tuple[str, str, float]], ts: Optional[float] = None) -> int:
+        """extract_samples 로 추출한 샘플을 원본 버퍼에 추가"""
+        if ts is None:
+            ts = time.time()
+        count = 0
+        for container, metric, value in samples:
+            key = (host, container, metric)
+            series = self.series.get(key)
+            if series is None:
+                series = _Series(self.raw_capacity)
+                self.series[key] = series
+            elif ts < series.raw.last_ts():
+                # 시계가 뒤로 간 샘플은 순서 유지를 위해 무시
+                continue
+            series.raw.append(ts, value)
+            self.dirty.add(key)
+            count += 1
+        self.stats["samples_added"] += count
+        return count
+
+    #################################################
+    # 압축
+    #################################################
+
+    def _close_minute(self, key: Tuple[str, str, str], series: _Series):
+        """진행 중인 1분 버킷을 닫고 1시간 버킷에 병합"""
+        bucket = series.minute
+        series.minute = None
+        self.pending_rows[TIER_1M].append((*key, int(bucket[0]), bucket[1], bucket[2], bucket[3], bucket[4]))
+
+        hour_start = bucket[0] - bucket[0] % 3600
+        hour = series.hour
+        if hour is not None and hour[0] != hour_start:
+            self._close_hour(key, series)
+            hour = None
+        if hour is None:
+            series.hour = [hour_start, bucket[1], bucket[2], bucket[3], bucket[4]]
+        else:
+            _merge_bucket(hour, bucket[1], bucket[2], bucket[3], bucket[4])
+
+    def _close_hour(self, key: Tuple[str, str, str], series: _Series):
+        bucket = series.hour
+        series.hour = None
+        self.pending_rows[TIER_1H].append((*key, int(bucket[0]), bucket[1], bucket[2], bucket[3], bucket[4]))
+
+    def _compact_series(self, key: Tuple[str, str, str], series: _Series, boundary: float) -> bool:
+        """새 원본 샘플을 닫힌 분까지만 접음. 아직 접을 샘플이 남으면 True 반환"""
+        raw = series.raw
+        index = max(series.folded, raw.first_index())
+        while index < raw.total:
+            ts, value = raw.at(index)
+            if ts >= boundary:
+                break
+            minute_start = ts - ts % 60
+            bucket = series.minute
+            if bucket is not None and bucket[0] != minute_start:
+                self._close_minute(key, series)
+                bucket = None
+            if bucket is None:
+                series.minute = [minute_start, value, value, value, 1]
+            else:
+                _merge_bucket(bucket, value, value, value, 1)
+            index += 1
+        series.folded = index
+
+        # 더 이상 샘플이 오지 않는 시리즈의 버킷도 경계를 지나면 닫음
+        if series.minute is not None and series.minute[0] + 60 <= boundary:
+            self._close_minute(key, series)
+        if series.hour is not None and series.hour[0] + 3600 <= boundary:
+            self._close_hour(key, series)
+
+        return index < raw.total or series.minute is not None or series.hour is not None
+
+    def compact_once(self, now: Optional[float] = None, batch: int = COMPACTION_BATCH) -> int:
+        """dirty 시리즈 중 최대 batch 개를 압축하고 처리한 수 반환"""
+        if now is None:
+            now = time.time()
+        boundary = now - now % 60
+        processed = 0
+        still_dirty = []
+        while self.dirty and processed < batch:
+            key = self.dirty.pop()
+            series = self.series.get(key)
+            if series is None:
+                continue
+            if self._compact_series(key, series, boundary):
+                still_dirty.append(key)
+            elif series.raw.last_ts() < now - self.retention[TIER_RAW]:
+                # 보관 기간이 지난 비활성 시리즈 정리
+                del self.series[key]
+            processed += 1
+        self.dirty.update(still_dirty)
+        return processed
+
+    def _flush_rows(self, rows_by_tier: Dict[str, List[tuple]]):
+        """닫힌 버킷을 SQLite에 기록 (별도 스레드에서 실행)
+
+        같은 버킷 행이 이미 있으면 덮어쓰지 않고 병합한다. 종료 시 저장한 일부 버킷이나
+        다른 워커가 같은 시리즈로 기록한 버킷의 집계를 잃지 않기 위함.
+        """
+        with self.db_lock:
+            for tier, rows in rows_by_tier.items():
+                if rows:
+                    self.db.executemany(
+                        f"INSERT INTO samples_{tier} "
+                        "(host, container, metric, ts, min, max, sum, count) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT (host, container, metric, ts) DO UPDATE SET "
+                        "min = min(min, excluded.min), max = max(max, excluded.max), "
+                        "sum = sum + excluded.sum, count = count + excluded.count",
+                        rows
+                    )
+            self.db.commit()
+
+    def _apply_retention(self, now: float):
+        with self.db_lock:
+            for tier in (TIER_1M, TIER_1H):
+                self.db.execute(f"DELETE FROM samples_{tier} WHERE ts < ?", (int(now - self.retention[tier]),))
+            self.db.commit()
+
+    async def flush(self):
+        """대기 중인 버킷을 저장"""
+        rows = self.pending_rows
+        if not rows[TIER_1M] and not rows[TIER_1H]:
+            return
+        self.pending_rows = {TIER_1M: [], TIER_1H: []}
+        self.stats["minute_rows"] += len(rows[TIER_1M])
+        self.stats["hour_rows"] += len(rows[TIER_1H])
+        await asyncio.to_thread(self._flush_rows, rows)
+
+    async def run_compaction(self, interval: float = COMPACTION_INTERVAL):
+        """백그라운드 압축 루프 - 배치 단위로 이벤트 루프에 양보하며 점진적으로 실행"""
+        while True:
+            try:
+                await asyncio.sleep(interval)
+                started = time.perf_counter()
+                now = time.time()
+
+                # 현재 dirty 시리즈만 한 바퀴 처리 (배치 사이에 수신 처리에 양보)
+                remaining = len(self.dirty)
+                while remaining > 0:
+                    processed = self.compact_once(now)
+                    if processed == 0:
+                        break
+                    remaining -= processed
+                    await asyncio.sleep(0)
+
+                await self.flush()
+
+                if now - self.last_retention_time > 3600:
+                    self.last_retention_time = now
+                    await asyncio.to_thread(self._apply_retention, now)
+
+                self.stats["compaction_runs"] += 1
+                self.stats["last_compaction_ms"] = (time.perf_counter() - started) * 1000
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"메트릭 압축 중 오류 발생: {e}")
+
+    async def close(self):
+        """종료 시 진행 중인 버킷까지 저장 후 DB 닫기 (다음 실행의 같은 버킷과는 저장 시 병합)"""
+        try:
+            for key, series in self.series.items():
+                # 현재 분의 샘플까지 모두 접음
+                self._compact_series(key, series, float("inf"))
+                if series.minute is not None:
+                    self._close_minute(key, series)
+                if series.hour is not None:
+                    self._close_hour(key, series)
+            await self.flush()
+        except Exception as e:
+            logger.error(f"메트릭 저장소 종료 중 오류 발생: {e}")
+        finally:
+            with self.db_lock:
+                self.db.close()
+
+    #################################################
+    # 조회
+    #################################################
+
+    def select_tier(self, start: float, step: Optional[float], now: Optional[float] = None) -> str:
+        """요청 해상도(step)를 만족하는 가장 거친 티어 선택
+
+        선택한 티어의 보관 기간이 시작 시각을 덮지 못하면 더 거친 티어로 넘어간다.
+        """
+        if now is None:
+            now = time.time()
+        tiers = [TIER_1H, TIER_1M, TIER_RAW]
+        chosen = TIER_RAW
+        if step:
+            for tier in tiers:
+                if TIER_RESOLUTION[tier] <= step:
+                    chosen = tier
+                    break
+
+        order = [TIER_RAW, TIER_1M, TIER_1H]
+        for tier in order[order.index(chosen):]:
+            if start >= now - self.retention[tier]:
+                return tier
+        return TIER_1H
+
+    def _query_db(self, tier: str, host: str, container: str, metric: str,
+                  start: float, end: float, limit: Optional[int]) -> List[List[float]]:
+        sql = (f"SELECT ts, min, max, sum, count FROM samples_{tier} "
+               "WHERE host = ? AND container = ? AND metric = ? AND ts >= ? AND ts < ? ORDER BY ts")
+        params = [host, container, metric, int(start), int(end)]
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self.db_lock:
+            rows = self.db.execute(sql, params).fetchall()
+        return [[ts, low, high, (total / count) if count else 0.0, count] for ts, low, high, total, count in rows]
+
+    async def query(self, host: str, container: str, metric: str, start: float, end: float,
+                    step: Optional[float] = None, limit: Optional[int] = None) -> Dict[str, Any]:
+        """시계열 조회
+
+        limit 이 지정되면 최대 limit 개 버킷만 반환하고, 남은 구간은 next_start 로 이어서 조회한다.
+
+        Returns:
+            {"tier": 티어, "step": 버킷 크기, "rows": [[ts, min, max, avg, count], ...], "next_start": 다음 시작 시각}
+        """
+        tier = self.select_tier(start, step)
+        resolution = TIER_RESOLUTION[tier]
+        needs_rebucket = bool(step and step > resolution)
+
+        # 재집계 시 잘린 버킷을 구분할 수 있도록 원본 행을 여유 있게 가져옴
+        fetch_limit = None
+        if limit:
+            ratio = max(1, int(step // resolution)) if needs_rebucket else 1
+            fetch_limit = (limit + 1) * ratio
+
+        if tier == TIER_RAW:
+            series = self.series.get((host, container, metric))
+            samples = series.raw.range(start, end) if series else []
+            if fetch_limit:
+                samples = samples[:fetch_limit]
+            rows = [[ts, value, value, value, 1] for ts, value in samples]
+        else:
+            rows = await asyncio.to_thread(self._query_db, tier, host, container, metric, start, end, fetch_limit)
+        truncated = fetch_limit is not None and len(rows) >= fetch_limit
+
+        if needs_rebucket:
+            rows = rebucket(rows, step)
+            resolution = step
+
+        next_start = None
+        if truncated and rows:
+            if len(rows) > 1:
+                # 마지막 버킷은 일부만 읽혔을 수 있으므로 다음 페이지에서 다시 읽음
+                next_start = rows[-1][0]
+                rows = rows[:-1]
+            else:
+                next_start = rows[-1][0] + resolution
+        if limit and len(rows) > limit:
+            next_start = rows[limit][0]
+            rows = rows[:limit]
+
+        return {"tier": tier, "step": resolution, "rows": rows, "next_start": next_start}
+
+    def series_keys(self, host: Optional[str] = None) -> List[Tuple[str, str, str]]:
+        """메모리에 있는 시리즈 키 목록"""
+        return sorted(key for key in self.series if host is None or key[0] == host)
+
+
+def rebucket(rows: List[List[float]], step: float) -> List[List[float]]:
+    """[ts, min, max, avg, count] 행을 더 큰 step 버킷으로 재집계"""
+    result = []
+    bucket = None
+    for ts, low, high, avg, count in rows:
+        start = ts - ts % step
+        if bucket is None or bucket[0] != start:
+            if bucket is not None:
+                result.append([bucket[0], bucket[1], bucket[2], bucket[3] / bucket[4] if bucket[4] else 0.0, bucket[4]])
+            bucket = [start, low, high, avg * count, count]
+        else:
+            _merge_bucket(bucket, low, high, avg * count, count)
+    if bucket is not None:
+        result.append([bucket[0], bucket[1], bucket[2], bucket[3] / bucket[4] if bucket[4] else 0.0, bucket[4]])
+    return result
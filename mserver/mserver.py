@@ -8,17 +8,29 @@ import random
 import ssl
 import os
 import argparse
-from typing import Dict, Set
+import functools
+import hmac
+import ipaddress
+import signal
+from typing import Dict, Set, Any, Optional
+from metric_store import MetricStore, DEFAULT_RAW_RETENTION, extract_samples
+from http_api import HttpApiServer
+from fanout import FanoutHub, DASHBOARD_PATH
+from snapshot import SnapshotIndex
+from liveness import LivenessSweeper
+from client_registry import ClientRegistry
+from http_api import HttpError
+import cluster
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# 연결된 클라이언트 및 관련 정보 저장
-connected_clients = {}  # client_id -> websocket
-client_info = {}        # client_id -> 클라이언트 정보
-data_counters = {}      # client_id -> 받은 데이터 수
-last_activity = {}      # client_id -> 마지막 활동 시간
+# 클라이언트 세션 레지스트리 (해제된 세션은 유예 기간 후 제거)
+client_registry = ClientRegistry()
+
+# 해제된 세션 정리 주기 (초)
+REGISTRY_CLEANUP_INTERVAL = 60
 
 # 서버 전체 통계
 server_stats = {
@@ -28,95 +40,182 @@ server_stats = {
     "last_stats_time": time.time()  # 마지막 통계 출력 시간
 }
 
-# 활성 연결 상태 확인 간격 (초)
-CONNECTION_CHECK_INTERVAL = 60
-# 핑 송신 간격 (초)
-PING_INTERVAL = 30
+# 메트릭 저장소 (main에서 초기화)
+metric_store = None
 
-async def send_pings():
-    """연결된 모든 클라이언트에 정기적인 핑 전송"""
-    while True:
-        try:
-            await asyncio.sleep(PING_INTERVAL)
-            current_time = time.time()
-            
-            for client_id, websocket in list(connected_clients.items()):
-                try:
-                    if websocket.open:
-                        last_activity_time = last_activity.get(client_id, 0)
-                        # 마지막 활동이 PING_INTERVAL보다 오래되었으면 핑 전송
-                        if current_time - last_activity_time > PING_INTERVAL:
-                            logger.debug(f"클라이언트 {client_id}에 핑 전송")
-                            pong_waiter = await websocket.ping()
-                            try:
-                                await asyncio.wait_for(pong_waiter, timeout=5)
-                                logger.debug(f"클라이언트 {client_id}로부터 퐁 수신")
-                                last_activity[client_id] = current_time
-                            except asyncio.TimeoutError:
-                                logger.warning(f"클라이언트 {client_id}로부터 퐁 타임아웃")
-                                # 연결 종료 준비
-                                await handle_client_disconnect(client_id, websocket)
-                    else:
-                        # 이미 닫힌 웹소켓 정리
-                        await handle_client_disconnect(client_id, websocket)
-                except Exception as e:
-                    logger.error(f"핑 전송 중 오류 발생 ({client_id}): {e}")
-                    await handle_client_disconnect(client_id, websocket)
-        except Exception as e:
-            logger.error(f"핑 루프 중 오류 발생: {e}")
+# 클라이언트별 최신 상태 스냅샷
+snapshot_index = SnapshotIndex()
+
+# 대시보드 구독자 팬아웃 허브
+fanout_hub = FanoutHub(snapshot_index=snapshot_index)
+
+# 워커 모드에서 코디네이터 연결 (단일 프로세스 모드에서는 None)
+cluster_link = None
+
+# 명령 응답 대기 (command_id -> Future)
+pending_commands = {}
+# 명령 응답 기본 대기 시간 (초)
+COMMAND_TIMEOUT = 60
+# 명령 API 로 요청할 수 있는 최대 대기 시간 (초)
+MAX_COMMAND_TIMEOUT = 300
+# 명령 API 토큰 환경 변수 (--command-token 미지정 시 사용)
+COMMAND_TOKEN_ENV = "MSERVER_COMMAND_TOKEN"
+
+# 정적 파일 디렉토리
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+
+def _lookup_client(client_id):
+    """연결 상태 확인용 조회: (websocket, 마지막 활동 시간)"""
+    session = client_registry.get_connected(client_id)
+    if session is None:
+        return None
+    return session.websocket, session.last_activity
 
-async def check_inactive_clients():
-    """장시간 활동이 없는 클라이언트 정리"""
+def _touch_client(client_id, timestamp):
+    session = client_registry.get_connected(client_id)
+    if session is not None:
+        session.last_activity = timestamp
+
+async def _on_dead_client(client_id, websocket):
+    await handle_client_disconnect(client_id, websocket)
+
+# 연결 상태 확인 (핑/비활성 감지 통합)
+liveness = LivenessSweeper(_lookup_client, _touch_client, _on_dead_client)
+
+async def cleanup_registry():
+    """유예 기간이 지난 해제 세션 정리"""
     while True:
         try:
-            await asyncio.sleep(CONNECTION_CHECK_INTERVAL)
-            current_time = time.time()
-            
-            for client_id, last_time in list(last_activity.items()):
-                if current_time - last_time > CONNECTION_CHECK_INTERVAL * 2:
-                    logger.warning(f"장시간 활동 없는 클라이언트 감지: {client_id}, {current_time - last_time:.1f}초 경과")
-                    
-                    if client_id in connected_clients:
-                        websocket = connected_clients[client_id]
-                        try:
-                            # 핑 전송으로 연결 확인
-                            pong_waiter = await websocket.ping()
-                            try:
-                                await asyncio.wait_for(pong_waiter, timeout=5)
-                                logger.info(f"클라이언트 {client_id} 여전히 활성 상태")
-                                last_activity[client_id] = current_time
-                            except asyncio.TimeoutError:
-                                logger.warning(f"클라이언트 {client_id} 응답 없음, 연결 종료")
-                                await handle_client_disconnect(client_id, websocket)
-                        except Exception as e:
-                            logger.error(f"활동 확인 중 오류 발생 ({client_id}): {e}")
-                            await handle_client_disconnect(client_id, websocket)
+            await asyncio.sleep(REGISTRY_CLEANUP_INTERVAL)
+            evicted = client_registry.evict_expired()
+            if evicted:
+                usage = client_registry.memory_usage()
+                logger.info(f"해제된 세션 {evicted}개 정리 (남은 세션 {usage['sessions']}개, 약 {usage['total_bytes'] / 1024:.1f}KB)")
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            logger.error(f"비활성 클라이언트 확인 루프 중 오류 발생: {e}")
+            logger.error(f"세션 정리 중 오류 발생: {e}")
+
+async def execute_command(client_id: str, command: Dict[str, Any], timeout: float = COMMAND_TIMEOUT) -> Dict[str, Any]:
+    """이 프로세스에 연결된 클라이언트에 명령 전송 후 응답 대기
+
+    command: {"command": 명령어, "target": 대상 컨테이너, "params": {...}, "wait": 응답 대기 여부}
+    """
+    session = client_registry.get_connected(client_id)
+    if session is None:
+        return {"status": "failed", "error": f"클라이언트 {client_id}가 연결되어 있지 않습니다"}
+    
+    command_id = f"cmd_{int(time.time() * 1000)}_{random.randint(1000, 9999)}"
+    wait = command.get("wait", True)
+    future = asyncio.get_running_loop().create_future()
+    if wait:
+        pending_commands[command_id] = future
+    try:
+        await session.websocket.send(json.dumps({
+            "type": "command",
+            "data": {
+                "id": command_id,
+                "command": command.get("command"),
+                "target": command.get("target"),
+                "params": command.get("params") or {},
+                "timestamp": int(time.time() * 1000)
+            }
+        }))
+        logger.info(f"명령 전송 완료: {session.host_name} - {command.get('command')} (ID: {command_id})")
+        if not wait:
+            return {"status": "sent", "command_id": command_id}
+        return await asyncio.wait_for(future, timeout=timeout)
+    except asyncio.TimeoutError:
+        return {"status": "timeout", "command_id": command_id}
+    except Exception as e:
+        logger.error(f"명령 전송 실패: {e}")
+        return {"status": "failed", "command_id": command_id, "error": str(e)}
+    finally:
+        pending_commands.pop(command_id, None)
+
+def _is_loopback(peer: str) -> bool:
+    try:
+        return ipaddress.ip_address(peer).is_loopback
+    except ValueError:
+        return False
+
+def parse_command_request(request, token: str, allow_remote: bool = False):
+    """POST /api/command 요청 검증 -> (client_id, 명령, 대기 시간)
+
+    - 토큰: Authorization: Bearer <token> 이 설정된 토큰과 같아야 함
+    - 기본적으로 루프백 주소에서 온 요청만 허용 (--command-allow-remote 로 해제)
+    - timeout 은 MAX_COMMAND_TIMEOUT 을 넘지 않도록 제한
+    """
+    if not allow_remote and not _is_loopback(request.peer):
+        raise HttpError(403, "명령 API 는 로컬에서만 사용할 수 있습니다")
+    authorization = request.headers.get("authorization", "")
+    scheme, _, supplied = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(supplied.strip().encode(), token.encode()):
+        raise HttpError(403, "명령 API 토큰이 올바르지 않습니다")
+    body = request.json()
+    if not isinstance(body, dict):
+        raise HttpError(400, "요청 본문은 JSON 객체여야 합니다")
+    client_id = body.get("client_id")
+    if not client_id or not body.get("command"):
+        raise HttpError(400, "client_id 와 command 는 필수입니다")
+    try:
+        timeout = float(body.get("timeout", COMMAND_TIMEOUT))
+    except (TypeError, ValueError):
+        raise HttpError(400, "timeout 은 숫자여야 합니다")
+    if not 0 < timeout < float("inf"):
+        raise HttpError(400, "timeout 은 0 보다 큰 숫자여야 합니다")
+    return client_id, body, min(timeout, MAX_COMMAND_TIMEOUT)
+
+def command_api_routes(args, handler):
+    """토큰이 설정된 경우에만 POST /api/command 경로 등록"""
+    token = args.command_token or os.environ.get(COMMAND_TOKEN_ENV, "")
+    if not token:
+        logger.info(f"명령 API 비활성화 (--command-token 또는 {COMMAND_TOKEN_ENV} 미설정)")
+        return {}
+    
+    async def handle_command_api(request, response):
+        """POST /api/command - {"client_id", "command", "target", "params", "timeout", "wait"}"""
+        client_id, body, timeout = parse_command_request(request, token, args.command_allow_remote)
+        logger.info(f"명령 API 요청 ({request.peer}): {client_id} - {body.get('command')}")
+        await response.send_json(200, await handler(client_id, body, timeout))
+    
+    return {"/api/command": (handle_command_api, ("POST",))}
+
+async def handle_clients_api(request, response):
+    """GET /api/clients - 세션 레지스트리 상태 및 메모리 사용량"""
+    await response.send_json(200, {
+        "summary": client_registry.summary(),
+        "memory": client_registry.memory_usage(),
+        "liveness": liveness.summary(),
+        "clients": [session.to_dict() for session in client_registry.sessions.values()],
+    })
 
 async def handle_client_disconnect(client_id, websocket):
     """클라이언트 연결 해제 처리"""
     try:
-        # 호스트명 정보 가져오기
-        host_name = "unknown_host"
-        ip = "unknown"
-        
-        if client_id in client_info:
-            host_name = client_info.get(client_id, {}).get("host_name", "unknown_host")
-            ip = client_info.get(client_id, {}).get("ip", "unknown")
-        
-        if client_id in connected_clients:
-            del connected_clients[client_id]
+        # 현재 세션의 연결일 때만 해제 (같은 ID로 재접속한 새 연결은 유지)
+        session = client_registry.disconnect(client_id, websocket)
+        if session is not None:
+            liveness.untrack(client_id)
+            snapshot_index.mark_disconnected(client_id)
+            if cluster_link:
+                cluster_link.unregister(client_id)
         
         if websocket.open:
             await websocket.close()
         
-        logger.info(f"{host_name} 연결 해제됨")
+        if session is not None:
+            logger.info(f"{session.host_name} 연결 해제됨")
     except Exception as e:
         logger.error(f"클라이언트 연결 해제 중 오류 발생: {e}")
 
 async def handle_client(websocket):
     """클라이언트 연결 처리"""
+    # 대시보드 구독 연결은 별도 처리
+    if getattr(websocket, "path", "").startswith(DASHBOARD_PATH):
+        await fanout_hub.handle_subscriber(websocket)
+        return
+    
     client_id = None
     host_name = "unknown_host"
     connection_time = time.time()
@@ -137,9 +236,17 @@ async def handle_client(websocket):
                     logger.warning("클라이언트 ID 없음, 임의 ID 생성")
                     client_id = f"unknown-{random.randint(1000, 9999)}"
                 
-                # 기존 연결 확인 및 처리
-                if client_id in connected_clients:
-                    old_websocket = connected_clients[client_id]
+                # 클라이언트 등록 (동일 ID의 기존 세션은 새 세션으로 교체)
+                user_agent = websocket.request_headers.get("User-Agent", "unknown") if hasattr(websocket, 'request_headers') else "unknown"
+                session, old_websocket = client_registry.register(client_id, websocket, client_ip, user_agent)
+                session.connected_at = connection_time
+                liveness.track(client_id, session.last_activity)
+                if cluster_link:
+                    # 다른 워커에 같은 ID가 있으면 코디네이터가 종료 요청
+                    cluster_link.register(client_id)
+                
+                # 기존 연결 종료
+                if old_websocket is not None:
                     logger.warning(f"동일 ID의 기존 연결 발견: {client_id}, 기존 연결 종료")
                     try:
                         if old_websocket.open:
@@ -147,21 +254,8 @@ async def handle_client(websocket):
                     except:
                         pass
                 
-                # 클라이언트 등록
-                connected_clients[client_id] = websocket
-                data_counters[client_id] = 0
-                last_activity[client_id] = time.time()
-                
-                # 클라이언트 정보 저장
-                client_info[client_id] = {
-                    "connected_at": connection_time,
-                    "ip": client_ip,
-                    "host_name": "unknown_host",  # 초기값, 첫 stats 메시지에서 업데이트됨
-                    "user_agent": websocket.request_headers.get("User-Agent", "unknown") if hasattr(websocket, 'request_headers') else "unknown"
-                }
-                
                 # 초기 호스트명 설정 (stats 메시지 전까지 임시 값)
-                host_name = client_info[client_id]["host_name"]
+                host_name = session.host_name
                 
                 logger.info(f"클라이언트 등록됨 (IP: {client_ip})")
                 
@@ -195,7 +289,7 @@ async def handle_client(websocket):
         # 등록 후 메시지 처리 루프
         async for message in websocket:
             try:
-                last_activity[client_id] = time.time()
+                session.last_activity = time.time()
                 
                 # JSON 메시지 파싱
                 data = json.loads(message)
@@ -220,7 +314,7 @@ async def handle_client(websocket):
                 # 통계 데이터 처리
                 elif message_type == "stats":
                     # 카운터 증가
-                    data_counters[client_id] += 1
+                    session.data_count += 1
                     
                     # 서버 통계 업데이트
                     server_stats["total_received"] += 1
@@ -231,22 +325,37 @@ async def handle_client(websocket):
                         seq = data.get("sequence")
                         logger.debug(f"시퀀스 번호 수신: {seq}")
                     
+                    # 최신 상태 스냅샷 갱신 (해당 클라이언트 항목만 제자리 갱신)
+                    stats_data = data.get("data", {})
+                    
                     # 호스트명 추출
-                    system_info = data.get("data", {}).get("system", {})
+                    system_info = stats_data.get("system", {})
+                    if "host_name" in system_info:
+                        host_name = system_info.get("host_name", "unknown_host")
+                    snapshot_index.update(client_id, host_name, stats_data, data.get("sequence"))
                     memory_percent = system_info.get("memory_used_percent", 0)
                     
                     # 호스트명 업데이트
-                    if "host_name" in system_info:
-                        host_name = system_info.get("host_name", "unknown_host")
-                        if client_info[client_id].get("host_name") != host_name:
-                            client_info[client_id]["host_name"] = host_name
+                    session.host_name = host_name
+                    
+                    # 메트릭 저장소에 원본 샘플 기록 (압축은 백그라운드에서 수행)
+                    samples = extract_samples(stats_data)
+                    if metric_store:
+                        metric_store.record_samples(host_name, samples)
+                    
+                    # 대시보드 구독자에게 전달 (대기열에 넣기만 하고 즉시 반환)
+                    now = time.time()
+                    fanout_hub.publish(host_name, samples, now)
+                    if cluster_link:
+                        cluster_link.mark_dirty(client_id)
+                        cluster_link.publish(host_name, samples, now)
                     
                     # 컨테이너 정보 추출
-                    containers = data.get("data", {}).get("containers", [])
+                    containers = stats_data.get("containers", [])
                     container_count = len(containers)
                     
                     # 로그 메시지 구성 (호스트명만 표시)
-                    log_message = f"{host_name} - {data_counters[client_id]}번 데이터 수신 성공: 메모리 {memory_percent:.1f}%, 컨테이너 {container_count}개"
+                    log_message = f"{host_name} - {session.data_count}번 데이터 수신 성공: 메모리 {memory_percent:.1f}%, 컨테이너 {container_count}개"
                     
                     # 10개 단위로 누적 통계 표시
                     if server_stats["total_received"] % 10 == 0:
@@ -263,16 +372,17 @@ async def handle_client(websocket):
                         log_message += f"\n=== 서버 누적 통계 (#{server_stats['total_received']}) ===\n"
                         log_message += f"성공률: {success_rate:.1f}%\n"
                         log_message += f"최근 10개 수신 시간: {elapsed_since_last:.1f}초 (분당 {msg_per_minute:.1f}개)\n"
-                        log_message += f"연결된 클라이언트: {len(connected_clients)}개\n"
+                        log_message += f"연결된 클라이언트: {client_registry.connected_count}개\n"
+                        hub_summary = fanout_hub.summary()
+                        if hub_summary["subscribers"]:
+                            log_message += f"대시보드 구독자: {hub_summary['subscribers']}명 (대기 {hub_summary['pending']}건, 병합 {hub_summary['coalesced']}건, 버림 {hub_summary['dropped']}건)\n"
                         log_message += f"총 실행 시간: {elapsed_time / 60:.1f}분"
                         
                         # 연결된 모든 클라이언트 목록 출력
                         log_message += "\n연결된 클라이언트 목록:"
-                        for cid, info in client_info.items():
-                            if cid in connected_clients:  # 활성 연결만 표시
-                                c_host = info.get("host_name", "unknown_host")
-                                conn_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(info.get("connected_at", 0)))
-                                log_message += f"\n - {c_host} - 연결 시간: {conn_time}"
+                        for c_session in client_registry.connected_sessions():  # 활성 연결만 표시
+                            conn_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(c_session.connected_at))
+                            log_message += f"\n - {c_session.host_name} - 연결 시간: {conn_time}"
                     
                     logger.info(log_message)
                     
@@ -314,6 +424,27 @@ async def handle_client(websocket):
                         "status": "success"
                     }))
                 
+                # 명령 응답 처리
+                elif message_type == "command_response":
+                    response_data = data.get("data", {})
+                    command_id = response_data.get("command_id") or response_data.get("id")
+                    status = response_data.get("status")
+                    
+                    logger.info(f"{host_name} - 명령 응답: ID={command_id}, 상태={status}")
+                    if status == "failed":
+                        logger.error(f"명령 실패: {response_data.get('error')}")
+                    
+                    future = pending_commands.get(command_id)
+                    if future and not future.done():
+                        future.set_result(response_data)
+                    
+                    # 응답 확인 메시지
+                    await websocket.send(json.dumps({
+                        "type": "command_ack",
+                        "timestamp": int(time.time() * 1000),
+                        "command_id": command_id
+                    }))
+                
                 # 알 수 없는 메시지 유형
                 else:
                     logger.warning(f"알 수 없는 메시지 유형: {message_type}")
@@ -348,8 +479,8 @@ def get_ssl_context(cert_file, key_file):
         logger.error(f"SSL 인증서 로드 실패: {e}")
         return None
 
-async def main():
-    # 명령줄 인자 파싱
+def parse_args():
+    """명령줄 인자 파싱"""
     parser = argparse.ArgumentParser(description='WebSocket 서버 (SSL 지원)')
     parser.add_argument('--host', default='0.0.0.0', help='호스트 주소 (기본값: 0.0.0.0)')
     parser.add_argument('--port', type=int, default=8080, help='포트 번호 (기본값: 8080)')
@@ -358,22 +489,73 @@ async def main():
     parser.add_argument('--cert', default='./certs/cert.pem', help='인증서 파일 경로 (기본값: ./certs/cert.pem)')
     parser.add_argument('--key', default='./certs/key.pem', help='키 파일 경로 (기본값: ./certs/key.pem)')
     parser.add_argument('--debug', action='store_true', help='디버그 로깅 활성화')
-    
-    args = parser.parse_args()
+    parser.add_argument('--db-path', default='./data/metrics.db', help='메트릭 저장소 SQLite 경로 (기본값: ./data/metrics.db)')
+    parser.add_argument('--raw-retention', type=int, default=DEFAULT_RAW_RETENTION, help=f'원본 샘플 보관 기간(초) (기본값: {DEFAULT_RAW_RETENTION})')
+    parser.add_argument('--http-port', type=int, default=8081, help='히스토리 조회 HTTP API 포트 (0이면 비활성화, 기본값: 8081)')
+    parser.add_argument('--workers', type=int, default=1, help='워커 프로세스 수 (2 이상이면 SO_REUSEPORT 로 포트 공유, 기본값: 1)')
+    parser.add_argument('--command-token', default=None, help=f'명령 API(POST /api/command) 토큰 (미지정 시 {COMMAND_TOKEN_ENV}, 둘 다 없으면 비활성화)')
+    parser.add_argument('--command-allow-remote', action='store_true', help='루프백 외 주소에서의 명령 API 요청 허용')
+    return parser.parse_args()
+
+def _start_http_api(store, snapshot, extra_routes):
+    """HTTP API 서버 생성 (경로: (핸들러, 메서드))"""
+    http_api = HttpApiServer(store, snapshot)
+    http_api.add_static("/dashboard", os.path.join(STATIC_DIR, "dashboard"))
+    for path, (handler, methods) in extra_routes.items():
+        http_api.add_route(path, handler, methods)
+    return http_api
+
+async def main(args, worker_id: Optional[int] = None, ipc_path: Optional[str] = None):
+    """서버 실행 (worker_id 가 있으면 워커 모드로 실행)"""
+    global metric_store, cluster_link
     
     # 디버그 로깅 설정
     if args.debug:
         logging.getLogger().setLevel(logging.DEBUG)
         logger.info("디버그 모드 활성화됨")
     
-    # 정기적인 핑 및 연결 체크 태스크 시작
-    ping_task = asyncio.create_task(send_pings())
-    check_task = asyncio.create_task(check_inactive_clients())
+    # 워커 모드: 코디네이터 연결 (전역 상태는 코디네이터가 관리)
+    if worker_id is not None:
+        async def handle_kick(message):
+            session = client_registry.get_connected(message["client_id"])
+            if session is not None:
+                logger.warning(f"다른 워커에 동일 ID 연결: {message['client_id']}, 기존 연결 종료")
+                await session.websocket.close()
+        
+        async def handle_remote_command(message):
+            timeout = min(float(message.get("timeout_seconds", COMMAND_TIMEOUT)), MAX_COMMAND_TIMEOUT)
+            return await execute_command(message["client_id"], message["command"], timeout)
+        
+        def handle_remote_publish(message):
+            fanout_hub.publish(message["host"], [tuple(sample) for sample in message["samples"]], message["ts"])
+        
+        cluster_link = cluster.WorkerLink(worker_id, ipc_path, snapshot_index, {
+            "kick": handle_kick,
+            "command": handle_remote_command,
+            "publish": handle_remote_publish,
+        })
+        await cluster_link.connect()
+        # 대시보드 구독 시 전체 스냅샷은 코디네이터에서 가져옴
+        fanout_hub.snapshot_index = None
+        fanout_hub.snapshot_provider = cluster_link.fetch_snapshot
+        fanout_hub.on_subscribers_changed = cluster_link.subscribers_changed
+    
+    # 메트릭 저장소 초기화 및 백그라운드 압축 태스크 시작
+    metric_store = MetricStore(args.db_path, raw_retention=args.raw_retention)
+    compaction_task = asyncio.create_task(metric_store.run_compaction())
+    logger.info(f"메트릭 저장소 초기화: {args.db_path} (원본 보관 {args.raw_retention}초)")
+    
+    # 연결 상태 확인 태스크 시작 (만료된 클라이언트만 동시에 핑)
+    liveness_task = asyncio.create_task(liveness.run())
+    cleanup_task = asyncio.create_task(cleanup_registry())
     
     # WebSocket 서버 시작
     host = args.host
     port = args.port
     
+    # 워커 모드에서는 모든 워커가 같은 포트를 공유 (커널이 연결을 분산)
+    serve_options = {"reuse_port": True} if worker_id is not None else {}
+    
     # 서버 시작 함수
     servers = []
     
@@ -387,7 +569,8 @@ async def main():
             max_size=10_485_760,  # 10MB
             max_queue=32,
             compression=None,
-            close_timeout=5
+            close_timeout=5,
+            **serve_options
         )
         servers.append(ws_server)
         logger.info(f"WebSocket 서버 시작: ws://{host}:{port}")
@@ -408,7 +591,8 @@ async def main():
                     max_size=10_485_760,
                     max_queue=32,
                     compression=None,
-                    close_timeout=5
+                    close_timeout=5,
+                    **serve_options
                 )
                 servers.append(wss_server)
                 logger.info(f"SSL WebSocket 서버 시작: wss://{host}:{args.ssl_port}")
@@ -417,10 +601,32 @@ async def main():
         else:
             logger.error("SSL 컨텍스트 생성 실패. SSL 서버를 시작할 수 없습니다.")
     
+    # 히스토리 조회 HTTP API 시작 (같은 이벤트 루프, 별도 포트)
+    # 워커 모드에서는 코디네이터가 HTTP API 를 제공
+    http_api = None
+    if args.http_port and worker_id is None:
+        http_api = _start_http_api(metric_store, snapshot_index, {
+            "/api/clients": (handle_clients_api, ("GET", "HEAD")),
+            **command_api_routes(args, execute_command),
+        })
+        try:
+            await http_api.start(host, args.http_port)
+            logger.info(f"HTTP API 서버 시작: http://{host}:{args.http_port}/api/query")
+            logger.info(f"대시보드: http://{host}:{args.http_port}/dashboard/?ws_port={port}")
+        except Exception as e:
+            logger.error(f"HTTP API 서버 시작 실패: {e}")
+            http_api = None
+    
     if not servers:
         logger.error("모든 서버 시작 실패. 프로그램을 종료합니다.")
-        ping_task.cancel()
-        check_task.cancel()
+        liveness_task.cancel()
+        cleanup_task.cancel()
+        compaction_task.cancel()
+        if http_api:
+            http_api.close()
+        if cluster_link:
+            cluster_link.close()
+        await metric_store.close()
         return
     
     try:
@@ -430,10 +636,12 @@ async def main():
         logger.info("서버 종료")
     finally:
         # 정리 작업
-        ping_task.cancel()
-        check_task.cancel()
+        liveness_task.cancel()
+        cleanup_task.cancel()
+        compaction_task.cancel()
         # 연결된 모든 클라이언트 종료
-        for client_id, websocket in list(connected_clients.items()):
+        for session in list(client_registry.connected_sessions()):
+            websocket = session.websocket
             try:
                 if websocket.open:
                     await websocket.close()
@@ -442,9 +650,89 @@ async def main():
         # 모든 서버 닫기
         for server in servers:
             server.close()
+        if http_api:
+            http_api.close()
+        if cluster_link:
+            cluster_link.close()
+        # 진행 중인 버킷까지 저장
+        await metric_store.close()
 
-if __name__ == "__main__":
+def run_worker(args, worker_id: int, ipc_path: str):
+    """워커 프로세스 진입점"""
+    for handler in logging.getLogger().handlers:
+        handler.setFormatter(logging.Formatter(f'%(asctime)s - [w{worker_id}] %(message)s'))
+    
+    async def worker_main():
+        # SIGTERM 수신 시 정리 작업을 거쳐 종료
+        main_task = asyncio.current_task()
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, main_task.cancel)
+        await main(args, worker_id, ipc_path)
+    
     try:
-        asyncio.run(main())
+        asyncio.run(worker_main())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+async def coordinator_main(args, processes, ipc_path: str):
+    """워커 모드 부모 프로세스: 전역 상태, HTTP API, 명령 라우팅"""
+    coordinator = cluster.Coordinator(snapshot_index)
+    await coordinator.start(ipc_path)
+    
+    # 히스토리 조회는 SQLite 티어(1m/1h)만 사용 (원본 버퍼는 워커별로 존재)
+    history_store = MetricStore(args.db_path, raw_retention=0)
+    
+    async def handle_cluster_clients_api(request, response):
+        await response.send_json(200, coordinator.summary())
+    
+    http_api = None
+    if args.http_port:
+        http_api = _start_http_api(history_store, snapshot_index, {
+            "/api/clients": (handle_cluster_clients_api, ("GET", "HEAD")),
+            **command_api_routes(args, coordinator.route_command),
+        })
+        try:
+            await http_api.start(args.host, args.http_port)
+            logger.info(f"HTTP API 서버 시작: http://{args.host}:{args.http_port}/api/query")
+        except Exception as e:
+            logger.error(f"HTTP API 서버 시작 실패: {e}")
+            http_api = None
+    
+    try:
+        await cluster.watch_workers(processes)
+        logger.error("모든 워커가 종료되었습니다. 코디네이터를 종료합니다.")
+    except asyncio.CancelledError:
+        logger.info("서버 종료")
+    finally:
+        if http_api:
+            http_api.close()
+        coordinator.close()
+        await history_store.close()
+        if os.path.exists(ipc_path):
+            os.unlink(ipc_path)
+
+def run_cluster(args):
+    """워커 모드 실행 (워커를 먼저 fork 한 뒤 코디네이터 이벤트 루프 시작)"""
+    if args.debug:
+        logging.getLogger().setLevel(logging.DEBUG)
+    ipc_path = cluster.default_ipc_path()
+    processes = cluster.start_workers(args.workers, functools.partial(run_worker, args), ipc_path)
+    logger.info(f"워커 {args.workers}개 시작 (포트 {args.port} 공유)")
+    try:
+        asyncio.run(coordinator_main(args, processes, ipc_path))
     except KeyboardInterrupt:
         logger.info("사용자 인터럽트로 서버 종료")
+    finally:
+        cluster.stop_workers(processes)
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.workers > 1 and not cluster.reuse_port_supported():
+        logger.warning("이 플랫폼은 SO_REUSEPORT 를 지원하지 않아 단일 프로세스로 실행합니다")
+        args.workers = 1
+    if args.workers > 1:
+        run_cluster(args)
+    else:
+        try:
+            asyncio.run(main(args))
+        except KeyboardInterrupt:
+            logger.info("사용자 인터럽트로 서버 종료")
@@ -0,0 +1,167 @@
+# snapshot.py
+import json
+import logging
+import time
+from typing import Dict, List, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# 연결이 끊긴 클라이언트의 마지막 상태를 스냅샷에 유지하는 시간 (초)
+DISCONNECTED_TTL = 3600
+
+
+class _SnapshotEntry:
+    """클라이언트 하나의 최신 상태"""
+
+    __slots__ = ("client_id", "host_name", "connected", "updated_at", "disconnected_at", "sequence",
+                 "fields", "containers", "fragment", "exposition")
+
+    def __init__(self, client_id: str):
+        self.client_id = client_id
+        self.host_name = "unknown_host"
+        self.connected = True
+        self.updated_at = 0.0
+        self.disconnected_at = None  # 연결이 끊긴 시각 (DISCONNECTED_TTL 기준)
+        self.sequence = None
+        self.fields = {}        # containers 를 제외한 stats 데이터 (system 등)
+        self.containers = {}    # 컨테이너 이름 -> 컨테이너 데이터
+        self.fragment = None    # 직렬화된 JSON 조각 (변경 시 None)
+        self.exposition = None  # Prometheus 샘플 텍스트 (패밀리별 bytes 튜플, 변경 시 None)
+
+    def data(self) -> Dict[str, Any]:
+        data = dict(self.fields)
+        data["containers"] = list(self.containers.values())
+        return data
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "client_id": self.client_id,
+            "host_name": self.host_name,
+            "connected": self.connected,
+            "updated_at": self.updated_at,
+            "sequence": self.sequence,
+            "data": self.data(),
+        }
+
+
+class SnapshotIndex:
+    """클라이언트별 최신 상태 스냅샷
+
+    - stats 수신 시 해당 클라이언트 항목만 제자리 갱신하고 dirty 로 표시
+    - 직렬화는 조회 시점에 지연 수행하며, 변경된 클라이언트의 JSON 조각만 다시 만듦
+    - 변경이 없으면 마지막으로 만든 blob 을 그대로 반환
+    """
+
+    def __init__(self, disconnected_ttl: int = DISCONNECTED_TTL):
+        self.disconnected_ttl = disconnected_ttl
+        self.entries: Dict[str, _SnapshotEntry] = {}
+        self.version = 0            # 변경될 때마다 증가
+        self.blob = None            # 마지막으로 만든 직렬화 결과
+        self.blob_version = -1
+        self.stats = {
+            "updates": 0,
+            "rebuilds": 0,
+            "fragments_rebuilt": 0,
+        }
+
+    def _entry(self, client_id: str) -> _SnapshotEntry:
+        entry = self.entries.get(client_id)
+        if entry is None:
+            entry = _SnapshotEntry(client_id)
+            self.entries[client_id] = entry
+        return entry
+
+    def _touch(self, entry: _SnapshotEntry, host_name: Optional[str], sequence: Optional[int]):
+        if host_name:
+            entry.host_name = host_name
+        entry.connected = True
+        entry.disconnected_at = None
+        entry.updated_at = time.time()
+        entry.sequence = sequence
+        entry.fragment = None
+        entry.exposition = None
+        self.version += 1
+        self.stats["updates"] += 1
+
+    def update(self, client_id: str, host_name: Optional[str], data: Dict[str, Any],
+               sequence: Optional[int] = None):
+        """전체 stats 데이터로 클라이언트 상태 교체"""
+        entry = self._entry(client_id)
+        entry.fields = {key: value for key, value in data.items() if key != "containers"}
+        containers = {}
+        for container in data.get("containers") or []:
+            name = container.get("name")
+            if name:
+                containers[name] = container
+        entry.containers = containers
+        self._touch(entry, host_name, sequence)
+
+    def fragment(self, client_id: str) -> Optional[bytes]:
+        """클라이언트 항목의 직렬화된 JSON 조각 (변경이 없으면 캐시 사용)"""
+        entry = self.entries.get(client_id)
+        if entry is None:
+            return None
+        if entry.fragment is None:
+            entry.fragment = json.dumps(entry.to_dict(), ensure_ascii=False).encode("utf-8")
+            self.stats["fragments_rebuilt"] += 1
+        return entry.fragment
+
+    def put_fragment(self, client_id: str, host_name: str, connected: bool, fragment: bytes):
+        """다른 프로세스에서 직렬화한 조각을 그대로 저장 (워커 모드 코디네이터용)"""
+        entry = self._entry(client_id)
+        entry.host_name = host_name
+        if connected:
+            entry.disconnected_at = None
+        elif entry.connected or entry.disconnected_at is None:
+            entry.disconnected_at = time.time()
+        entry.connected = connected
+        entry.updated_at = time.time()
+        entry.fragment = fragment
+        entry.exposition = None
+        self.version += 1
+        self.stats["updates"] += 1
+
+    def mark_disconnected(self, client_id: str):
+        entry = self.entries.get(client_id)
+        if entry and entry.connected:
+            entry.connected = False
+            entry.disconnected_at = time.time()
+            entry.fragment = None
+            entry.exposition = None
+            self.version += 1
+
+    def remove(self, client_id: str):
+        if self.entries.pop(client_id, None) is not None:
+            self.version += 1
+
+    def _prune(self, now: float):
+        """연결이 끊긴 지 DISCONNECTED_TTL 이 지난 클라이언트 항목 제거"""
+        expired = [
+            client_id for client_id, entry in self.entries.items()
+            if not entry.connected and now - (entry.disconnected_at or entry.updated_at) > self.disconnected_ttl
+        ]
+        for client_id in expired:
+            del self.entries[client_id]
+        if expired:
+            self.version += 1
+
+    def prune(self):
+        self._prune(time.time())
+
+    def get_blob(self) -> bytes:
+        """직렬화된 스냅샷 반환 (변경이 있을 때만 다시 만듦)"""
+        now = time.time()
+        self._prune(now)
+        if self.blob is not None and self.blob_version == self.version:
+            return self.blob
+
+        fragments = [self.fragment(client_id) for client_id in self.entries]
+
+        header = json.dumps({"version": self.version, "generated_at": now})[:-1].encode("utf-8")
+        self.blob = header + b', "hosts": [' + b", ".join(fragments) + b"]}"
+        self.blob_version = self.version
+        self.stats["rebuilds"] += 1
+        return self.blob
+
+    def hosts(self) -> List[str]:
+        return sorted({entry.host_name for entry in self.entries.values()})
@@ -1735,8 +1735,16 @@ mtick() {
     return 1
   fi
   
+  # mclient 메트릭 엔드포인트 포트 확인
+  local port=$(docker exec mclient printenv METRICS_PORT 2>/dev/null)
+  if [ -z "$port" ] || [ "$port" = "0" ]; then
+    echo -e "${RED}Error: mclient metrics endpoint is disabled${NC}"
+    echo -e "${YELLOW}Set METRICS_PORT in .env.mclient (e.g. METRICS_PORT=9181) and restart mclient.${NC}"
+    return 1
+  fi
+  
   # mclient가 마지막으로 보낸 데이터 읽기 (컨테이너 내부에서)
-  local data=$(docker exec mclient cat /tmp/mclient_last_send.json 2>/dev/null)
+  local data=$(docker exec mclient curl -sf "http://127.0.0.1:${port}/debug/last_send" 2>/dev/null)
   
   if [ -z "$data" ]; then
     echo -e "${YELLOW}No data available yet. Make sure mclient has sent at least one message.${NC}"